@@ -0,0 +1,233 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+REJECT_QUEUE_FULL = "queue_full"
+REJECT_QUEUE_TIMEOUT = "queue_timeout"
+REJECT_RATE_LIMITED = "rate_limited"
+
+
+class Rejected(Exception):
+    """Raised when a request is not admitted. `status` is 429 or 503; `retry_after` is in whole seconds."""
+
+    def __init__(self, status, reason, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _retry_after(seconds):
+    return max(1, min(60, math.ceil(seconds)))
+
+
+class RouteLimit:
+    """A counting semaphore with a bounded FIFO wait queue.
+
+    Up to `max_concurrent` holders run at once; up to `max_queue` more wait,
+    each for at most `queue_timeout` seconds, and are admitted in arrival
+    order. Anything beyond that is rejected at once, so a burst on one route
+    costs other routes nothing but the rejection. Retry-After is estimated
+    from the average time a slot is held and the queue ahead.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue=0, queue_timeout=10.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected = {REJECT_QUEUE_FULL: 0, REJECT_QUEUE_TIMEOUT: 0}
+        self.max_queue_seen = 0
+        self._waiters = deque()
+        self._average_hold = None
+        self._lock = threading.Lock()
+
+    def _estimate_wait(self, position):
+        hold = self._average_hold if self._average_hold is not None else 1.0
+        return hold * (position + 1) / self.max_concurrent
+
+    def acquire(self):
+        """Takes a slot, waiting in the queue if needed. Returns the seconds spent queued; raises Rejected."""
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                self.rejected[REJECT_QUEUE_FULL] += 1
+                raise Rejected(503, REJECT_QUEUE_FULL, _retry_after(self._estimate_wait(len(self._waiters))),
+                               f"{self.name} is at capacity; try again shortly.")
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self.max_queue_seen = max(self.max_queue_seen, len(self._waiters))
+
+        start = time.perf_counter()
+        waiter.wait(self.queue_timeout)
+        with self._lock:
+            # release() hands the slot over by setting the event; one set just after the timeout still counts.
+            if not waiter.is_set():
+                self._waiters.remove(waiter)
+                self.rejected[REJECT_QUEUE_TIMEOUT] += 1
+                raise Rejected(503, REJECT_QUEUE_TIMEOUT, _retry_after(self._estimate_wait(len(self._waiters))),
+                               f"{self.name} is busy; timed out waiting for a slot.")
+            self.admitted += 1
+        return time.perf_counter() - start
+
+    def release(self, held_for):
+        with self._lock:
+            self._average_hold = held_for if self._average_hold is None else 0.8 * self._average_hold + 0.2 * held_for
+            if self._waiters:
+                # The slot passes straight to the next waiter, so `active` is unchanged.
+                self._waiters.popleft().set()
+            else:
+                self.active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent, "max_queue": self.max_queue, "queue_timeout": self.queue_timeout,
+                "active": self.active, "queued": len(self._waiters), "max_queue_seen": self.max_queue_seen,
+                "admitted": self.admitted, "rejected": dict(self.rejected),
+                "average_hold_ms": round(self._average_hold * 1000, 1) if self._average_hold is not None else None,
+            }
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: `rate` requests per second on average, bursts of up to `burst`.
+
+    Buckets refill lazily when a key is seen. Only the `max_keys` most recently
+    seen keys are tracked; an evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.limited = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spends one token for `key`. Returns 0 if allowed, otherwise the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {"rate": self.rate, "burst": self.burst, "keys": len(self._buckets),
+                    "allowed": self.allowed, "limited": self.limited}
+
+
+def parse_route_limits(spec):
+    """Parses "route=concurrency[:queue[:timeout]],..." into {route: (concurrency, queue, timeout)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        route, _, values = item.partition("=")
+        parts = values.split(":")
+        try:
+            concurrency, queue, timeout = (int(parts[0]), int(parts[1]) if len(parts) > 1 else 0,
+                                           float(parts[2]) if len(parts) > 2 else 10.0)
+        except ValueError:
+            concurrency = None
+        if not route or concurrency is None or concurrency < 1 or queue < 0 or len(parts) > 3:
+            raise ValueError(f"Invalid admission limit '{item}'; expected route=concurrency[:queue[:timeout]].")
+        limits[route.strip()] = (concurrency, queue, timeout)
+    return limits
+
+
+class AdmissionController:
+    """Per-route concurrency limits and per-client rate limits, applied before the view runs.
+
+    Routes are matched by their registered rule (e.g. "/api/report"). The
+    rate limiter, when configured, covers the limited routes plus
+    `rate_limited_routes`, keyed by the first of `key_headers` the request
+    carries (an API key or user ID), else the client address. Slots are
+    released when the response is closed, so streamed downloads hold theirs
+    until the last byte is sent.
+    """
+
+    def __init__(self, route_limits, rate_limiter=None, rate_limited_routes=(), key_headers=("X-API-Key",)):
+        self.limits = {route: RouteLimit(route, *values) for route, values in route_limits.items()}
+        self.rate_limiter = rate_limiter
+        self.rate_limited_routes = set(route_limits) | set(rate_limited_routes)
+        self.key_headers = tuple(key_headers)
+
+    def client_key(self, request):
+        for header in self.key_headers:
+            value = request.headers.get(header)
+            if value:
+                return f"{header}:{value}"
+        return f"addr:{request.remote_addr}"
+
+    def admit(self, route, request):
+        """Applies the rate limit and takes a route slot. Returns the RouteLimit held (or None); raises Rejected."""
+        if self.rate_limiter is not None and route in self.rate_limited_routes:
+            wait = self.rate_limiter.take(self.client_key(request))
+            if wait:
+                raise Rejected(429, REJECT_RATE_LIMITED, _retry_after(wait), "Too many requests; slow down.")
+        limit = self.limits.get(route)
+        if limit is not None:
+            limit.acquire()
+        return limit
+
+    def init_app(self, app):
+        """Installs the checks; rejected requests get a JSON error with a Retry-After header."""
+        from flask import g, jsonify, request
+
+        def release(state):
+            if not state["released"]:
+                state["released"] = True
+                state["limit"].release(time.perf_counter() - state["start"])
+
+        @app.before_request
+        def admit_request():
+            if request.method == "OPTIONS" or request.url_rule is None:
+                return None
+            route = request.url_rule.rule
+            try:
+                limit = self.admit(route, request)
+            except Rejected as rejected:
+                response = jsonify({"error": str(rejected), "reason": rejected.reason})
+                response.status_code = rejected.status
+                response.headers["Retry-After"] = str(rejected.retry_after)
+                return response
+            if limit is not None:
+                g.admission_state = {"limit": limit, "start": time.perf_counter(), "released": False, "closing": False}
+            return None
+
+        @app.after_request
+        def release_on_close(response):
+            state = g.get("admission_state")
+            if state is not None and response.is_streamed and not response.direct_passthrough:
+                response.call_on_close(lambda: release(state))
+                state["closing"] = True
+            return response
+
+        @app.teardown_request
+        def release_slot(exc):
+            state = g.get("admission_state")
+            if state is not None and not state["closing"]:
+                release(state)
+
+    def stats(self):
+        return {
+            "routes": {route: limit.stats() for route, limit in self.limits.items()},
+            "rate_limit": self.rate_limiter.stats() if self.rate_limiter is not None else None,
+        }
@@ -1,28 +1,45 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
+import click
 from dotenv import load_dotenv
 import os
-import requests
 import uuid
-import json
+from datetime import date, datetime, timedelta, timezone
 import io
+import tempfile
 import traceback
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.colors import HexColor
 import sys 
-
-# Placeholder for unused but required library
-try:
-    import google.genai 
-except ImportError:
-    pass
+import threading
+import time
+from collections import Counter
+import metrics
+import json_codec
+from metrics import span
+from profiling import PROFILE_HEADER, RequestProfiler
+from supabase_client import DeadlineExceeded, SupabaseClient
+from warmup import warm_up
+from admission import AdmissionController, TokenBucketLimiter, parse_route_limits
+from summarizer import SummaryService, comment_texts, make_backend
+from event_broker import EventBroker, format_sse, stream_events
+from resume_index import ResumeIndex
+from local_replica import REPLICATED_TABLES, LocalReplica
+from resume_ingest import ResumeIngestor, ResumeUploads, UploadError
+from candidate_index import CandidateFilters, CandidateIndex, normalize, score_pct
+from schedule_engine import BLOCKING_STATUSES, SLOT_FIELDS, ScheduleBook, date_range
+from report_batch import render_pdf_off_thread, stream_reports_zip
+from report_cache import ReportCache, TTLCache, make_etag
+from compression import compress_body, negotiate_encoding
+from report_jobs import JobQueueFull, ReportJobManager, make_result_store
+from report_export import COHORT_HEADER, candidate_report_rows, cohort_report_rows, stream_csv, stream_xlsx, worksheet_name, xlsx_available
+from evaluation_model import Evaluation
+from score_summary import SUMMARY_EVALUATION_COLUMNS, SUMMARY_TABLE, SummaryStore, apply_evaluation, build_evaluation_row, build_summary, compare_summaries, new_summary
+from candidate_import import build_auth_payload, build_profile_payload, bulk_create_candidates, detect_format, parse_candidate_rows
 
 # --- CONFIGURATION ---
 load_dotenv()
 app = Flask(__name__)
-# Allow ALL origins for development
-CORS(app, supports_credentials=True)
+# Allow ALL origins for development; Retry-After is exposed so the browser can honour admission-control rejections
+CORS(app, supports_credentials=True, expose_headers=["Retry-After"])
 
 # Load Supabase credentials from .env file
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -33,24 +50,150 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     print("Please check your backend/.env file and ensure it is in the correct location.")
     sys.exit(1)
 
-SUPABASE_REST_URL = f"{SUPABASE_URL}/rest/v1"
-SUPABASE_AUTH_ADMIN_URL = f"{SUPABASE_URL}/auth/v1/admin/users"
+# Shared keep-alive client; pool size, timeouts and retries come from SUPABASE_* env vars.
+supabase = SupabaseClient.from_env(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
-# --- PDF COLORS ---
-COLOR_PRIMARY = HexColor('#FF3B5F') # Red/Pink (V-Recruit theme)
-COLOR_SECONDARY = HexColor('#4CAF50') # Green (Recommended)
-COLOR_TEXT = HexColor('#333333')
-COLOR_BG_LIGHT = HexColor('#F5F5F5')
+# Upper bound, in seconds, on the Supabase calls made while serving one interactive request
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "20"))
 
-# --- HELPER FUNCTION ---
-def get_supabase_headers(prefer_header="return=representation"):
-    """Returns the headers required for making requests to Supabase as an admin."""
-    return {
-        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-        "apikey": SUPABASE_SERVICE_ROLE_KEY,
-        "Content-Type": "application/json",
-        "Prefer": prefer_header
-    }
+# Bulk onboarding limits
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "2000"))
+BULK_MAX_WORKERS = int(os.getenv("BULK_MAX_WORKERS", "8"))
+
+# Upper bound on candidates in one batch report download
+REPORT_BATCH_MAX = int(os.getenv("REPORT_BATCH_MAX", "500"))
+
+# Aggregated report data and rendered PDFs, keyed by candidate + evaluation version
+report_cache = ReportCache(
+    maxsize=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("REPORT_CACHE_TTL", "300")),
+    version_ttl=float(os.getenv("REPORT_VERSION_TTL", "5")),
+)
+
+# Background report jobs: bounded worker pool, pluggable result store (memory or disk), expiring results
+report_jobs = ReportJobManager(
+    make_result_store(os.getenv("REPORT_JOB_STORE", "memory"), os.getenv("REPORT_JOB_DIR")),
+    max_workers=int(os.getenv("REPORT_JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("REPORT_JOB_MAX_PENDING", "50")),
+    ttl=float(os.getenv("REPORT_JOB_TTL", "900")),
+)
+
+# Per-candidate running score summaries, updated as evaluations are submitted. With SCORE_SUMMARIES=0
+# reports are always aggregated from raw evaluations.
+SCORE_SUMMARIES_ENABLED = os.getenv("SCORE_SUMMARIES", "1") == "1"
+summary_store = SummaryStore(supabase)
+
+# Comment summaries: extractive by default, SUMMARY_BACKEND=gemini (with GEMINI_API_KEY) for an LLM with an
+# extractive fallback after SUMMARY_DEADLINE seconds. Results are cached by comment-set hash.
+summary_service = SummaryService(
+    make_backend(os.getenv("SUMMARY_BACKEND", "extractive"), api_key=os.getenv("GEMINI_API_KEY"), model=os.getenv("SUMMARY_MODEL")),
+    max_sentences=int(os.getenv("SUMMARY_MAX_SENTENCES", "3")),
+    deadline=float(os.getenv("SUMMARY_DEADLINE", "1.5")),
+    cache_size=int(os.getenv("SUMMARY_CACHE_SIZE", "1024")),
+    cache_ttl=float(os.getenv("SUMMARY_CACHE_TTL", "3600")),
+)
+
+# Cohort statistics per (position, round); short-lived because any new evaluation changes them
+cohort_cache = TTLCache(maxsize=64, ttl=float(os.getenv("COHORT_CACHE_TTL", "60")))
+
+# Request/Supabase/step timings for GET /metrics. METRICS_LOG_SAMPLE_RATE (0-1) is the share of requests
+# logged as JSON timing lines; requests slower than METRICS_SLOW_REQUEST_MS are always logged.
+METRICS_LOG_SAMPLE_RATE = float(os.getenv("METRICS_LOG_SAMPLE_RATE", "0"))
+METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "0")) or None
+supabase.add_observer(metrics.record_supabase_call)
+
+# Opt-in cProfile capture: requests carrying PROFILE_ADMIN_TOKEN (sent in the X-Profile-Token header)
+# or sampled at PROFILE_SAMPLE_RATE. With neither set, no profiling hooks are installed.
+profiler = RequestProfiler(
+    directory=os.getenv("PROFILE_DIR"),
+    keep=int(os.getenv("PROFILE_KEEP", "50")),
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    admin_token=os.getenv("PROFILE_ADMIN_TOKEN"),
+)
+
+# ReportLab, NumPy and the GenAI SDK load on first use. WARMUP_ON_START=1 preloads them at import,
+# i.e. before a worker starts serving.
+if os.getenv("WARMUP_ON_START", "0") == "1":
+    timings = warm_up()
+    print("Warm-up imports: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+
+# Admin dashboard counters, shared by every open dashboard tab for DASHBOARD_STATS_TTL seconds
+DASHBOARD_STATS_TTL = float(os.getenv("DASHBOARD_STATS_TTL", "15"))
+dashboard_cache = TTLCache(maxsize=4, ttl=DASHBOARD_STATS_TTL)
+
+# Schedule change feed: schedule routes publish here and /api/stream/schedules fans changes out over SSE.
+# Per-process; with several workers, a subscriber only sees changes made through its own worker.
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+schedule_events = EventBroker(
+    history=int(os.getenv("SCHEDULE_EVENT_HISTORY", "1000")),
+    queue_size=int(os.getenv("SCHEDULE_EVENT_QUEUE", "256")),
+)
+
+# Candidate directory behind /api/candidates: loaded from Supabase on first use, refreshed in the background every
+# CANDIDATE_INDEX_REFRESH seconds and updated in place by this backend's own writes. Pages are cached per index version.
+CANDIDATE_PAGE_SIZE = int(os.getenv("CANDIDATE_PAGE_SIZE", "50"))
+CANDIDATE_PAGE_MAX = int(os.getenv("CANDIDATE_PAGE_MAX", "200"))
+candidate_index = CandidateIndex(lambda: load_candidate_directory(),
+                                 refresh_interval=float(os.getenv("CANDIDATE_INDEX_REFRESH", "300")))
+candidate_page_cache = TTLCache(maxsize=int(os.getenv("CANDIDATE_PAGE_CACHE_SIZE", "512")),
+                                ttl=float(os.getenv("CANDIDATE_PAGE_CACHE_TTL", "300")))
+
+# Conflict detection and auto-slotting over every upcoming blocking schedule, indexed per evaluator, candidate and
+# location. Built on first use and kept current by the schedule routes; SCHEDULE_BOOK_REFRESH re-reads Supabase.
+schedule_book = ScheduleBook(lambda: load_schedule_slots(), refresh_interval=float(os.getenv("SCHEDULE_BOOK_REFRESH", "300")))
+# Check-then-insert has to be atomic, or two overlapping requests could both pass the check.
+schedule_write_lock = threading.Lock()
+
+# Admission control for the expensive routes, as "route=concurrency:queue:timeout" (rule as registered). Each
+# route runs at most `concurrency` requests, queues up to `queue` more for `timeout` seconds and rejects the rest
+# with 503 + Retry-After, so a burst of report downloads cannot starve cheap routes. An empty value disables it.
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "/api/report=4:16:10,/api/report/excel=4:16:10,"
+                             "/api/report/batch=1:2:5,/api/report/cohort/export=2:4:5")
+# Optional per-client token bucket (RATE_LIMIT_RATE requests/second, bursts of RATE_LIMIT_BURST; 0 = off) on the
+# limited routes plus RATE_LIMIT_ROUTES. Clients are told apart by the first RATE_LIMIT_KEY_HEADERS header present,
+# else by address; over-limit requests get 429 + Retry-After.
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "0"))
+admission = AdmissionController(
+    parse_route_limits(ADMISSION_LIMITS),
+    rate_limiter=TokenBucketLimiter(RATE_LIMIT_RATE, float(os.getenv("RATE_LIMIT_BURST", "10"))) if RATE_LIMIT_RATE > 0 else None,
+    rate_limited_routes=[route for route in os.getenv("RATE_LIMIT_ROUTES", "/api/summarize,/api/report/jobs").split(",") if route],
+    key_headers=[header for header in os.getenv("RATE_LIMIT_KEY_HEADERS", "X-API-Key,X-User-Id").split(",") if header],
+)
+
+# Resume ingestion: uploads arrive in chunks of at most RESUME_CHUNK_SIZE bytes (RESUME_MAX_BYTES per file), are
+# spooled to RESUME_UPLOAD_DIR and stored once per SHA-256 in the RESUME_BUCKET storage bucket. Text is extracted on
+# RESUME_EXTRACT_WORKERS processes (0 = inline) and indexed, with each candidate's academic, experience and skills
+# fields, in a local SQLite database at RESUME_INDEX_PATH that every worker searches through an in-memory inverted
+# index (rebuilt every RESUME_INDEX_REFRESH seconds to drop replaced documents). The database is derived data:
+# `flask reindex-resumes` rebuilds it.
+RESUME_SEARCH_MAX = int(os.getenv("RESUME_SEARCH_MAX", "100"))
+resume_index = ResumeIndex(
+    os.getenv("RESUME_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "resume_index.sqlite3")),
+    refresh_interval=float(os.getenv("RESUME_INDEX_REFRESH", "3600")),
+)
+resume_uploads = ResumeUploads(
+    os.getenv("RESUME_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "vrecruitment-resume-uploads")),
+    chunk_size=int(os.getenv("RESUME_CHUNK_SIZE", str(512 * 1024))),
+    max_bytes=int(os.getenv("RESUME_MAX_BYTES", str(5 * 1024 * 1024))),
+    max_sessions=int(os.getenv("RESUME_MAX_UPLOADS", "100")),
+)
+resume_ingestor = ResumeIngestor(supabase, resume_index, resume_uploads, bucket=os.getenv("RESUME_BUCKET", "resumes"),
+                                 workers=int(os.getenv("RESUME_EXTRACT_WORKERS", str(min(2, os.cpu_count() or 1)))))
+
+# Optional local read replica: with REPLICA_PATH set, users, candidate_profiles, schedules and evaluations are
+# mirrored into an SQLite (WAL) file there, synced every REPLICA_SYNC_INTERVAL seconds from each table's
+# `updated_at` (re-reading REPLICA_SYNC_OVERLAP seconds back for late commits) and checked for rows deleted
+# elsewhere every REPLICA_RECONCILE_INTERVAL seconds. Reports, exports, cohort statistics and the candidate
+# directory read it while it is at most REPLICA_MAX_STALENESS seconds behind and Supabase otherwise.
+# `flask replica-resync` rebuilds it.
+REPLICA_PATH = os.getenv("REPLICA_PATH", "")
+replica = LocalReplica(
+    supabase, REPLICA_PATH,
+    max_staleness=float(os.getenv("REPLICA_MAX_STALENESS", "60")),
+    sync_interval=float(os.getenv("REPLICA_SYNC_INTERVAL", "10")),
+    overlap=float(os.getenv("REPLICA_SYNC_OVERLAP", "30")),
+    reconcile_interval=float(os.getenv("REPLICA_RECONCILE_INTERVAL", "3600")),
+) if REPLICA_PATH else None
 
 # --- MANUALLY HANDLE OPTIONS REQUESTS ---
 @app.before_request
@@ -59,6 +202,10 @@ def handle_options():
         response = jsonify({"status": "ok"})
         return response
 
+metrics.init_app(app, log_sample_rate=METRICS_LOG_SAMPLE_RATE, slow_request_ms=METRICS_SLOW_REQUEST_MS)
+profiler.init_app(app, skip_prefixes=("/api/profiles", "/metrics"))
+admission.init_app(app)
+
 # --- PRIMARY CANDIDATE CREATION ROUTE (UNCHANGED) ---
 @app.route("/api/candidate/add", methods=["POST", "OPTIONS"])
 def add_new_candidate():
@@ -70,26 +217,15 @@ def add_new_candidate():
         if data is None: 
             return jsonify({"error": "Invalid JSON payload received. Body is empty or malformed."}), 400
             
-        headers = get_supabase_headers()
         user_id = None
 
         # --- Step 1: Create the Authentication User ---
-        email = data.get('email')
-        if not email:
-            email = f"temp_{uuid.uuid4().hex[:8]}@candidate.vit.edu.in"
-
-        full_name = f"{data.get('first_name', '')} {data.get('surname', '')}".strip()
-        if not full_name:
-            return jsonify({"error": "First name and surname are required."}), 400
-
-        auth_payload = {
-            "email": email,
-            "password": str(uuid.uuid4()),
-            "email_confirm": True,
-            "user_metadata": {"full_name": full_name, "role": "candidate"}
-        }
+        try:
+            auth_payload = build_auth_payload(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        auth_response = requests.post(SUPABASE_AUTH_ADMIN_URL, headers=headers, json=auth_payload)
+        auth_response = supabase.create_auth_user(auth_payload)
 
         if auth_response.status_code != 200:
             error_detail = auth_response.json() if auth_response.content else "No response content"
@@ -102,60 +238,32 @@ def add_new_candidate():
         user_id = new_user.get('id')
 
         # --- Step 2: Build the Detailed Profile Payload ---
-        profile_payload = {
-            "user_id": user_id,
-            "position_applied_for": data.get("position_applied_for"),
-            "first_name": data.get("first_name"),
-            "father_or_husband_name": data.get("father_or_husband_name"),
-            "surname": data.get("surname"),
-            "current_address": data.get("current_address"),
-            "permanent_address": data.get("permanent_address"),
-            "mobile": data.get("mobile"),
-            "email": data.get("email"),
-            "date_of_birth": data.get("date_of_birth") if data.get("date_of_birth") else None,
-            "marital_status": data.get("marital_status"),
-            "gender": data.get("gender"),
-            "religion": data.get("religion"),
-            "caste": data.get("caste"),
-            "category": data.get("category"),
-            "nationality": data.get("nationality"),
-            "blood_group": data.get("blood_group"),
-            "allergies": data.get("allergies"),
-            "disability": data.get("disability"),
-            "aadhar_card_no": data.get("aadhar_card_no"),
-            "pan_no": data.get("pan_no"),
-            "resume_url": data.get("resume_url"), 
-            
-            # Use json.dumps with defaults to prevent errors on null data from frontend
-            "academic_details": json.dumps(data.get("academic_details") or []),
-            "experience_details": json.dumps(data.get("experience_details") or []),
-            "computer_skills": json.dumps(data.get("computer_skills") or {}),
-            "languages_known": json.dumps(data.get("languages_known") or {}),
-            "additional_info": json.dumps(data.get("additional_info") or {}),
-            "reporting_officers": json.dumps(data.get("reporting_officers") or []),
-            "self_ratings": json.dumps(data.get("self_ratings") or {}),
-            "family_details": json.dumps(data.get("family_details") or []),
-        }
+        profile_payload = build_profile_payload(data, user_id)
 
         # --- Step 3: Insert the Profile ---
-        profile_response = requests.post(
-            f"{SUPABASE_REST_URL}/candidate_profiles",
-            headers=headers,
-            json=profile_payload
-        )
+        profile_response = supabase.post("candidate_profiles", json=profile_payload)
 
         if profile_response.status_code not in [200, 201, 204]:
             error_detail = profile_response.text
             
             # Clean up: Delete the auth user
             if user_id:
-                requests.delete(f"{SUPABASE_AUTH_ADMIN_URL}/{user_id}", headers=headers)
+                supabase.delete_auth_user(user_id)
             
             return jsonify({
                 "error": "Failed to save candidate profile. Check Supabase RLS on candidate_profiles table.",
                 "supabase_error": error_detail
             }), 500
 
+        dashboard_cache.clear()
+        if profile_response.content:
+            replicate("candidate_profiles", profile_response.json())
+        else:
+            replicate_inserted_profiles([user_id])
+        candidate_index.upsert_candidate(user_id, full_name=auth_payload["user_metadata"]["full_name"],
+                                         position=profile_payload.get("position_applied_for"),
+                                         resume_url=profile_payload.get("resume_url"))
+        index_candidate_profiles([(user_id, profile_payload)])
         return jsonify({
             "uid": user_id, 
             "message": "Candidate created and profile saved successfully."
@@ -170,136 +278,1039 @@ def add_new_candidate():
             "details": str(e)
         }), 500
 
+# --- BULK CANDIDATE ONBOARDING ---
+@app.route("/api/candidate/bulk", methods=["POST", "OPTIONS"])
+def add_candidates_bulk():
+    """Creates many candidates from a JSON array, or a CSV/NDJSON upload, and returns a per-row manifest."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    try:
+        upload = request.files.get('file')
+        if upload:
+            rows = parse_candidate_rows(upload.read(), detect_format(upload.mimetype, upload.filename))
+        else:
+            rows = parse_candidate_rows(request.get_data(), detect_format(request.content_type))
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"error": f"Could not parse candidate upload: {str(e)}"}), 400
+
+    if not rows:
+        return jsonify({"error": "No candidate rows found in the upload."}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({"error": f"Too many rows ({len(rows)}). The limit is {BULK_MAX_ROWS} per request."}), 413
+
+    try:
+        manifest = bulk_create_candidates(supabase, rows, max_workers=BULK_MAX_WORKERS)
+    except Exception as e:
+        print(f"--- BULK IMPORT ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+        return jsonify({"error": "Bulk import failed unexpectedly.", "details": str(e)}), 500
+
+    summary = manifest["summary"]
+    if summary["created"]:
+        dashboard_cache.clear()
+        profiles = []
+        for result in manifest["results"]:
+            if result["status"] == "created":
+                data = rows[result["row"]]
+                candidate_index.upsert_candidate(result["uid"], full_name=build_auth_payload(data)["user_metadata"]["full_name"],
+                                                 position=data.get("position_applied_for"), resume_url=data.get("resume_url"))
+                profiles.append((result["uid"], build_profile_payload(data, result["uid"])))
+        index_candidate_profiles(profiles)
+        replicate_inserted_profiles([user_id for user_id, _ in profiles])
+    status = 201 if summary["failed"] == 0 else (207 if summary["created"] else 400)
+    return jsonify(manifest), status
+
 @app.route("/api/test", methods=["GET"])
 def test_route():
     return jsonify({"message": "Flask server is working!"})
 
+@app.route("/api/metrics/supabase", methods=["GET"])
+def supabase_latency_stats():
+    """Per-endpoint call counts and latencies for the shared Supabase client."""
+    return jsonify(supabase.latency_stats())
+
+def collect_cache_and_job_metrics():
+    """Report cache, job queue and summary service state, read when /metrics is scraped."""
+    entries = report_cache.stats()["entries"]
+    jobs = report_jobs.stats()["jobs"]
+    summaries = summary_service.stats()
+    return [
+        ("report_cache_entries", "gauge", "Cached report data and files.", [({}, entries["size"])]),
+        ("report_cache_hits_total", "counter", "Report cache hits.", [({}, entries["hits"])]),
+        ("report_cache_misses_total", "counter", "Report cache misses.", [({}, entries["misses"])]),
+        ("report_jobs", "gauge", "Background report jobs by status.", [({"status": status}, count) for status, count in jobs.items()]),
+        ("summary_cache_hits_total", "counter", "Comment summaries served from cache.", [({}, summaries["cache"]["hits"])]),
+        ("summary_fallbacks_total", "counter", "Summaries that fell back to extraction.", [({}, summaries["fallbacks"])]),
+        ("summary_coalesced_total", "counter", "Summary requests that joined an identical one in flight.", [({}, summaries["coalesced"])]),
+    ]
+
+def collect_admission_metrics():
+    """Per-route slots in use, queue depth, admissions and rejections, plus rate-limit counts."""
+    stats = admission.stats()
+    routes = stats["routes"].items()
+    samples = [
+        ("admission_active", "gauge", "Requests holding a slot, per limited route.", [({"route": route}, s["active"]) for route, s in routes]),
+        ("admission_queue_depth", "gauge", "Requests waiting for a slot, per limited route.", [({"route": route}, s["queued"]) for route, s in routes]),
+        ("admission_admitted_total", "counter", "Requests admitted, per limited route.", [({"route": route}, s["admitted"]) for route, s in routes]),
+        ("admission_rejected_total", "counter", "Requests rejected for lack of a slot, per route and reason.",
+         [({"route": route, "reason": reason}, count) for route, s in routes for reason, count in s["rejected"].items()]),
+    ]
+    if stats["rate_limit"] is not None:
+        samples.append(("rate_limited_total", "counter", "Requests rejected by the per-client rate limit.", [({}, stats["rate_limit"]["limited"])]))
+    return samples
+
+def collect_resume_metrics():
+    """Resume index size, files by extraction status, extractions in flight and uploads in progress."""
+    index = resume_index.stats()
+    ingest = resume_ingestor.stats()
+    return [
+        ("resume_index_candidates", "gauge", "Candidates in the resume search index.", [({}, index["candidates"])]),
+        ("resume_files", "gauge", "Stored resume files by extraction status.", [({"status": status}, count) for status, count in index["files"].items()]),
+        ("resume_extractions_pending", "gauge", "Resume text extractions queued or running.", [({}, ingest["pending"])]),
+        ("resume_uploads_active", "gauge", "Chunked resume uploads in progress.", [({}, ingest["uploads"]["active"])]),
+        ("resume_searches_total", "counter", "Resume searches served.", [({}, index["searches"])]),
+    ]
+
+metrics.REGISTRY.register_collector(collect_cache_and_job_metrics)
+metrics.REGISTRY.register_collector(collect_admission_metrics)
+metrics.REGISTRY.register_collector(collect_resume_metrics)
+
+@app.route("/api/admission/stats", methods=["GET"])
+def admission_stats():
+    """Slots in use, queue depth, average hold time and rejection counts per limited route."""
+    return jsonify(admission.stats())
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Request durations, in-flight requests, Supabase call and step timings in the Prometheus text format."""
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+# --- REQUEST PROFILES ---
+def profile_access_error():
+    if profiler.admin_token is None:
+        return jsonify({"error": "Profile endpoints are disabled; set PROFILE_ADMIN_TOKEN."}), 404
+    if not profiler.is_admin(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": f"A valid {PROFILE_HEADER} header is required."}), 403
+    return None
+
+@app.route("/api/profiles", methods=["GET"])
+def list_request_profiles():
+    """Captured request profiles, newest first."""
+    error = profile_access_error()
+    if error:
+        return error
+    return jsonify({"directory": profiler.directory, "keep": profiler.keep, "profiles": profiler.list_profiles()})
+
+@app.route("/api/profiles/<profile_id>", methods=["GET"])
+def request_profile_top_functions(profile_id):
+    """Top-N functions of one profile; ?top=25&sort=cumulative|tottime|calls."""
+    error = profile_access_error()
+    if error:
+        return error
+    try:
+        limit = max(1, min(int(request.args.get("top", "25")), 500))
+    except ValueError:
+        return jsonify({"error": "'top' must be an integer."}), 400
+    result = profiler.top_functions(profile_id, limit, request.args.get("sort", "cumulative"))
+    if result is None:
+        return jsonify({"error": "Profile not found."}), 404
+    return jsonify(result)
+
+# --- ADMIN DASHBOARD ---
+RECENT_ACTIVITY_LIMIT = 5
+
+def count_rows(table, params):
+    """Exact row count for a filter; one single-row request."""
+    response = supabase.get(table, params={"select": "id", **params, "limit": "1"}, prefer="count=exact")
+    if response.status_code not in (200, 206):
+        raise Exception(f"Supabase error counting {table}: {response.text}")
+    return int(response.headers.get("Content-Range", "").rpartition("/")[2] or len(response.json()))
+
+def fetch_recent_activity():
+    response = supabase.get("schedules", params={
+        "select": "id,event_name,date,status,candidate:candidate_id(full_name)",
+        "status": "in.(Scheduled,Completed)",
+        "order": "date.desc",
+        "limit": str(RECENT_ACTIVITY_LIMIT)
+    })
+    if response.status_code != 200:
+        raise Exception(f"Supabase error fetching recent activity: {response.text}")
+    return response.json()
+
+def load_dashboard_stats(today):
+    """All dashboard counters plus recent activity, read concurrently. Dates are UTC, as on the dashboard."""
+    first_of_month = today.replace(day=1).isoformat()
+    total, scheduled_today, upcoming, completed, recent = supabase.gather(
+        lambda: count_rows("users", {"role": "eq.candidate"}),
+        lambda: count_rows("schedules", {"date": f"eq.{today.isoformat()}", "status": "eq.Scheduled"}),
+        lambda: count_rows("schedules", {"date": f"gte.{today.isoformat()}", "status": "eq.Scheduled"}),
+        lambda: count_rows("schedules", {"date": f"gte.{first_of_month}", "status": "eq.Completed"}),
+        fetch_recent_activity,
+    )
+    return {
+        "date": today.isoformat(),
+        "total_candidates": total,
+        "scheduled_today": scheduled_today,
+        "upcoming_evaluations": upcoming,
+        "completed_this_month": completed,
+        "recent_activity": recent,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+@app.route("/api/dashboard/stats", methods=["GET"])
+def dashboard_stats():
+    """Admin dashboard counters. Concurrent requests within DASHBOARD_STATS_TTL share one set of upstream reads."""
+    today = datetime.now(timezone.utc).date()
+    try:
+        with supabase.deadline(REQUEST_DEADLINE):
+            stats = dashboard_cache.get_or_load(today, lambda: load_dashboard_stats(today))
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching dashboard stats: {str(e)}"}), 504
+    except Exception as e:
+        return jsonify({"error": f"Error fetching dashboard stats: {str(e)}"}), 500
+
+    response = jsonify(stats)
+    response.headers["Cache-Control"] = f"private, max-age={int(DASHBOARD_STATS_TTL)}"
+    return response
+
+# --- CANDIDATE DIRECTORY ---
+CANDIDATE_USER_COLUMNS = "uid,full_name,profile_image_url,resume_url"
+CANDIDATE_PROFILE_COLUMNS = "user_id,position_applied_for,final_verdict"
+CANDIDATE_SCHEDULE_COLUMNS = "id,candidate_id,round_type,status,date,start_time"
+# Only the totals are read from each summary, not its comment index.
+CANDIDATE_SCORE_COLUMNS = "candidate_uid,evaluation_count,total_score:summary->total_score,total_max_score:summary->total_max_score"
+
+def load_candidate_scores(summaries, counts):
+    """Score percentage per candidate from their stored summary, or from their evaluations' totals when the
+    summary is missing or covers a different number of evaluations than `counts`."""
+    stored = {row["candidate_uid"]: row for row in summaries}
+    scores = {
+        candidate_id: score_pct(row.get("total_score"), row.get("total_max_score"))
+        for candidate_id, row in stored.items() if row.get("evaluation_count") == counts.get(candidate_id, 0)
+    }
+    stale = [candidate_id for candidate_id, count in counts.items() if count and candidate_id not in scores]
+    totals = {candidate_id: [0, 0] for candidate_id in stale}
+    local = local_replica("evaluations")
+    for chunk in _id_chunks(stale):
+        if local is not None:
+            rows = local_evaluations(local, chunk, "candidate_uid,total_score,total_max_score", ("id",))
+        else:
+            rows = supabase.get_all("evaluations", params={
+                "select": "candidate_uid,total_score,total_max_score",
+                "candidate_uid": f"in.({','.join(chunk)})",
+                "is_complete": "eq.true",
+                "order": "id"
+            })
+        for row in rows:
+            totals[row["candidate_uid"]][0] += row.get("total_score") or 0
+            totals[row["candidate_uid"]][1] += row.get("total_max_score") or 0
+    scores.update((candidate_id, score_pct(score, max_score)) for candidate_id, (score, max_score) in totals.items())
+    return scores
+
+def load_candidate_directory():
+    """Every candidate with their position, schedules and score percentage, for the candidate index."""
+    # With SCORE_SUMMARIES=0 there are no stored totals, so every candidate counts as unscored.
+    def load_summaries():
+        if not SCORE_SUMMARIES_ENABLED:
+            return []
+        return supabase.get_all(SUMMARY_TABLE, params={"select": CANDIDATE_SCORE_COLUMNS, "order": "candidate_uid"})
+
+    def load_counts():
+        return count_completed_evaluations() if SCORE_SUMMARIES_ENABLED else {}
+
+    local = local_replica("users", "candidate_profiles", "schedules")
+    if local is not None:
+        # Summaries are not replicated; they stay one narrow read.
+        users = local.select("users", CANDIDATE_USER_COLUMNS.split(","), where={"role": "candidate"}, order=("uid",))
+        profiles = local.select("candidate_profiles", CANDIDATE_PROFILE_COLUMNS.split(","), order=("user_id",))
+        schedules = local.select("schedules", CANDIDATE_SCHEDULE_COLUMNS.split(","), order=("id",))
+        summaries, counts = supabase.gather(load_summaries, load_counts)
+    else:
+        users, profiles, schedules, summaries, counts = supabase.gather(
+            lambda: supabase.get_all("users", params={"select": CANDIDATE_USER_COLUMNS, "role": "eq.candidate", "order": "uid"}),
+            lambda: supabase.get_all("candidate_profiles", params={"select": CANDIDATE_PROFILE_COLUMNS, "order": "user_id"}),
+            lambda: supabase.get_all("schedules", params={"select": CANDIDATE_SCHEDULE_COLUMNS, "order": "id"}),
+            load_summaries,
+            load_counts,
+        )
+    return users, profiles, schedules, load_candidate_scores(summaries, counts)
+
+@app.route("/api/candidates", methods=["GET"])
+def list_candidates():
+    """One page of the candidate directory, browsed by name or searched with ?q= (prefix and fuzzy).
+
+    Filters: ?position=, ?round_status= (optionally for one ?round=), ?score_band= (low, medium, high,
+    unscored or e.g. 60-80). Pass the previous page's `next_cursor` as ?cursor= for the next page.
+    """
+    try:
+        limit = int(request.args.get("limit", CANDIDATE_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer."}), 400
+    limit = max(1, min(limit, CANDIDATE_PAGE_MAX))
+    try:
+        filters = CandidateFilters(
+            position=request.args.get("position"),
+            round_status=request.args.get("round_status"),
+            round_type=request.args.get("round"),
+            score_band=request.args.get("score_band"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        candidate_index.ensure_loaded()
+    except Exception as e:
+        print(f"--- CANDIDATE INDEX ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+        return jsonify({"error": f"Failed to load candidates: {str(e)}"}), 500
+
+    q, cursor = request.args.get("q", ""), request.args.get("cursor")
+    # The index version is part of the key, so any candidate, schedule or score change retires cached pages.
+    key = (candidate_index.version, normalize(q), filters.key(), cursor, limit)
+    try:
+        page = candidate_page_cache.get_or_load(key, lambda: candidate_index.page(q, filters, cursor, limit))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({**page, "limit": limit})
+
+@app.route("/api/candidates/stats", methods=["GET"])
+def candidate_directory_stats():
+    return jsonify({**candidate_index.stats(), "page_cache": candidate_page_cache.stats()})
+
+# --- RESUME INGESTION & SEARCH ---
+RESUME_PROFILE_COLUMNS = "user_id,resume_url,academic_details,experience_details,computer_skills"
+
+def index_candidate_profiles(profiles):
+    """Adds saved (uid, profile) pairs to the resume index. The candidate is already saved, so failures are only logged."""
+    try:
+        resume_index.upsert_candidates(profiles)
+    except Exception:
+        print(f"--- RESUME INDEX ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+
+def upload_error_response(error):
+    return jsonify({"error": str(error), **error.details}), error.status
+
+@app.route("/api/resumes/uploads", methods=["POST", "OPTIONS"])
+def start_resume_upload():
+    """Opens a chunked upload for {filename, size, sha256?}. A sha256 that is already stored skips the upload."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    sha256 = data.get("sha256")
+    known = resume_index.file(sha256) if isinstance(sha256, str) else None
+    if known is not None:
+        return jsonify({"duplicate": True, "sha256": sha256, "resume_url": known["resume_url"], "status": known["status"]})
+    try:
+        session = resume_uploads.start(data.get("filename"), data.get("size"), sha256)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({"upload_id": session.id, "chunk_size": resume_uploads.chunk_size, "received": 0}), 201
+
+@app.route("/api/resumes/uploads/<upload_id>", methods=["PUT", "DELETE", "OPTIONS"])
+def resume_upload_chunk(upload_id):
+    """PUT ?offset=N with the raw chunk as the body; DELETE abandons the upload."""
+    if request.method == "OPTIONS":
+        return handle_options()
+    if request.method == "DELETE":
+        if not resume_uploads.cancel(upload_id):
+            return jsonify({"error": "Unknown or expired upload."}), 404
+        return jsonify({"message": "Upload cancelled."})
+
+    try:
+        offset = int(request.args.get("offset", "0"))
+    except ValueError:
+        return jsonify({"error": "offset must be an integer."}), 400
+    try:
+        received = resume_uploads.write_chunk(upload_id, offset, request.stream, request.content_length)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({"upload_id": upload_id, "received": received})
+
+@app.route("/api/resumes/uploads/<upload_id>/complete", methods=["POST", "OPTIONS"])
+def complete_resume_upload(upload_id):
+    """Verifies and stores the upload, then queues text extraction. Returns the resume_url to save on the profile."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    try:
+        result = resume_ingestor.complete_upload(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        print(f"--- RESUME UPLOAD ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+        return jsonify({"error": f"Failed to store resume: {str(e)}"}), 500
+    return jsonify(result), 200 if result["duplicate"] else 201
+
+@app.route("/api/resumes/search", methods=["GET"])
+def search_resumes():
+    """Candidates whose resume text or academic, experience and skills fields contain every word of ?q=, best first.
+
+    The last word also matches as a prefix. Page with ?limit= and ?offset=.
+    """
+    start = time.perf_counter()
+    try:
+        limit = max(1, min(int(request.args.get("limit", "20")), RESUME_SEARCH_MAX))
+        offset = max(0, int(request.args.get("offset", "0")))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers."}), 400
+    items, total = resume_index.search(request.args.get("q", ""), limit, offset)
+
+    try:
+        candidate_index.ensure_loaded()
+    except Exception:
+        # Names are a convenience here; the matches themselves come from the local index.
+        print(f"--- CANDIDATE INDEX ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+    for item in items:
+        candidate = candidate_index.get(item["candidate_uid"]) or {}
+        item.update(full_name=candidate.get("full_name"), position=candidate.get("position"),
+                    profile_image_url=candidate.get("profile_image_url"))
+    return jsonify({"items": items, "total": total, "limit": limit, "offset": offset,
+                    "took_ms": round((time.perf_counter() - start) * 1000, 2)})
+
+@app.route("/api/resumes/stats", methods=["GET"])
+def resume_index_stats():
+    return jsonify({"index": resume_index.stats(), "ingest": resume_ingestor.stats()})
+
+@app.route("/api/resumes/<sha256>", methods=["GET"])
+def resume_status(sha256):
+    """A stored resume's URL, size and extraction status (queued, done, failed or unsupported)."""
+    resume = resume_index.file(sha256)
+    if resume is None:
+        return jsonify({"error": "Unknown resume."}), 404
+    return jsonify(resume)
+
+@app.cli.command("reindex-resumes")
+@click.option("--rebuild", is_flag=True, help="Empty the index first instead of updating it in place.")
+def reindex_resumes_command(rebuild):
+    """Brings the resume index up to date with candidate_profiles and the stored resumes.
+
+    Resumes uploaded before ingestion existed, and extractions that failed or were interrupted, are (re)processed.
+    """
+    if rebuild:
+        resume_index.clear()
+    candidate_ids, urls = [], set()
+    for page in supabase.get_pages("candidate_profiles", params={"select": RESUME_PROFILE_COLUMNS, "order": "user_id"}):
+        resume_index.upsert_candidates([(row["user_id"], row) for row in page])
+        candidate_ids.extend(row["user_id"] for row in page)
+        urls.update(row["resume_url"] for row in page if row.get("resume_url"))
+    removed = resume_index.remove_candidates_except(candidate_ids)
+
+    unreadable = 0
+    for url in sorted(urls):
+        try:
+            resume_ingestor.ingest_url(url)
+        except Exception as e:
+            unreadable += 1
+            click.echo(f"{url}: {e}")
+    resume_ingestor.wait()
+    resume_index.optimize()
+    stats = resume_index.stats()
+    click.echo(f"Indexed {len(candidate_ids)} candidates ({removed} removed) and {len(urls)} resume URLs "
+               f"({unreadable} unreadable); files by status: {stats['files']}.")
+
+# --- LOCAL READ REPLICA ---
+def local_replica(*tables):
+    """The local replica if it is enabled and fresh for every table in `tables`, else None (read Supabase)."""
+    if replica is not None and replica.usable(*tables):
+        return replica
+    return None
+
+def replicate(table, rows=(), deleted=()):
+    """Applies this backend's own writes to the local replica. A failure only delays them until the next sync."""
+    if replica is None:
+        return
+    try:
+        if rows:
+            replica.apply(table, rows)
+        if deleted:
+            replica.remove(table, deleted)
+    except Exception as e:
+        print(f"Local replica write-through to {table} failed: {e}")
+
+def replicate_inserted_profiles(user_ids):
+    """Re-reads newly inserted profiles and applies them to the replica.
+
+    The posted payloads lack updated_at and the columns Supabase fills in by
+    default, so the rows are read back rather than replicated as sent.
+    """
+    if replica is None or not user_ids:
+        return
+    try:
+        rows = [row for chunk in _id_chunks(user_ids) for row in supabase.get_all("candidate_profiles", params={
+            "select": "*", "user_id": f"in.({','.join(chunk)})", "order": "user_id"
+        })]
+    except Exception as e:
+        print(f"Local replica write-through to candidate_profiles failed: {e}")
+        return
+    replicate("candidate_profiles", rows)
+
+def local_evaluations(local, candidate_ids, columns, order, round_type=None):
+    """Completed evaluations of `candidate_ids` from the replica, shaped like the PostgREST select of `columns`.
+
+    An `alias:fk_column(fields)` embed of the evaluator is filled in from the replicated users.
+    """
+    where = {"candidate_uid": list(candidate_ids), "is_complete": True}
+    if round_type:
+        where["round_type"] = round_type
+    rows = local.select("evaluations", where=where, order=order)
+    fields = columns.split(",")
+    plain = [field for field in fields if "(" not in field]
+    embeds = []
+    for field in fields:
+        if "(" in field:
+            alias, _, embed = field.partition(":")
+            fk_column, _, embedded = embed.rstrip(")").partition("(")
+            embeds.append((alias, fk_column, embedded.split(",")))
+    users = {}
+    if embeds:
+        uids = {row.get(fk_column) for row in rows for _, fk_column, _ in embeds} - {None}
+        users = {user["uid"]: user for user in local.select("users", where={"uid": sorted(uids)})}
+    result = []
+    for row in rows:
+        item = {field: row.get(field) for field in plain}
+        for alias, fk_column, embedded in embeds:
+            user = users.get(row.get(fk_column))
+            item[alias] = {field: user.get(field) for field in embedded} if user else None
+        result.append(item)
+    return result
+
+def collect_replica_metrics():
+    """Seconds since each replicated table's last sync and its row count, plus reads served locally vs from Supabase."""
+    if replica is None:
+        return []
+    stats = replica.stats()
+    tables = stats["tables"].items()
+    return [
+        ("replica_lag_seconds", "gauge", "Seconds since the last successful sync, per replicated table.",
+         [({"table": name}, table["lag_seconds"]) for name, table in tables if table["lag_seconds"] is not None]),
+        ("replica_rows", "gauge", "Rows in the local replica, per table.", [({"table": name}, table["rows"]) for name, table in tables]),
+        ("replica_reads_total", "counter", "Reads that could use the local replica, by where they were served from.",
+         [({"source": "replica"}, stats["local_reads"]), ({"source": "supabase"}, stats["fallback_reads"])]),
+    ]
+
+metrics.REGISTRY.register_collector(collect_replica_metrics)
+
+@app.route("/api/replica/stats", methods=["GET"])
+def replica_stats():
+    """Per-table rows, watermark, lag and last error of the local replica, and reads served from it."""
+    if replica is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **replica.stats()})
+
+@app.cli.command("replica-resync")
+@click.option("--table", "tables", multiple=True, type=click.Choice([table.name for table in REPLICATED_TABLES]),
+              help="Replicated table to rebuild (repeatable); all by default.")
+def replica_resync_command(tables):
+    """Rebuilds the local replica from a full read of Supabase."""
+    if replica is None:
+        raise click.UsageError("REPLICA_PATH is not set.")
+    for table in tables or replica.tables:
+        started = time.perf_counter()
+        copied = replica.resync(table)
+        click.echo(f"{table}: {copied} rows in {time.perf_counter() - started:.1f} s.")
+
+# --- SCHEDULES & CHANGE FEED ---
+SCHEDULE_COLUMNS = "*,candidate:users!schedules_candidate_id_fkey(full_name,profile_image_url)"
+SCHEDULE_REQUIRED_FIELDS = ("candidate_id", "round_type", "date", "start_time", "end_time")
+SCHEDULE_EDITABLE_FIELDS = (
+    "event_name", "notes", "date", "start_time", "end_time", "duration_minutes", "round_type", "mode",
+    "location", "candidate_id", "evaluator_uids", "status",
+)
+
+SCHEDULE_SLOT_COLUMNS = "id," + ",".join(SLOT_FIELDS)
+
+def load_schedule_slots():
+    """Blocking schedules from yesterday on (older ones cannot clash with anything being booked)."""
+    yesterday = date.today() - timedelta(days=1)
+    statuses = ",".join(f'"{status}"' for status in BLOCKING_STATUSES)
+    return supabase.get_all("schedules", params={
+        "select": SCHEDULE_SLOT_COLUMNS, "status": f"in.({statuses})", "date": f"gte.{yesterday.isoformat()}", "order": "id",
+    })
+
+def publish_schedule_change(op, schedule, previous=None):
+    """Sends one schedule insert/update/delete to stream subscribers, the schedule book, the candidate index
+    and dashboard counters."""
+    dashboard_cache.clear()
+    schedule_book.apply_schedule(op, schedule)
+    candidate_index.apply_schedule(op, schedule)
+    data = {"op": op, "schedule": schedule}
+    if previous is not None:
+        data["previous"] = {key: previous.get(key) for key in ("candidate_id", "evaluator_uids", "status")}
+    schedule_events.publish("schedule", data)
+
+def schedule_subscriber_filter(evaluator=None, candidate=None):
+    """Matches changes to schedules of one evaluator and/or candidate, before or after the change."""
+    if not evaluator and not candidate:
+        return None
+
+    def matches(event):
+        for schedule in (event["data"]["schedule"], event["data"].get("previous")):
+            if not schedule:
+                continue
+            if evaluator and evaluator not in (schedule.get("evaluator_uids") or []):
+                continue
+            if candidate and schedule.get("candidate_id") != candidate:
+                continue
+            return True
+        return False
+    return matches
+
+def find_schedule_conflicts(proposal, ignore_id=None):
+    """Bookings that clash with `proposal` (none if it does not hold a slot). Raises ValueError for bad times."""
+    if proposal.get("status") not in BLOCKING_STATUSES:
+        return []
+    schedule_book.ensure_loaded()
+    return schedule_book.conflicts(proposal, ignore_id=ignore_id)
+
+def schedule_conflict_response(conflicts):
+    return jsonify({
+        "error": "The schedule overlaps existing bookings. Send allow_conflicts=true to save it anyway.",
+        "conflicts": conflicts,
+    }), 409
+
+@app.route("/api/schedules", methods=["POST", "OPTIONS"])
+def create_schedule():
+    """Creates a schedule (pending approval unless a status is given) and publishes it.
+
+    Overlaps with an evaluator's, the candidate's or the room's other bookings are rejected with 409 and the
+    list of conflicts, unless `allow_conflicts` is set; the conflicts are then returned with the schedule.
+    """
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    missing = [field for field in SCHEDULE_REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        return jsonify({"error": f"Missing required fields: {', '.join(missing)}."}), 400
+    if not isinstance(data.get("evaluator_uids"), list) or not data["evaluator_uids"]:
+        return jsonify({"error": "'evaluator_uids' must be a non-empty list."}), 400
+
+    payload = {field: data[field] for field in (*SCHEDULE_EDITABLE_FIELDS, "created_by_uid") if field in data}
+    payload.setdefault("status", "Pending Approval")
+    with schedule_write_lock:
+        try:
+            conflicts = find_schedule_conflicts(payload)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if conflicts and not data.get("allow_conflicts"):
+            return schedule_conflict_response(conflicts)
+        response = supabase.post("schedules", json=payload, params={"select": SCHEDULE_COLUMNS})
+        if response.status_code not in (200, 201):
+            return jsonify({"error": "Failed to create schedule.", "supabase_error": response.text}), 500
+        schedule = response.json()[0]
+        replicate("schedules", [schedule])
+        publish_schedule_change("insert", schedule)
+    return jsonify({**schedule, "conflicts": conflicts}), 201
+
+@app.route("/api/schedules/<schedule_id>", methods=["PATCH", "DELETE", "OPTIONS"])
+def modify_schedule(schedule_id):
+    """PATCH updates editable fields (e.g. status for approval or completion); DELETE removes the schedule."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    params = {"id": f"eq.{schedule_id}", "select": SCHEDULE_COLUMNS}
+    previous = None
+    conflicts = []
+    data = request.get_json(silent=True) or {}
+    updates = {field: data[field] for field in SCHEDULE_EDITABLE_FIELDS if field in data}
+    if request.method == "PATCH" and not updates:
+        return jsonify({"error": f"Nothing to update. Editable fields: {', '.join(SCHEDULE_EDITABLE_FIELDS)}."}), 400
+
+    with schedule_write_lock:
+        if request.method == "DELETE":
+            response = supabase.request("DELETE", f"{supabase.rest_url}/schedules", params=params)
+        else:
+            if any(field in updates for field in SLOT_FIELDS):
+                previous = schedule_book.booking(schedule_id) if schedule_book.loaded_at else None
+                if previous is None:
+                    before = supabase.get("schedules", params={"id": f"eq.{schedule_id}", "select": SCHEDULE_SLOT_COLUMNS})
+                    previous = (before.json() or [None])[0] if before.status_code == 200 else None
+            # Moving between holding states (approval, completion) keeps the slot; anything else is re-checked.
+            slot_moved = any(field in updates for field in SLOT_FIELDS if field != "status") or (
+                previous is not None and previous.get("status") not in BLOCKING_STATUSES)
+            if previous is not None and slot_moved:
+                try:
+                    conflicts = find_schedule_conflicts({**previous, **updates}, ignore_id=schedule_id)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+                if conflicts and not data.get("allow_conflicts"):
+                    return schedule_conflict_response(conflicts)
+            response = supabase.request("PATCH", f"{supabase.rest_url}/schedules", params=params, json=updates)
+
+        if response.status_code != 200:
+            return jsonify({"error": "Failed to modify schedule.", "supabase_error": response.text}), 500
+        rows = response.json()
+        if not rows:
+            return jsonify({"error": "Schedule not found."}), 404
+
+        op = "delete" if request.method == "DELETE" else "update"
+        if op == "delete":
+            replicate("schedules", deleted=[row["id"] for row in rows])
+        else:
+            replicate("schedules", rows)
+        # Subscribers filtered on the old evaluator or candidate still need to see the schedule leave.
+        publish_schedule_change(op, rows[0], previous if "evaluator_uids" in updates or "candidate_id" in updates else None)
+    return jsonify({**rows[0], "conflicts": conflicts} if op == "update" else rows[0])
+
+@app.route("/api/schedules/check", methods=["POST", "OPTIONS"])
+def check_schedule_conflicts():
+    """Lists the bookings a proposed (or edited, with `schedule_id`) schedule would overlap, without saving it."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    proposal = {field: data.get(field) for field in SLOT_FIELDS}
+    proposal["status"] = proposal["status"] or "Pending Approval"
+    try:
+        conflicts = find_schedule_conflicts(proposal, ignore_id=data.get("schedule_id"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"conflicts": conflicts, "ok": not conflicts})
+
+def parse_panels(panels):
+    """Panels as [{"evaluator_uids": [...], "location": ...}]; plain lists of evaluator IDs are accepted too."""
+    if not isinstance(panels, list) or not panels:
+        raise ValueError("'panels' must be a non-empty list.")
+    parsed = []
+    for panel in panels:
+        panel = {"evaluator_uids": panel} if isinstance(panel, list) else panel
+        if not isinstance(panel, dict) or not isinstance(panel.get("evaluator_uids"), list) or not panel["evaluator_uids"]:
+            raise ValueError("Each panel needs a non-empty 'evaluator_uids' list.")
+        parsed.append({"evaluator_uids": panel["evaluator_uids"], "location": panel.get("location")})
+    return parsed
+
+@app.route("/api/schedules/auto-slot", methods=["POST", "OPTIONS"])
+def auto_slot_round():
+    """Plans one round for a position: every candidate without that round gets the earliest free panel slot.
+
+    Body: round_type, panels ([[evaluator uid, ...]] or [{"evaluator_uids", "location"}]), date_from, date_to,
+    optional weekdays (ISO, 1=Mon), day_start/day_end ("09:00"/"17:00"), duration_minutes, buffer_minutes,
+    mode, and candidate_ids or a position (its candidates still missing the round). With "commit": true the
+    plan is saved as schedules pending approval; otherwise it is only returned.
+    """
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    if not data.get("round_type"):
+        return jsonify({"error": "'round_type' is required."}), 400
+    try:
+        panels = parse_panels(data.get("panels"))
+        weekdays = set(data["weekdays"]) if data.get("weekdays") else None
+        dates = date_range(data.get("date_from") or "", data.get("date_to") or data.get("date_from") or "", weekdays)
+        duration = int(data.get("duration_minutes") or 0)
+        buffer = int(data.get("buffer_minutes") or 0)
+        if duration <= 0 or buffer < 0:
+            raise ValueError("duration_minutes must be positive and buffer_minutes not negative.")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        schedule_book.ensure_loaded()
+        candidate_ids = data.get("candidate_ids")
+        if candidate_ids is None:
+            if not data.get("position"):
+                return jsonify({"error": "Give 'candidate_ids' or a 'position' to schedule."}), 400
+            candidate_index.ensure_loaded()
+            candidate_ids = candidate_index.candidates_for_round(data["position"], data["round_type"])
+        if len(candidate_ids) > BULK_MAX_ROWS:
+            return jsonify({"error": f"Too many candidates ({len(candidate_ids)}). The limit is {BULK_MAX_ROWS}."}), 413
+
+        with schedule_write_lock:
+            started = time.perf_counter()
+            assignments, unplaced = schedule_book.auto_slot(
+                candidate_ids, panels, dates, data.get("day_start") or "09:00", data.get("day_end") or "17:00",
+                duration, buffer=buffer, mode=data.get("mode") or "Online",
+            )
+            planning_ms = round((time.perf_counter() - started) * 1000, 2)
+            if not data.get("commit") or not assignments:
+                return jsonify({"assignments": assignments, "unplaced": unplaced, "planning_ms": planning_ms, "committed": False})
+
+            rows = []
+            for assignment in assignments:
+                candidate = candidate_index.get(assignment["candidate_id"]) if candidate_index.loaded_at else None
+                name = candidate["full_name"] if candidate else None
+                rows.append({
+                    **assignment, "round_type": data["round_type"], "status": "Pending Approval",
+                    "event_name": f"{name} - {data['round_type']}" if name else data["round_type"],
+                    "created_by_uid": data.get("created_by_uid"),
+                })
+            response = supabase.post("schedules", json=rows, params={"select": SCHEDULE_COLUMNS})
+            if response.status_code not in (200, 201):
+                return jsonify({"error": "Failed to save the planned schedules.", "supabase_error": response.text}), 500
+            created = response.json()
+            replicate("schedules", created)
+            for schedule in created:
+                publish_schedule_change("insert", schedule)
+        return jsonify({"assignments": created, "unplaced": unplaced, "planning_ms": planning_ms, "committed": True}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"--- AUTO-SLOT ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+        return jsonify({"error": f"Auto-slotting failed: {str(e)}"}), 500
+
+@app.route("/api/schedules/book/stats", methods=["GET"])
+def schedule_book_stats():
+    return jsonify(schedule_book.stats())
+
+@app.route("/api/stream/schedules", methods=["GET"])
+def stream_schedule_changes():
+    """Server-Sent Events feed of schedule changes.
+
+    Optional filters: ?evaluator=<uid>, ?candidate=<uid>. Reconnecting clients
+    send Last-Event-ID (or ?last_event_id=) and receive what they missed; a
+    'ready' or 'reset' event tells the client to load its full list instead.
+    """
+    predicate = schedule_subscriber_filter(request.args.get("evaluator"), request.args.get("candidate"))
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    subscription, replay, head_id, resumed = schedule_events.subscribe(last_event_id, predicate)
+
+    preamble = [format_sse(retry=3000)]
+    if not resumed:
+        preamble.append(format_sse({"id": head_id, "type": "reset" if last_event_id else "ready", "data": {}}))
+    response = Response(stream_events(subscription, replay, SSE_HEARTBEAT, preamble), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (nginx) from buffering the stream.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route("/api/stream/schedules/stats", methods=["GET"])
+def schedule_stream_stats():
+    return jsonify(schedule_events.stats())
+
 # --- DYNAMIC REPORT GENERATION FUNCTION ---
-def fetch_candidate_data_for_report(candidate_id):
+REPORT_PROFILE_COLUMNS = "user_id,first_name,surname,position_applied_for,final_verdict"
+REPORT_EVALUATION_COLUMNS = "id,candidate_uid,round_type,total_score,total_max_score,quantitative_scores,qualitative_comments,evaluator:evaluator_uid(full_name)"
+
+# Evaluation column whose latest value stamps a report version
+REPORT_VERSION_COLUMN = os.getenv("REPORT_VERSION_COLUMN", "submission_time")
+
+# Keeps `in.(...)` filters well inside URL length limits.
+REPORT_ID_CHUNK_SIZE = 150
+
+def build_candidate_info(profile):
+    """Maps a candidate_profiles row (or None) onto the report's candidate_info block."""
+    if not profile:
+        return {"name": "Unknown Candidate", "position": "N/A", "final_verdict": "N/A"}
+    return {
+        "name": f"{profile.get('first_name', '')} {profile.get('surname', '')}".strip(),
+        "position": profile.get("position_applied_for") or "N/A",
+        "final_verdict": profile.get("final_verdict") or "N/A"
+    }
+
+def fetch_candidate_data_for_report(candidate_id, with_responses=True, expected_count=None):
     """Fetches and aggregates real data from Supabase for report generation."""
-    headers = get_supabase_headers(prefer_header="return=representation")
+    expected_counts = {candidate_id: expected_count} if expected_count is not None else None
+    return fetch_candidates_data_for_report([candidate_id], with_responses, expected_counts)[candidate_id]
 
-    # 1. Fetch Candidate Profile Info
-    profile_url = f"{SUPABASE_REST_URL}/candidate_profiles"
-    profile_params = {"select": "first_name,surname,position_applied_for,final_verdict", "user_id": f"eq.{candidate_id}"}
-    profile_response = requests.get(profile_url, headers=headers, params=profile_params)
-    
-    if profile_response.status_code != 200 or not profile_response.json():
-        candidate_info = {"name": "Unknown Candidate", "position": "N/A", "final_verdict": "N/A"}
+def load_report_summaries(candidate_ids):
+    """Stored score summaries for the candidates that have one, or {} if they cannot be read."""
+    if not SCORE_SUMMARIES_ENABLED:
+        return {}
+    try:
+        summaries = summary_store.load_many(candidate_ids)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"Score summaries unavailable, aggregating raw evaluations: {e}")
+        return {}
+    return summaries
+
+def count_completed_evaluations(candidate_ids=None):
+    """Candidate ID -> number of completed evaluations, reading only the candidate column.
+
+    Every candidate in `candidate_ids` is present (0 if they have none); without IDs, every candidate is counted.
+    """
+    local = local_replica("evaluations")
+    if local is not None:
+        where = {"is_complete": True}
+        if candidate_ids is not None:
+            where["candidate_uid"] = list(candidate_ids)
+        counts = local.count("evaluations", "candidate_uid", where)
     else:
-        profile = profile_response.json()[0]
-        candidate_info = {
-            "name": f"{profile.get('first_name', '')} {profile.get('surname', '')}".strip(),
-            "position": profile.get("position_applied_for", "N/A"),
-            "final_verdict": profile.get("final_verdict", "N/A")
-        }
+        counts = Counter()
+        for chunk in [None] if candidate_ids is None else _id_chunks(list(candidate_ids)):
+            params = {"select": "candidate_uid", "is_complete": "eq.true", "order": "id"}
+            if chunk is not None:
+                params["candidate_uid"] = f"in.({','.join(chunk)})"
+            counts.update(row["candidate_uid"] for row in supabase.get_all("evaluations", params=params))
+    return {**{candidate_id: 0 for candidate_id in candidate_ids or ()}, **counts}
 
-    # 2. Fetch all completed evaluations
-    evals_url = f"{SUPABASE_REST_URL}/evaluations"
-    evals_params = {
-        "select": "round_type,total_score,total_max_score,quantitative_scores,qualitative_comments",
-        "candidate_uid": f"eq.{candidate_id}",
-        "is_complete": "eq.true"
-    }
-    evals_response = requests.get(evals_url, headers=headers, params=evals_params)
-    
-    if evals_response.status_code != 200:
-        raise Exception(f"Supabase error fetching evaluations: {evals_response.text}")
+def load_report_counts(candidate_ids):
+    """Completed evaluation counts for checking summaries, or {} (no summary is trusted) if they cannot be read."""
+    try:
+        return count_completed_evaluations(candidate_ids)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"Evaluation counts unavailable, aggregating raw evaluations: {e}")
+        return {}
+
+def repair_score_summaries(evaluations_by_candidate):
+    """Replaces missing or stale stored summaries with ones rebuilt from the evaluations just read."""
+    rebuilt = {candidate_id: build_summary(rows) for candidate_id, rows in evaluations_by_candidate.items() if rows}
+    if not rebuilt:
+        return
+    try:
+        summary_store.save_many(rebuilt)
+    except Exception as e:
+        print(f"Could not store rebuilt score summaries: {e}")
+
+def _id_chunks(candidate_ids):
+    return [candidate_ids[start:start + REPORT_ID_CHUNK_SIZE] for start in range(0, len(candidate_ids), REPORT_ID_CHUNK_SIZE)]
+
+def _fetch_report_profiles(chunk):
+    local = local_replica("candidate_profiles")
+    if local is not None:
+        return local.select("candidate_profiles", REPORT_PROFILE_COLUMNS.split(","), where={"user_id": chunk})
+    # A failed lookup falls back to "Unknown Candidate"
+    response = supabase.get("candidate_profiles", params={"select": REPORT_PROFILE_COLUMNS, "user_id": f"in.({','.join(chunk)})"})
+    return response.json() if response.status_code == 200 else []
+
+def _fetch_report_evaluations(chunk):
+    local = local_replica("evaluations", "users")
+    if local is not None:
+        return local_evaluations(local, chunk, REPORT_EVALUATION_COLUMNS, ("submission_time", "id"))
+    # Paged, since responses are row-capped
+    return supabase.get_all("evaluations", params={
+        "select": REPORT_EVALUATION_COLUMNS,
+        "candidate_uid": f"in.({','.join(chunk)})",
+        "is_complete": "eq.true",
+        "order": "submission_time,id"
+    })
+
+def fetch_candidates_data_for_report(candidate_ids, with_responses=True, expected_counts=None):
+    """Fetches and aggregates report data for many candidates with set-based queries.
+
+    Profiles and completed evaluations are read with `in.(...)` filters in
+    chunks, so N candidates cost two requests per chunk instead of 2 x N, and
+    the independent reads are issued concurrently. Without `with_responses`
+    (PDF and CSV reports), candidates with a stored score summary skip the
+    evaluations read entirely. A summary is only trusted if it covers as many
+    evaluations as the candidate has completed (`expected_counts`, counted
+    here when not given); the others are aggregated from their evaluations
+    and their stored summary is rebuilt. Returns a dict of candidate ID ->
+    report data, in the order given.
+    """
+    chunks = _id_chunks(candidate_ids)
+    profile_calls = [lambda chunk=chunk: _fetch_report_profiles(chunk) for chunk in chunks]
+
+    # 1. Profiles alongside either the evaluations or the stored summaries
+    if with_responses or not SCORE_SUMMARIES_ENABLED:
+        summaries = {}
+        results = supabase.gather(*profile_calls, *[lambda chunk=chunk: _fetch_report_evaluations(chunk) for chunk in chunks])
+        profile_pages, evaluation_pages = results[:len(chunks)], results[len(chunks):]
+    else:
+        *profile_pages, summaries, counts = supabase.gather(
+            *profile_calls, lambda: load_report_summaries(candidate_ids),
+            lambda: expected_counts if expected_counts is not None else load_report_counts(candidate_ids),
+        )
+        # A summary covering a different number of evaluations (e.g. one written straight to Supabase) is stale.
+        summaries = {
+            candidate_id: summary for candidate_id, summary in summaries.items()
+            if counts.get(candidate_id, 0) == summary["evaluation_count"]
+        }
+        # 2. Evaluations only for candidates without a usable summary
+        raw_chunks = _id_chunks([candidate_id for candidate_id in candidate_ids if candidate_id not in summaries])
+        evaluation_pages = supabase.gather(*[lambda chunk=chunk: _fetch_report_evaluations(chunk) for chunk in raw_chunks])
 
-    evaluations = evals_response.json()
+    profiles = {profile["user_id"]: profile for page in profile_pages for profile in page}
+    evaluations_by_candidate = {candidate_id: [] for candidate_id in candidate_ids if candidate_id not in summaries}
+    for page in evaluation_pages:
+        for eval_data in page:
+            evaluations_by_candidate.setdefault(eval_data["candidate_uid"], []).append(eval_data)
+    if not with_responses and SCORE_SUMMARIES_ENABLED:
+        repair_score_summaries(evaluations_by_candidate)
 
     # 3. Aggregate Data
-    if not evaluations:
+    with span("aggregate"):
         return {
-            "candidate_info": {**candidate_info, "recommendation": "N/A", "overall_score": 0, "max_score": 100, "total_score_sum": 0, "total_max_score_sum": 0},
-            "grouped_by_round": [], "section_scores": [], "ai_summary": "No completed evaluations found."
+            candidate_id: (
+                report_data_from_summary(build_candidate_info(profiles.get(candidate_id)), summaries[candidate_id])
+                if candidate_id in summaries else
+                aggregate_report_data(build_candidate_info(profiles.get(candidate_id)), evaluations_by_candidate[candidate_id])
+            )
+            for candidate_id in candidate_ids
         }
 
-    aggregated_data = {}
-    section_scores = []
-    all_comments = []
+def aggregate_report_data(candidate_info, evaluations):
+    """Aggregates a candidate's completed evaluations into the report structure in a single pass.
+
+    Each row's JSON columns are decoded once into an Evaluation, which feeds
+    the summary, and its section scores and comments are the individual
+    responses as they are (json_codec encodes them for the analytics API).
+    """
+    summary = new_summary()
+    individual_responses = []
 
     for eval_data in evaluations:
-        round_type = eval_data['round_type']
-        score = eval_data['total_score']
-        max_score = eval_data['total_max_score']
-        
-        # Group by Round
-        if round_type not in aggregated_data:
-            aggregated_data[round_type] = {"totalScore": 0, "totalMaxScore": 0, "sections": []}
-        
-        aggregated_data[round_type]["totalScore"] += score
-        aggregated_data[round_type]["totalMaxScore"] += max_score
-        
-        # Parse JSON fields
-        try:
-            quantitative = json.loads(eval_data.get('quantitative_scores', '{}'))
-        except (TypeError, json.JSONDecodeError):
-            quantitative = {}
+        evaluation = Evaluation.from_row(eval_data)
+        individual_responses.append({
+            "id": evaluation.id,
+            "round": evaluation.round_type,
+            "evaluator": evaluation.evaluator_name or 'Unknown Evaluator',
+            "score": evaluation.total_score,
+            "max": evaluation.total_max_score,
+            "sections": evaluation.sections,
+            "comments": list(evaluation.comments)
+        })
+        apply_evaluation(summary, evaluation)
 
-        try:
-            qualitative = json.loads(eval_data.get('qualitative_comments', '[]'))
-        except (TypeError, json.JSONDecodeError):
-            qualitative = []
-
-        if qualitative:
-            all_comments.extend(qualitative)
-
-        for module, data in quantitative.items():
-             section_scores.append({
-                 "section": module,
-                 "score": data.get('score', 0),
-                 "max": data.get('max', 0),
-                 "comment": next((c['comment'] for c in qualitative if c.get('round') == module), 'N/A')
-             })
-
-    # 4. Final Calculations
-    grouped_by_round = []
-    total_score_sum = 0
-    total_max_score_sum = 0
+    return report_data_from_summary(candidate_info, summary, individual_responses)
 
-    for round_type, data in aggregated_data.items():
-        avg_score = round(data["totalScore"] / data["totalMaxScore"] * 100) if data["totalMaxScore"] > 0 else 0
-        
+def report_data_from_summary(candidate_info, summary, individual_responses=()):
+    """Builds the report structure from a score summary; O(rounds + sections), independent of evaluation count."""
+    if not summary["evaluation_count"]:
+        return {
+            "candidate_info": {**candidate_info, "recommendation": "N/A", "overall_score": 0, "max_score": 100, "total_score_sum": 0, "total_max_score_sum": 0},
+            "grouped_by_round": [], "section_scores": [], "individual_responses": [], "ai_summary": "No completed evaluations found."
+        }
+
+    grouped_by_round = []
+    for round_type in summary["round_order"]:
+        totals = summary["rounds"][round_type]
         grouped_by_round.append({
-            "round": round_type, 
-            "avg_score": avg_score, 
-            "score": data["totalScore"], 
-            "max_score": data["totalMaxScore"]
+            "round": round_type,
+            "avg_score": round(totals["score"] / totals["max"] * 100) if totals["max"] > 0 else 0,
+            "score": totals["score"],
+            "max_score": totals["max"]
         })
-        total_score_sum += data["totalScore"]
-        total_max_score_sum += data["totalMaxScore"]
 
     # Overall Metrics
+    total_score_sum = summary["total_score"]
+    total_max_score_sum = summary["total_max_score"]
     overall_avg = round(total_score_sum / total_max_score_sum * 100) if total_max_score_sum > 0 else 0
     recommendation = candidate_info['final_verdict'] if candidate_info['final_verdict'] != 'N/A' else ('Strongly Recommended' if overall_avg > 80 else ('Waitlist' if overall_avg > 60 else 'Not Recommended'))
     
-    mock_summary = f"Based on {len(evaluations)} completed evaluations, the overall score is {overall_avg}%. Candidate {candidate_info['name']} is rated as {recommendation} for the position."
+    ai_summary = f"Based on {summary['evaluation_count']} completed evaluations, the overall score is {overall_avg}%. Candidate {candidate_info['name']} is rated as {recommendation} for the position."
+    # Summarized by with_comment_summary, only for the views that show it.
+    summary_comments = [comment for section in summary["section_order"] for comment in summary["comments"].get(section, [])]
 
     # Aggregated section scores for PDF detailed view
-    final_section_scores = {}
-    for score in section_scores:
-        section = score['section']
-        if section not in final_section_scores:
-            final_section_scores[section] = {"score": 0, "max": 0, "count": 0, "comments": []}
-        
-        final_section_scores[section]["score"] += score['score']
-        final_section_scores[section]["max"] += score['max']
-        final_section_scores[section]["count"] += 1
-        if score['comment'] != 'N/A':
-             final_section_scores[section]["comments"].append(score['comment'])
-
     pdf_section_scores = []
-    for section, data in final_section_scores.items():
+    for section in summary["section_order"]:
+        data = summary["sections"][section]
+        comments = summary["comments"].get(section)
         pdf_section_scores.append({
-            "section": section, 
+            "section": section,
             "score": data["score"],
             "max": data["max"],
             "avg_score": round(data["score"] / data["max"] * 100) if data["max"] > 0 else 0,
-            "comment": " | ".join(data["comments"]) if data["comments"] else "No specific qualitative comments."
+            "comment": " | ".join(comments) if comments else "No specific qualitative comments."
         })
 
-
     return {
         "candidate_info": {
             **candidate_info, 
@@ -311,9 +1322,115 @@ def fetch_candidate_data_for_report(candidate_id):
         },
         "grouped_by_round": grouped_by_round,
         "section_scores": pdf_section_scores, 
-        "ai_summary": mock_summary
+        "individual_responses": list(individual_responses),
+        "ai_summary": ai_summary,
+        "summary_comments": summary_comments
     }
 
+def with_comment_summary(report_data):
+    """Returns `report_data` with the evaluators' comments summarized onto its ai_summary, for the PDF and analytics views.
+
+    Same comment set (and cache entry) as the dashboard's /api/summarize call. Reports never wait on a
+    remote backend: a cached summary is reused, otherwise the extractive one is used while it runs.
+    Exports and other aggregations skip this, so they never start a summarization.
+    """
+    comments = report_data.get("summary_comments") or []
+    if not comment_texts(comments):
+        return report_data
+    comment_summary = summary_service.summarize(comments, deadline=0)["summary"]
+    return {**report_data, "ai_summary": f"{report_data['ai_summary']} {comment_summary}".strip()}
+
+# --- REPORT CACHING ---
+def fetch_report_version(candidate_id):
+    """Version stamp for a candidate's report: completed evaluation count, latest submission time and final verdict.
+
+    The verdict is printed as the recommendation and the evaluation form
+    writes it straight to Supabase, so it has to be part of the stamp for a
+    change to reach cached reports and ETags. Costs two single-row requests
+    (issued concurrently), much cheaper than fetching and aggregating every
+    evaluation, or local queries when the replica is fresh. Returns None if
+    the lookup fails so callers can bypass the cache.
+    """
+    local = local_replica("evaluations", "candidate_profiles")
+    if local is not None:
+        rows = local.select("evaluations", [REPORT_VERSION_COLUMN], where={"candidate_uid": candidate_id, "is_complete": True})
+        stamps = [row[REPORT_VERSION_COLUMN] for row in rows if row[REPORT_VERSION_COLUMN] is not None]
+        profiles = local.select("candidate_profiles", ["final_verdict"], where={"user_id": candidate_id})
+        return f"{len(rows)}:{max(stamps) if stamps else None}:{profiles[0]['final_verdict'] if profiles else None}"
+    try:
+        response, profile_response = supabase.gather(
+            lambda: supabase.get("evaluations", params={
+                "select": REPORT_VERSION_COLUMN,
+                "candidate_uid": f"eq.{candidate_id}",
+                "is_complete": "eq.true",
+                "order": f"{REPORT_VERSION_COLUMN}.desc.nullslast",
+                "limit": "1"
+            }, prefer="count=exact"),
+            lambda: supabase.get("candidate_profiles", params={"select": "final_verdict", "user_id": f"eq.{candidate_id}"}),
+        )
+    except Exception:
+        return None
+    if response.status_code not in (200, 206) or profile_response.status_code != 200:
+        return None
+    rows = response.json()
+    count = response.headers.get("Content-Range", "").rpartition("/")[2] or str(len(rows))
+    latest = rows[0].get(REPORT_VERSION_COLUMN) if rows else None
+    profiles = profile_response.json()
+    verdict = profiles[0].get("final_verdict") if profiles else None
+    return f"{count}:{latest}:{verdict}"
+
+def get_report_data(candidate_id, version, with_responses=False):
+    """Returns the aggregated report, served from the cache when `version` is known.
+
+    PDF and CSV reports only need totals, so they come from the stored score
+    summary; pass `with_responses` to also load every individual evaluation.
+    """
+    if version is None:
+        return fetch_candidate_data_for_report(candidate_id, with_responses)
+    expected_count = int(version.partition(":")[0]) if version.partition(":")[0].isdigit() else None
+    kind = "data-full" if with_responses else "data"
+    return report_cache.get_or_load(kind, candidate_id, version, lambda: fetch_candidate_data_for_report(candidate_id, with_responses, expected_count))
+
+def not_modified(kind, candidate_id, version):
+    """Returns a 304 response when the client already holds this version, else the ETag to send."""
+    if version is None:
+        return None, None
+    etag = make_etag(kind, candidate_id, version)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response, etag
+    return None, etag
+
+def send_report_file(payload, etag, download_name, mimetype):
+    response = send_file(io.BytesIO(payload), as_attachment=True, download_name=download_name, mimetype=mimetype, etag=False)
+    if etag:
+        response.set_etag(etag)
+        # Let browsers keep the file but revalidate before reusing it.
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+@app.route("/api/report/invalidate", methods=["POST", "OPTIONS"])
+def invalidate_report_cache():
+    """Drops cached report data for the given candidates. Call after an evaluation is saved."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    candidate_ids = data.get("candidate_ids") or ([data["candidate_id"]] if data.get("candidate_id") else [])
+    if data.get("all"):
+        removed = report_cache.invalidate()
+    elif candidate_ids:
+        removed = sum(report_cache.invalidate(str(candidate_id)) for candidate_id in candidate_ids)
+    else:
+        return jsonify({"error": "Provide 'candidate_id', 'candidate_ids' or 'all': true."}), 400
+    cohort_cache.clear()
+    return jsonify({"invalidated": removed})
+
+@app.route("/api/report/cache", methods=["GET"])
+def report_cache_stats():
+    return jsonify(report_cache.stats())
+
 @app.route("/api/report", methods=["GET"])
 def generate_pdf_report():
     candidate_id = request.args.get('candidate_id')
@@ -321,168 +1438,27 @@ def generate_pdf_report():
         return jsonify({"error": "Candidate ID is required."}), 400
     
     try:
-        report_data = fetch_candidate_data_for_report(candidate_id)
+        with supabase.deadline(REQUEST_DEADLINE):
+            version = report_cache.get_version(candidate_id, fetch_report_version)
+            cached, etag = not_modified("pdf", candidate_id, version)
+            if cached is not None:
+                return cached
+            report_data = get_report_data(candidate_id, version)
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching report data: {str(e)}"}), 504
     except Exception as e:
         return jsonify({"error": f"Error fetching report data: {str(e)}"}), 500
 
     try:
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        p.setTitle("Candidate Performance Report")
-        
-        # --- Start Drawing (Beautified Layout) ---
-        
-        MARGIN_LEFT = 50
-        MARGIN_RIGHT = 550
-        LINE_HEIGHT = 16
-        y = 750
-        
-        # Title and Candidate Info
-        p.setFillColor(COLOR_PRIMARY)
-        p.setFont("Helvetica-Bold", 20)
-        p.drawString(MARGIN_LEFT, y, "Candidate Performance Report")
-        p.setFillColor(COLOR_TEXT)
-        y -= 25
-        
-        p.setFont("Helvetica", 10)
-        p.drawString(MARGIN_LEFT, y, f"Candidate: {report_data['candidate_info']['name']}")
-        p.drawString(MARGIN_LEFT + 250, y, f"ID: {candidate_id}")
-        y -= LINE_HEIGHT
-        p.drawString(MARGIN_LEFT, y, f"Position: {report_data['candidate_info']['position']}")
-        y -= 30
-        
-        # Overall Summary Box
-        REC_COLOR = COLOR_SECONDARY if "Recommended" in report_data['candidate_info']['recommendation'] else COLOR_PRIMARY
-        
-        p.setFillColor(COLOR_BG_LIGHT)
-        p.roundRect(MARGIN_LEFT, y - 5, MARGIN_RIGHT - MARGIN_LEFT, 50, 8, fill=1)
-        p.setFillColor(COLOR_TEXT)
-        
-        p.setFont("Helvetica-Bold", 12)
-        p.drawString(MARGIN_LEFT + 10, y + 25, "Overall Score:")
-        p.drawString(MARGIN_LEFT + 10, y + 10, "Recommendation:")
-        
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(MARGIN_LEFT + 150, y + 25, f"{report_data['candidate_info']['total_score_sum']}/{report_data['candidate_info']['total_max_score_sum']}")
-        
-        p.setFillColor(REC_COLOR)
-        p.drawString(MARGIN_LEFT + 150, y + 10, report_data['candidate_info']['recommendation'])
-        p.setFillColor(COLOR_TEXT)
-        y -= 60
-        
-        # Round-wise Scores Section
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(MARGIN_LEFT, y, "Evaluation Scores Breakdown")
-        y -= 5
-        p.setStrokeColor(COLOR_PRIMARY)
-        p.line(MARGIN_LEFT, y, MARGIN_RIGHT, y)
-        y -= 15
-        
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(MARGIN_LEFT + 10, y, "Round Type")
-        p.drawString(MARGIN_LEFT + 200, y, "Total Score")
-        p.drawString(MARGIN_LEFT + 350, y, "Average %")
-        p.setStrokeColor(HexColor('#BBBBBB'))
-        p.line(MARGIN_LEFT, y - 2, MARGIN_RIGHT, y - 2)
-        y -= 15
-        
-        p.setFont("Helvetica", 10)
-        for round_data in report_data['grouped_by_round']:
-            p.drawString(MARGIN_LEFT + 10, y, round_data['round'])
-            p.drawString(MARGIN_LEFT + 200, y, f"{round_data['score']}/{round_data['max_score']}")
-            p.drawString(MARGIN_LEFT + 350, y, f"{round_data['avg_score']}%")
-            y -= LINE_HEIGHT
-        y -= 20
-
-        # AI Summary Section
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(MARGIN_LEFT, y, "AI Summary & Insights")
-        y -= 5
-        p.setStrokeColor(COLOR_PRIMARY)
-        p.line(MARGIN_LEFT, y, MARGIN_RIGHT, y)
-        y -= 20
-        
-        p.setFont("Helvetica-Oblique", 10)
-        
-        summary_lines = []
-        line_buffer = ""
-        words = report_data['ai_summary'].split(' ')
-        for word in words:
-            if p.stringWidth(line_buffer + word, "Helvetica-Oblique", 10) < (MARGIN_RIGHT - MARGIN_LEFT - 20):
-                line_buffer += word + " "
-            else:
-                summary_lines.append(line_buffer.strip())
-                line_buffer = word + " "
-        summary_lines.append(line_buffer.strip())
+        from report_pdf import render_pdf_report
 
-        for line in summary_lines:
-            p.drawString(MARGIN_LEFT + 10, y, line)
-            y -= LINE_HEIGHT
-            
-        y -= 20
-        
-        # Detailed Section Scores
-        if report_data['section_scores']:
-            p.setFont("Helvetica-Bold", 14)
-            p.drawString(MARGIN_LEFT, y, "Detailed Dimension Analysis")
-            y -= 5
-            p.setStrokeColor(COLOR_PRIMARY)
-            p.line(MARGIN_LEFT, y, MARGIN_RIGHT, y)
-            y -= 20
-            
-            p.setFont("Helvetica-Bold", 10)
-            
-            for score_data in report_data['section_scores']:
-                 # Check for page break
-                 if y < 100:
-                     p.showPage()
-                     y = 750
-                     p.setFont("Helvetica", 12)
-                     p.drawString(MARGIN_LEFT, y, f"Detailed Analysis (Continued for {report_data['candidate_info']['name']})")
-                     y -= 20
-                     p.setFont("Helvetica-Bold", 10)
-                     
-                 # Section Header
-                 p.setFillColor(COLOR_PRIMARY)
-                 p.drawString(MARGIN_LEFT + 5, y, f"{score_data['section']} ({score_data['avg_score']}%)")
-                 p.setFillColor(COLOR_TEXT)
-                 y -= LINE_HEIGHT
-                 
-                 # Detailed Comment/Score
-                 p.setFont("Helvetica", 9)
-                 comment_text = score_data.get('comment', 'No comments available.')
-                 
-                 # Wrap comment text
-                 comment_lines = []
-                 line_buffer = f"Score: {score_data['score']}/{score_data['max']} | Comment: "
-                 words = comment_text.split(' ')
-                 
-                 for word in words:
-                     if p.stringWidth(line_buffer + word, "Helvetica", 9) < (MARGIN_RIGHT - MARGIN_LEFT - 20):
-                         line_buffer += word + " "
-                     else:
-                         comment_lines.append(line_buffer.strip())
-                         line_buffer = word + " "
-                 comment_lines.append(line_buffer.strip())
-                 
-                 for line in comment_lines:
-                      p.drawString(MARGIN_LEFT + 15, y, line)
-                      y -= 12 # Tighter spacing for detailed comments
-                      if y < 60: break # Ensure it doesn't go off the bottom
-
-                 y -= 10 # Extra space after each section analysis
-
-
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=f'VRecruitment_Report_{candidate_id}.pdf',
-            mimetype='application/pdf'
-        )
+        def render():
+            with span("render_pdf"):
+                return render_pdf_report(with_comment_summary(report_data), candidate_id)
+
+        pdf_bytes = render() if version is None else report_cache.get_or_load("pdf", candidate_id, version, render)
+
+        return send_report_file(pdf_bytes, etag, f'VRecruitment_Report_{candidate_id}.pdf', 'application/pdf')
     except Exception as e:
         print(f"--- PDF GENERATION ERROR ---")
         print(traceback.format_exc()) 
@@ -490,54 +1466,541 @@ def generate_pdf_report():
         return jsonify({"error": f"PDF generation failed: {str(e)}"}), 500
 
 
+def fetch_candidate_ids_for_position(position):
+    """Returns the user IDs of every candidate who applied for `position`."""
+    return [row["user_id"] for row in fetch_profiles_for_position(position, "user_id")]
+
+def fetch_profiles_for_position(position, columns):
+    local = local_replica("candidate_profiles")
+    if local is not None:
+        return local.select("candidate_profiles", columns.split(","), where={"position_applied_for": position}, order=("user_id",))
+    return supabase.get_all("candidate_profiles", params={
+        "select": columns,
+        "position_applied_for": f"eq.{position}",
+        "order": "user_id"
+    })
+
+@app.route("/api/report/batch", methods=["GET", "POST", "OPTIONS"])
+def generate_pdf_report_batch():
+    """Streams a zip of PDF reports for every candidate of a position, or for a posted list of IDs."""
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    try:
+        if request.method == "POST":
+            candidate_ids = (request.get_json(silent=True) or {}).get("candidate_ids")
+            if not isinstance(candidate_ids, list) or not candidate_ids:
+                return jsonify({"error": "A non-empty 'candidate_ids' list is required."}), 400
+            label = "Selected"
+        else:
+            position = request.args.get('position')
+            if not position:
+                return jsonify({"error": "Position is required."}), 400
+            with supabase.deadline(REQUEST_DEADLINE):
+                candidate_ids = fetch_candidate_ids_for_position(position)
+            label = position
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching candidates: {str(e)}"}), 504
+    except Exception as e:
+        return jsonify({"error": f"Error fetching candidates: {str(e)}"}), 500
+
+    try:
+        candidate_ids = list(dict.fromkeys(str(uuid.UUID(str(candidate_id))) for candidate_id in candidate_ids))
+    except ValueError:
+        return jsonify({"error": "Candidate IDs must be UUIDs."}), 400
+    if not candidate_ids:
+        return jsonify({"error": "No candidates found for this position."}), 404
+    if len(candidate_ids) > REPORT_BATCH_MAX:
+        return jsonify({"error": f"Too many candidates ({len(candidate_ids)}). The limit is {REPORT_BATCH_MAX} per batch."}), 413
+
+    try:
+        with supabase.deadline(REQUEST_DEADLINE):
+            reports = fetch_candidates_data_for_report(candidate_ids, with_responses=False)
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching report data: {str(e)}"}), 504
+    except Exception as e:
+        return jsonify({"error": f"Error fetching report data: {str(e)}"}), 500
+
+    safe_label = "".join(ch if ch.isalnum() else "_" for ch in label)
+    return Response(
+        stream_reports_zip(reports, prepare=with_comment_summary),
+        mimetype='application/zip',
+        headers={"Content-Disposition": f'attachment; filename="VRecruitment_Reports_{safe_label}.zip"'}
+    )
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+def export_response(rows, export_format, download_name, sheet_name="Report", etag=None):
+    """Streams rows as CSV (csv.writer quoting) or as a constant-memory .xlsx."""
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    body = stream_xlsx(rows, worksheet_name(sheet_name)) if export_format == "xlsx" else stream_csv(rows)
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}.{extension}"'
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def requested_export_format():
+    """Returns the ?format= value, or an error response tuple if it cannot be served."""
+    export_format = (request.args.get('format') or 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return None, (jsonify({"error": f"Unsupported format '{export_format}'. Use csv or xlsx."}), 400)
+    if export_format == "xlsx" and not xlsx_available():
+        return None, (jsonify({"error": "XLSX export requires the xlsxwriter package on the server."}), 501)
+    return export_format, None
+
 @app.route("/api/report/excel", methods=["GET"])
 def generate_excel_report():
     candidate_id = request.args.get('candidate_id')
+    if not candidate_id:
+        return jsonify({"error": "Candidate ID is required."}), 400
+    export_format, error = requested_export_format()
+    if error:
+        return error
     
     try:
-        report_data = fetch_candidate_data_for_report(candidate_id)
+        with supabase.deadline(REQUEST_DEADLINE):
+            version = report_cache.get_version(candidate_id, fetch_report_version)
+            cached, etag = not_modified(export_format, candidate_id, version)
+            if cached is not None:
+                return cached
+            report_data = get_report_data(candidate_id, version)
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching report data: {str(e)}"}), 504
     except Exception as e:
         return jsonify({"error": f"Error fetching report data: {str(e)}"}), 500
-        
+
+    return export_response(candidate_report_rows(candidate_id, report_data), export_format, f'VRecruitment_Grouped_Data_{candidate_id}', etag=etag)
+
+COHORT_EXPORT_COLUMNS = "id,candidate_uid,round_type,total_score,total_max_score,quantitative_scores,qualitative_comments"
+
+def iter_cohort_reports(profiles, round_type=None):
+    """Yields (candidate_id, report_data) for every candidate in `profiles` (user ID -> profile row).
+
+    Evaluations are read page by page, ordered by candidate, and each
+    candidate is aggregated and released as soon as their rows are complete,
+    so memory stays flat however many evaluations exist.
+    """
+    candidate_ids = list(profiles)
+    local = local_replica("evaluations")
+
+    for start in range(0, len(candidate_ids), REPORT_ID_CHUNK_SIZE):
+        chunk = candidate_ids[start:start + REPORT_ID_CHUNK_SIZE]
+        params = {
+            "select": COHORT_EXPORT_COLUMNS,
+            "candidate_uid": f"in.({','.join(chunk)})",
+            "is_complete": "eq.true",
+            "order": "candidate_uid,submission_time,id"
+        }
+        if round_type:
+            params["round_type"] = f"eq.{round_type}"
+
+        seen = set()
+        current, rows = None, []
+        if local is not None:
+            pages = [local_evaluations(local, chunk, COHORT_EXPORT_COLUMNS, ("candidate_uid", "submission_time", "id"), round_type)]
+        else:
+            pages = supabase.get_pages("evaluations", params=params)
+        for page in pages:
+            for eval_data in page:
+                if eval_data["candidate_uid"] != current:
+                    if current is not None:
+                        yield current, aggregate_report_data(build_candidate_info(profiles.get(current)), rows)
+                    current, rows = eval_data["candidate_uid"], []
+                    seen.add(current)
+                rows.append(eval_data)
+        if current is not None:
+            yield current, aggregate_report_data(build_candidate_info(profiles.get(current)), rows)
+
+        for candidate_id in chunk:
+            if candidate_id not in seen:
+                yield candidate_id, aggregate_report_data(build_candidate_info(profiles[candidate_id]), [])
+
+def cohort_export_rows(profiles, round_type=None):
+    yield COHORT_HEADER
+    for candidate_id, report_data in iter_cohort_reports(profiles, round_type):
+        yield from cohort_report_rows(candidate_id, report_data)
+
+@app.route("/api/report/cohort/export", methods=["GET"])
+def export_cohort_report():
+    """Streams every candidate's overall, round and section rows for a position as CSV or XLSX."""
+    position = request.args.get('position')
+    if not position:
+        return jsonify({"error": "Position is required."}), 400
+    export_format, error = requested_export_format()
+    if error:
+        return error
+    round_type = request.args.get('round') or None
+
+    # Load the candidate list up front so upstream errors surface before streaming starts.
+    try:
+        profiles = {profile["user_id"]: profile for profile in fetch_profiles_for_position(position, REPORT_PROFILE_COLUMNS)}
+    except Exception as e:
+        return jsonify({"error": f"Error fetching candidates: {str(e)}"}), 500
+    if not profiles:
+        return jsonify({"error": "No candidates found for this position."}), 404
+
+    safe_label = "".join(ch if ch.isalnum() else "_" for ch in position)
+    return export_response(cohort_export_rows(profiles, round_type), export_format, f'VRecruitment_Cohort_{safe_label}', sheet_name=position)
+
+
+# --- CANDIDATE ANALYTICS API ---
+def build_analytics_payload(candidate_id, report_data):
+    """Shapes cached report data into the compact structure the analytics dashboard renders."""
     info = report_data['candidate_info']
-    
-    csv_content = io.StringIO()
-    csv_content.write(f"V-Recruitment Grouped Report for,{info['name']}\n")
-    csv_content.write(f"Candidate ID,{candidate_id}\n")
-    csv_content.write(f"Overall Score,{info['total_score_sum']}/{info['total_max_score_sum']}\n")
-    csv_content.write(f"Final Recommendation,{info['recommendation']}\n\n")
-
-    csv_content.write("Round,Score,Max Score,Average Percentage\n")
-    for round_data in report_data['grouped_by_round']:
-        csv_content.write(f"{round_data['round']},{round_data['score']},{round_data['max_score']},{round_data['avg_score']}%\n")
-
-    csv_content.write("\nDetailed Section Scores/Comments\n")
-    csv_content.write("Section,Score,Max Score,Comment\n")
-    for section_data in report_data['section_scores']:
-        csv_content.write(f"{section_data['section']},{section_data.get('score', 'N/A')},{section_data.get('max', 'N/A')},{section_data.get('comment', 'N/A')}\n")
-        
-    output = io.BytesIO(csv_content.getvalue().encode('utf-8'))
-    output.seek(0)
-    
-    return send_file(
-        output,
-        as_attachment=True,
-        download_name=f'VRecruitment_Grouped_Data_{candidate_id}.csv',
-        mimetype='text/csv'
-    )
+    return {
+        "candidate_id": candidate_id,
+        "candidate": {"name": info['name'], "position": info['position'], "final_verdict": info['final_verdict']},
+        "recommendation": info['recommendation'],
+        "overall_avg": info['overall_score'],
+        "total_score": info['total_score_sum'],
+        "total_max_score": info['total_max_score_sum'],
+        "grouped_by_round": report_data['grouped_by_round'],
+        "section_scores": report_data['section_scores'],
+        "individual_responses": report_data['individual_responses'],
+        "summary": report_data['ai_summary']
+    }
+
+def encode_analytics_payload(candidate_id, report_data, encoding):
+    body = json_codec.dumps_bytes(build_analytics_payload(candidate_id, with_comment_summary(report_data)))
+    return compress_body(body, encoding)
+
+@app.route("/api/analytics/candidate/<candidate_id>", methods=["GET"])
+def candidate_analytics(candidate_id):
+    """Round, section and per-evaluation analytics for one candidate, served from the report cache."""
+    encoding = None if request.args.get('compress') == '0' else negotiate_encoding(request.headers.get('Accept-Encoding'))
+    kind = f"analytics-{encoding or 'identity'}"
+
+    try:
+        with supabase.deadline(REQUEST_DEADLINE):
+            version = report_cache.get_version(candidate_id, fetch_report_version)
+            cached, etag = not_modified(kind, candidate_id, version)
+            if cached is not None:
+                cached.headers["Vary"] = "Accept-Encoding"
+                return cached
+            report_data = get_report_data(candidate_id, version, with_responses=True)
+    except DeadlineExceeded as e:
+        return jsonify({"error": f"Timed out fetching analytics data: {str(e)}"}), 504
+    except Exception as e:
+        return jsonify({"error": f"Error fetching analytics data: {str(e)}"}), 500
+
+    if version is None:
+        body, applied = encode_analytics_payload(candidate_id, report_data, encoding)
+    else:
+        body, applied = report_cache.get_or_load(kind, candidate_id, version, lambda: encode_analytics_payload(candidate_id, report_data, encoding))
+
+    response = Response(body, mimetype='application/json')
+    response.headers["Vary"] = "Accept-Encoding"
+    if applied:
+        response.headers["Content-Encoding"] = applied
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# --- COHORT STATISTICS ---
+COHORT_EVALUATION_COLUMNS = "id,candidate_uid,round_type,total_score,total_max_score,quantitative_scores"
+
+def load_cohort_stats(position, round_type=None):
+    """Loads every completed evaluation for a position into NumPy and computes cohort statistics."""
+    from cohort_stats import build_score_matrix, compute_cohort_stats
+
+    profiles = fetch_profiles_for_position(position, "user_id,first_name,surname")
+    candidate_ids = [profile["user_id"] for profile in profiles]
+
+    evaluations = []
+    local = local_replica("evaluations")
+    for start in range(0, len(candidate_ids), REPORT_ID_CHUNK_SIZE):
+        if local is not None:
+            evaluations.extend(local_evaluations(local, candidate_ids[start:start + REPORT_ID_CHUNK_SIZE],
+                                                 COHORT_EVALUATION_COLUMNS, ("id",), round_type))
+            continue
+        params = {
+            "select": COHORT_EVALUATION_COLUMNS,
+            "candidate_uid": f"in.({','.join(candidate_ids[start:start + REPORT_ID_CHUNK_SIZE])})",
+            "is_complete": "eq.true",
+            "order": "id"
+        }
+        if round_type:
+            params["round_type"] = f"eq.{round_type}"
+        evaluations.extend(supabase.get_all("evaluations", params=params))
+
+    with span("cohort_stats"):
+        stats = compute_cohort_stats(build_score_matrix(evaluations, candidate_ids))
+    names = {profile["user_id"]: build_candidate_info(profile)["name"] for profile in profiles}
+    for candidate in stats["candidates"]:
+        candidate["name"] = names.get(candidate["candidate_id"], "Unknown Candidate")
+    return {"position": position, "round": round_type, **stats}
+
+@app.route("/api/analytics/cohort", methods=["GET"])
+def cohort_analytics():
+    """Mean/median/percentiles, score distributions, z-scores and ranks for a position's cohort."""
+    position = request.args.get('position')
+    if not position:
+        return jsonify({"error": "Position is required."}), 400
+    round_type = request.args.get('round') or None
+    include_candidates = request.args.get('candidates', '1') != '0'
+
+    key = (position, round_type)
+    stats = cohort_cache.get(key)
+    if stats is None:
+        try:
+            stats = load_cohort_stats(position, round_type)
+        except Exception as e:
+            print(traceback.format_exc())
+            return jsonify({"error": f"Error computing cohort statistics: {str(e)}"}), 500
+        cohort_cache.set(key, stats)
+
+    if not include_candidates:
+        stats = {k: v for k, v in stats.items() if k != "candidates"}
+    return jsonify(stats)
+
+
+# --- EVALUATION SUBMISSION & SCORE SUMMARIES ---
+@app.route("/api/evaluations", methods=["POST", "OPTIONS"])
+def submit_evaluation():
+    """Saves an evaluation and folds it into the candidate's running score summary.
+
+    The summary update is best-effort: if it fails the evaluation is still
+    saved, reports fall back to raw evaluations, and `flask rebuild-summaries`
+    repairs it.
+    """
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    try:
+        row = build_evaluation_row(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = supabase.post("evaluations", json=row)
+        if response.status_code not in (200, 201):
+            return jsonify({"error": f"Failed to save evaluation: {response.text}"}), 500
+        saved = response.json()
+        saved = saved[0] if isinstance(saved, list) and saved else {**row, "id": None}
+    except Exception as e:
+        return jsonify({"error": f"Failed to save evaluation: {str(e)}"}), 500
+
+    candidate_id = row["candidate_uid"]
+    replicate("evaluations", [saved])
+    summary_updated = False
+    if row["is_complete"] and SCORE_SUMMARIES_ENABLED:
+        try:
+            summary = summary_store.apply(candidate_id, saved)
+            candidate_index.set_score(candidate_id, summary["total_score"], summary["total_max_score"])
+            summary_updated = True
+        except Exception:
+            print(f"--- SCORE SUMMARY UPDATE ERROR ({candidate_id}) ---")
+            print(traceback.format_exc())
+            print(f"--- END ERROR ---")
+
+    report_cache.invalidate(candidate_id)
+    cohort_cache.clear()
+    return jsonify({"id": saved.get("id"), "candidate_uid": candidate_id, "summary_updated": summary_updated}), 201
+
+def iter_completed_evaluations(candidate_ids=None):
+    """Yields (candidate_id, evaluations) for every candidate with completed evaluations, in submission order."""
+    params = {
+        "select": SUMMARY_EVALUATION_COLUMNS,
+        "is_complete": "eq.true",
+        "order": "candidate_uid,submission_time,id"
+    }
+    chunks = [None] if candidate_ids is None else [candidate_ids[i:i + REPORT_ID_CHUNK_SIZE] for i in range(0, len(candidate_ids), REPORT_ID_CHUNK_SIZE)]
+    for chunk in chunks:
+        if chunk is not None:
+            params["candidate_uid"] = f"in.({','.join(chunk)})"
+        current, rows = None, []
+        for page in supabase.get_pages("evaluations", params=params):
+            for eval_data in page:
+                if eval_data["candidate_uid"] != current:
+                    if current is not None:
+                        yield current, rows
+                    current, rows = eval_data["candidate_uid"], []
+                rows.append(eval_data)
+        if current is not None:
+            yield current, rows
+
+def check_score_summaries(candidate_ids=None):
+    """Compares stored summaries with a full recomputation. Returns candidate ID -> list of problems."""
+    expected = {candidate_id: build_summary(rows) for candidate_id, rows in iter_completed_evaluations(candidate_ids)}
+    # Reading every stored row (not just those with evaluations) also catches orphaned summaries.
+    stored = summary_store.load_all() if candidate_ids is None else summary_store.load_many(candidate_ids)
+    mismatches = {}
+    for candidate_id in set(expected) | set(stored):
+        problems = compare_summaries(stored.get(candidate_id), expected.get(candidate_id) or new_summary())
+        if problems:
+            mismatches[candidate_id] = problems
+    return mismatches
+
+@app.route("/api/summaries/check", methods=["GET"])
+def score_summary_check():
+    """Consistency check for one candidate (?candidate_id=) or, without it, every candidate."""
+    candidate_id = request.args.get('candidate_id')
+    try:
+        mismatches = check_score_summaries([candidate_id] if candidate_id else None)
+    except Exception as e:
+        return jsonify({"error": f"Summary check failed: {str(e)}"}), 500
+    return jsonify({"consistent": not mismatches, "mismatches": mismatches})
+
+@app.cli.command("rebuild-summaries")
+@click.option("--candidate", "candidate_ids", multiple=True, help="Only rebuild these candidates (repeatable).")
+def rebuild_summaries_command(candidate_ids):
+    """Recomputes score summaries from raw evaluations (backfill or repair)."""
+    candidate_ids = list(candidate_ids) or None
+    summaries = {}
+    rebuilt = set()
+    saved = 0
+    for candidate_id, rows in iter_completed_evaluations(candidate_ids):
+        summaries[candidate_id] = build_summary(rows)
+        rebuilt.add(candidate_id)
+        if len(summaries) >= 500:
+            saved += summary_store.save_many(summaries)
+            summaries = {}
+    saved += summary_store.save_many(summaries)
+
+    # Stored summaries for candidates that no longer have completed evaluations are removed.
+    existing = candidate_ids if candidate_ids else list(summary_store.load_all())
+    summary_store.delete_many([candidate_id for candidate_id in existing if candidate_id not in rebuilt])
+    report_cache.invalidate()
+    click.echo(f"Rebuilt {saved} score summaries.")
+
+@app.cli.command("check-summaries")
+@click.option("--candidate", "candidate_ids", multiple=True, help="Only check these candidates (repeatable).")
+def check_summaries_command(candidate_ids):
+    """Compares stored score summaries with a full recomputation; exits 1 on any mismatch."""
+    mismatches = check_score_summaries(list(candidate_ids) or None)
+    for candidate_id, problems in sorted(mismatches.items()):
+        click.echo(f"{candidate_id}:")
+        for problem in problems:
+            click.echo(f"  {problem}")
+    click.echo(f"{len(mismatches)} inconsistent summaries.")
+    if mismatches:
+        sys.exit(1)
+
+
+# --- ASYNCHRONOUS REPORT JOBS ---
+def pdf_report_job(candidate_id):
+    version = report_cache.get_version(candidate_id, fetch_report_version)
+    report_data = get_report_data(candidate_id, version)
+    render = lambda: render_pdf_off_thread(with_comment_summary(report_data), candidate_id)
+    pdf_bytes = render() if version is None else report_cache.get_or_load("pdf", candidate_id, version, render)
+    return [pdf_bytes], f'VRecruitment_Report_{candidate_id}.pdf', 'application/pdf'
+
+def excel_report_job(candidate_id):
+    version = report_cache.get_version(candidate_id, fetch_report_version)
+    report_data = get_report_data(candidate_id, version)
+    return stream_csv(candidate_report_rows(candidate_id, report_data)), f'VRecruitment_Grouped_Data_{candidate_id}.csv', 'text/csv'
+
+def batch_report_job(candidate_ids, label):
+    reports = fetch_candidates_data_for_report(candidate_ids, with_responses=False)
+    safe_label = "".join(ch if ch.isalnum() else "_" for ch in label)
+    return stream_reports_zip(reports, prepare=with_comment_summary), f'VRecruitment_Reports_{safe_label}.zip', 'application/zip'
+
+@app.route("/api/report/jobs", methods=["POST", "OPTIONS"])
+def create_report_job():
+    """Queues a report for background generation and returns its job ID.
+
+    Body: {"type": "pdf" | "excel", "candidate_id": ...}
+       or {"type": "batch", "position": ...} / {"type": "batch", "candidate_ids": [...]}
+    """
+    if request.method == "OPTIONS":
+        return handle_options()
+
+    data = request.get_json(silent=True) or {}
+    job_type = data.get("type", "pdf")
+
+    if job_type in ("pdf", "excel"):
+        candidate_id = data.get("candidate_id")
+        if not candidate_id:
+            return jsonify({"error": "Candidate ID is required."}), 400
+        params = {"candidate_id": candidate_id}
+        render = pdf_report_job if job_type == "pdf" else excel_report_job
+        work = lambda: render(candidate_id)
+    elif job_type == "batch":
+        try:
+            if data.get("candidate_ids"):
+                candidate_ids = list(dict.fromkeys(str(uuid.UUID(str(candidate_id))) for candidate_id in data["candidate_ids"]))
+                label = "Selected"
+            elif data.get("position"):
+                candidate_ids = fetch_candidate_ids_for_position(data["position"])
+                label = data["position"]
+            else:
+                return jsonify({"error": "Provide 'position' or 'candidate_ids' for a batch job."}), 400
+        except ValueError:
+            return jsonify({"error": "Candidate IDs must be UUIDs."}), 400
+        except Exception as e:
+            return jsonify({"error": f"Error fetching candidates: {str(e)}"}), 500
+        if not candidate_ids:
+            return jsonify({"error": "No candidates found for this position."}), 404
+        if len(candidate_ids) > REPORT_BATCH_MAX:
+            return jsonify({"error": f"Too many candidates ({len(candidate_ids)}). The limit is {REPORT_BATCH_MAX} per batch."}), 413
+        params = {"candidate_count": len(candidate_ids), "label": label}
+        work = lambda: batch_report_job(candidate_ids, label)
+    else:
+        return jsonify({"error": f"Unknown job type '{job_type}'. Use pdf, excel or batch."}), 400
+
+    try:
+        job = report_jobs.submit(job_type, params, work)
+    except JobQueueFull as e:
+        response = jsonify({"error": f"Report queue is full. {str(e)} Try again shortly."})
+        response.headers["Retry-After"] = "10"
+        return response, 503
+
+    return jsonify({**job, "status_url": f"/api/report/jobs/{job['id']}"}), 202
+
+@app.route("/api/report/jobs/<job_id>", methods=["GET"])
+def get_report_job(job_id):
+    """Returns job status while it runs, then the finished file. Add ?status=1 to always get JSON."""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired."}), 404
+
+    if job["status"] == "failed":
+        return jsonify(job), 500
+    if job["status"] != "done":
+        response = jsonify(job)
+        response.headers["Retry-After"] = "2"
+        return response, 202
+    if request.args.get('status') == '1':
+        return jsonify(job)
+
+    chunks = report_jobs.open_result(job_id)
+    if chunks is None:
+        return jsonify({"error": "Job result is no longer available."}), 410
+    response = Response(chunks, mimetype=job["mimetype"])
+    response.headers["Content-Disposition"] = f'attachment; filename="{job["filename"]}"'
+    response.headers["Content-Length"] = str(job["size"])
+    return response
 
 
 @app.route("/api/summarize", methods=['POST'])
 def summarize_comments():
-    data = request.json
+    """Summarizes evaluator comments (strings or {round, comment} objects); cached by comment-set hash."""
+    data = request.get_json(silent=True) or {}
     comments = data.get('comments', [])
-    
-    mock_summary = "Based on evaluations across various rounds, the candidate demonstrated strong core competencies and high emotional intelligence. Key areas for development are noted in system design architecture where more depth is required. Overall: A promising candidate with minor gaps."
-    
-    if not comments:
-         return jsonify({"summary": "No qualitative data provided for summary generation."})
-         
-    return jsonify({"summary": mock_summary})
+    if not isinstance(comments, list):
+        return jsonify({"error": "'comments' must be a list."}), 400
+
+    try:
+        with span("summarize"):
+            result = summary_service.summarize(comments)
+        return jsonify(result)
+    except Exception as e:
+        print(f"--- SUMMARY ERROR ---")
+        print(traceback.format_exc())
+        print(f"--- END ERROR ---")
+        return jsonify({"error": f"Summary generation failed: {str(e)}"}), 500
+
+@app.route("/api/summarize/stats", methods=["GET"])
+def summary_stats():
+    return jsonify(summary_service.stats())
 
 
 if __name__ == "__main__":
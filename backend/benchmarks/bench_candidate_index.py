@@ -0,0 +1,115 @@
+"""Candidate directory: in-memory index pages vs shipping every candidate row to the browser.
+
+    python benchmarks/bench_candidate_index.py --candidates 50000 --queries 200
+
+Reports index build time, browse/search page latencies (p50/p95, cold and
+cached-ranking), deep keyset paging, incremental update cost and the response
+size of one page versus the full candidate list the pickers used to download.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from candidate_index import CandidateFilters, CandidateIndex  # noqa: E402
+from synthetic import POSITIONS, ROUND_TYPES, make_candidates  # noqa: E402
+
+SYLLABLES = "ka ra an ni sh vi ja ya ma de pa ti ro su me ha la na ve di ku".split()
+
+
+def make_directory(count, seed=0):
+    """Users, profiles, schedules and scores shaped like load_candidate_directory()'s result."""
+    rng = random.Random(seed)
+    profiles = make_candidates(count, seed=seed)
+    users, schedules, scores = [], [], {}
+    for number, profile in enumerate(profiles):
+        # The synthetic first names and surnames repeat a lot; a generated middle name makes names realistic-ish.
+        middle = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        users.append({"uid": profile["user_id"], "full_name": f"{profile['first_name']} {middle} {profile['surname']}"})
+        for round_type in rng.sample(ROUND_TYPES, rng.randint(0, 3)):
+            schedules.append({"id": f"s{number}-{round_type}", "candidate_id": profile["user_id"], "round_type": round_type,
+                              "status": rng.choice(["Scheduled", "Pending Approval", "Completed"]),
+                              "date": f"2026-10-{rng.randint(1, 28):02d}", "start_time": "10:00"})
+        if rng.random() < 0.6:
+            scores[profile["user_id"]] = round(rng.uniform(20, 100), 2)
+    return users, profiles, schedules, scores
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95) - 1] * 1000
+
+
+def timed(fn, runs):
+    timings = []
+    for argument in runs:
+        start = time.perf_counter()
+        fn(argument)
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = make_directory(args.candidates, args.seed)
+    users = directory[0]
+    index = CandidateIndex(lambda: directory, refresh_interval=0, search_cache_size=2 * args.queries)
+    start = time.perf_counter()
+    index.ensure_loaded()
+    print(f"{args.candidates} candidates: index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(args.seed + 1)
+    names = [user["full_name"] for user in users]
+    prefixes = [rng.choice(names).split()[rng.randint(0, 2)][:rng.randint(2, 5)] for _ in range(args.queries)]
+    typos = []
+    for _ in range(args.queries):
+        word = rng.choice(rng.choice(names).split())
+        position = rng.randrange(1, len(word))
+        typos.append(word[:position] + word[position + 1:])
+    filters = [CandidateFilters(position=rng.choice(POSITIONS), score_band=rng.choice(["low", "medium", "high"]),
+                                round_status=rng.choice([None, "Scheduled", "Completed"])) for _ in range(args.queries)]
+
+    rows = [("first page", lambda _: index.page(limit=args.limit), range(args.queries))]
+    rows.append(("filtered page", lambda f: index.page(filters=f, limit=args.limit), filters))
+    rows.append(("prefix search (cold)", lambda q: index.page(q, limit=args.limit), prefixes))
+    rows.append(("prefix search (cached)", lambda q: index.page(q, limit=args.limit), prefixes))
+    rows.append(("fuzzy search (cold)", lambda q: index.page(q, limit=args.limit), typos))
+    rows.append(("fuzzy search (cached)", lambda q: index.page(q, limit=args.limit), typos))
+    print(f"{'query':<24}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, fn, runs in rows:
+        p50, p95 = timed(fn, runs)
+        print(f"{label:<24}{p50:>10.2f}{p95:>10.2f}")
+
+    start = time.perf_counter()
+    pages, cursor = 0, None
+    while True:
+        page = index.page(cursor=cursor, limit=args.limit)
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"keyset walk: {pages} pages in {elapsed * 1000:.0f} ms ({elapsed / pages * 1000:.3f} ms per page, flat with depth)")
+
+    updates = [(rng.choice(users)["uid"], f"Renamed {number}") for number in range(args.queries)]
+    p50, p95 = timed(lambda update: index.upsert_candidate(update[0], full_name=update[1]), updates)
+    print(f"incremental rename: p50 {p50:.3f} ms, p95 {p95:.3f} ms")
+
+    page_bytes = len(json.dumps(index.page(limit=args.limit)))
+    full_bytes = len(json.dumps([{"uid": u["uid"], "full_name": u["full_name"], "profile_image_url": None} for u in users]))
+    print(f"response size: one page {page_bytes / 1024:.1f} KiB vs full list {full_bytes / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
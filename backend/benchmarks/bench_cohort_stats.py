@@ -0,0 +1,106 @@
+"""Cohort statistics: per-candidate dict loops vs the vectorized NumPy engine.
+
+    python benchmarks/bench_cohort_stats.py --candidates 10000 --sections 40
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+from app import aggregate_report_data, build_candidate_info  # noqa: E402
+from cohort_stats import build_score_matrix, compute_cohort_stats  # noqa: E402
+from synthetic import make_candidates, make_evaluations  # noqa: E402
+
+
+def loop_based(candidates, evaluations):
+    """The pre-existing approach: aggregate each candidate with the report loops, then
+    compute cohort statistics with plain Python."""
+    by_candidate = {candidate["user_id"]: [] for candidate in candidates}
+    for eval_data in evaluations:
+        by_candidate[eval_data["candidate_uid"]].append(eval_data)
+
+    overall = {}
+    sections = {}
+    for candidate in candidates:
+        report = aggregate_report_data(build_candidate_info(candidate), by_candidate[candidate["user_id"]])
+        info = report["candidate_info"]
+        if info["total_max_score_sum"]:
+            overall[candidate["user_id"]] = info["total_score_sum"] / info["total_max_score_sum"] * 100
+        for section in report["section_scores"]:
+            if section["max"]:
+                sections.setdefault(section["section"], {})[candidate["user_id"]] = section["score"] / section["max"] * 100
+
+    def describe(values):
+        values = list(values)
+        quartiles = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+        return {"mean": statistics.fmean(values), "median": statistics.median(values),
+                "std": statistics.pstdev(values), "p90": quartiles[89]}
+
+    result = {"overall": describe(overall.values()), "sections": {name: describe(v.values()) for name, v in sections.items()}}
+    mean, std = result["overall"]["mean"], result["overall"]["std"]
+    first_position = {}
+    for position, value in enumerate(sorted(overall.values(), reverse=True)):
+        first_position.setdefault(value, position)
+    result["candidates"] = {
+        candidate_id: {"z": (value - mean) / std if std else 0.0, "rank": first_position[value] + 1}
+        for candidate_id, value in overall.items()
+    }
+    for name, values in sections.items():
+        section_mean, section_std = result["sections"][name]["mean"], result["sections"][name]["std"]
+        for candidate_id, value in values.items():
+            result["candidates"][candidate_id].setdefault("section_z", {})[name] = (value - section_mean) / section_std if section_std else 0.0
+    return result
+
+
+def vectorized(candidates, evaluations):
+    return compute_cohort_stats(build_score_matrix(evaluations, [c["user_id"] for c in candidates]))
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--evaluators", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json-strings", action="store_true",
+                        help="store score columns as JSON text (includes decode cost in both timings)")
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.candidates)
+    evaluations = make_evaluations(candidates, rounds=args.rounds, sections=args.sections, evaluators=args.evaluators,
+                                   comment_words=4, encode_json=args.json_strings)
+    print(f"{len(candidates)} candidates, {len(evaluations)} evaluations, {args.sections} sections, {args.rounds} rounds")
+
+    loop_time, loop_result = best_of(lambda: loop_based(candidates, evaluations), args.repeat)
+    numpy_time, numpy_result = best_of(lambda: vectorized(candidates, evaluations), args.repeat)
+    load_time, matrix = best_of(lambda: build_score_matrix(evaluations, [c["user_id"] for c in candidates]), args.repeat)
+    stats_time, _ = best_of(lambda: compute_cohort_stats(matrix), args.repeat)
+
+    assert abs(loop_result["overall"]["mean"] - numpy_result["overall"]["mean"]) < 0.01
+    assert abs(loop_result["overall"]["median"] - numpy_result["overall"]["median"]) < 0.01
+
+    print(f"{'approach':<12}{'seconds':>10}")
+    print(f"{'loops':<12}{loop_time:>10.3f}")
+    print(f"{'numpy':<12}{numpy_time:>10.3f}")
+    print(f"{'  load':<12}{load_time:>10.3f}")
+    print(f"{'  stats':<12}{stats_time:>10.3f}")
+    print(f"speedup: {loop_time / numpy_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Evaluation decoding and aggregation: stdlib json + dict scans vs the typed model and fast codec.
+
+    python benchmarks/bench_evaluation_model.py --evaluations 10000 --sections 40
+
+Times, per 10k evaluations, (1) parsing a PostgREST page of evaluation rows,
+(2) decoding the JSON score/comment columns and (3) aggregating them into
+report summaries plus individual responses, and the memory the decoded
+evaluations hold. "before" is the previous report
+path: stdlib json everywhere and a scan of the comment list for every
+section; "after" is json_codec (orjson when installed) and Evaluation rows
+with comments indexed by section.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import json_codec  # noqa: E402
+from evaluation_model import Evaluation  # noqa: E402
+from score_summary import apply_evaluation, new_summary  # noqa: E402
+from synthetic import make_candidates, make_evaluations  # noqa: E402
+
+
+def legacy_apply(summary, evaluation, quantitative, qualitative):
+    """apply_evaluation() as it was, fed decoded dicts, with the per-section scan of the comment list."""
+    if evaluation["id"] in summary["evaluation_ids"]:
+        return
+    round_totals = summary["rounds"].get(evaluation["round_type"])
+    if round_totals is None:
+        round_totals = summary["rounds"][evaluation["round_type"]] = {"score": 0, "max": 0}
+        summary["round_order"].append(evaluation["round_type"])
+    round_totals["score"] += evaluation["total_score"]
+    round_totals["max"] += evaluation["total_max_score"]
+    summary["total_score"] += evaluation["total_score"]
+    summary["total_max_score"] += evaluation["total_max_score"]
+    summary["evaluation_count"] += 1
+    summary["evaluation_ids"].append(evaluation["id"])
+    for module, data in quantitative.items():
+        section = summary["sections"].get(module)
+        if section is None:
+            section = summary["sections"][module] = {"score": 0, "max": 0}
+            summary["section_order"].append(module)
+        section["score"] += data.get("score", 0)
+        section["max"] += data.get("max", 0)
+        comment = next((c.get("comment", "N/A") for c in qualitative if c.get("round") == module), "N/A")
+        if comment != "N/A":
+            summary["comments"].setdefault(module, []).append(comment)
+
+
+def legacy_aggregate(rows):
+    """The previous aggregation: stdlib json.loads per column, then legacy_apply()."""
+    summaries, responses = {}, []
+    for row in rows:
+        quantitative = json.loads(row["quantitative_scores"])
+        qualitative = json.loads(row["qualitative_comments"])
+        responses.append({"id": row["id"], "round": row["round_type"], "score": row["total_score"],
+                          "max": row["total_max_score"], "sections": quantitative, "comments": qualitative})
+        legacy_apply(summaries.setdefault(row["candidate_uid"], {**new_summary(), "evaluation_ids": []}), row, quantitative, qualitative)
+    return summaries, responses
+
+
+def typed_aggregate(rows):
+    """The report path now: one Evaluation per row, shared by the summary and the individual responses."""
+    summaries, responses = {}, []
+    for row in rows:
+        evaluation = Evaluation.from_row(row)
+        responses.append({"id": evaluation.id, "round": evaluation.round_type, "score": evaluation.total_score,
+                          "max": evaluation.total_max_score, "sections": evaluation.sections,
+                          "comments": list(evaluation.comments)})
+        apply_evaluation(summaries.setdefault(evaluation.candidate_uid, new_summary()), evaluation)
+    return summaries, responses
+
+
+def allocated(fn):
+    """Bytes still allocated by what fn() returns."""
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=10000)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    evaluators = 2
+    candidates = make_candidates(max(1, args.evaluations // (args.rounds * evaluators)))
+    rows = make_evaluations(candidates, rounds=args.rounds, sections=args.sections, evaluators=evaluators)
+    body = json.dumps(rows).encode("utf-8")
+    per_10k = 10000 / len(rows)
+    print(f"{len(rows)} evaluations, {args.sections} sections over {args.rounds} rounds, page body {len(body) / 1e6:.1f} MB, "
+          f"codec: {'orjson' if json_codec.orjson else 'stdlib json'}")
+
+    columns = [(row["quantitative_scores"], row["qualitative_comments"]) for row in rows]
+    steps = [
+        ("parse page", lambda: json.loads(body), lambda: json_codec.loads(body)),
+        ("decode columns", lambda: [(json.loads(q), json.loads(c)) for q, c in columns],
+         lambda: [(json_codec.loads(q), json_codec.loads(c)) for q, c in columns]),
+        ("decode + aggregate", lambda: legacy_aggregate(rows), lambda: typed_aggregate(rows)),
+    ]
+    print(f"{'ms per 10k evaluations':<24}{'before':>10}{'after':>10}{'speedup':>10}")
+    for label, before, after in steps:
+        before_time, before_result = best_of(before, args.repeat)
+        after_time, after_result = best_of(after, args.repeat)
+        if label == "decode + aggregate":
+            assert {uid: s["sections"] for uid, s in before_result[0].items()} == {uid: s["sections"] for uid, s in after_result[0].items()}
+            assert {uid: s["comments"] for uid, s in before_result[0].items()} == {uid: s["comments"] for uid, s in after_result[0].items()}
+        print(f"{label:<24}{before_time * 1000 * per_10k:>10.1f}{after_time * 1000 * per_10k:>10.1f}{before_time / after_time:>9.1f}x")
+
+    before_bytes = allocated(lambda: [(json.loads(q), json.loads(c)) for q, c in columns])
+    after_bytes = allocated(lambda: [Evaluation.from_row(row) for row in rows])
+    print(f"{'decoded size (MB/10k)':<24}{before_bytes / 1e6 * per_10k:>10.1f}{after_bytes / 1e6 * per_10k:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
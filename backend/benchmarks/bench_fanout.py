@@ -0,0 +1,89 @@
+"""Report data latency with sequential vs concurrent Supabase reads, against a local stub with injected delay.
+
+    python benchmarks/bench_fanout.py --delay-ms 40 --iterations 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_supabase import FakeSupabase  # noqa: E402
+from synthetic import make_candidates, make_evaluations  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(label, iterations, call):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:<34} p50 {statistics.median(samples):7.1f} ms   p95 {percentile(samples, 95):7.1f} ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=40)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.candidates, seed=args.seed)
+    evaluations = make_evaluations(candidates, rounds=4, sections=20, seed=args.seed)
+    tables = {"candidate_profiles": candidates, "evaluations": evaluations, "candidate_score_summaries": []}
+    stub = FakeSupabase(tables, delay=args.delay_ms / 1000).start()
+
+    os.environ["SUPABASE_URL"] = stub.url
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+    import app  # noqa: E402
+
+    from score_summary import build_summary  # noqa: E402
+    by_candidate = {}
+    for evaluation in evaluations:
+        by_candidate.setdefault(evaluation["candidate_uid"], []).append(evaluation)
+    summary_rows = [
+        {"candidate_uid": candidate_id, "evaluation_count": len(rows), "summary": build_summary(rows), "updated_at": None}
+        for candidate_id, rows in by_candidate.items()
+    ]
+
+    rng = random.Random(args.seed)
+    ids = [candidate["user_id"] for candidate in candidates]
+    client = app.app.test_client()
+
+    def report_route():
+        candidate_id = rng.choice(ids)
+        app.report_cache.invalidate()
+        response = client.get(f"/api/report?candidate_id={candidate_id}")
+        assert response.status_code == 200, response.status_code
+
+    print(f"stub delay {args.delay_ms:.0f} ms per request, {len(evaluations)} evaluations")
+    results = {}
+    for mode, workers in (("sequential", 0), ("concurrent", app.supabase.fanout_workers or 16)):
+        app.supabase.fanout_workers = workers
+        print(mode)
+        tables["candidate_score_summaries"] = []
+        results[mode, "raw"] = measure("report data, raw evaluations", args.iterations,
+                                       lambda: app.fetch_candidate_data_for_report(rng.choice(ids)))
+        tables["candidate_score_summaries"] = summary_rows
+        results[mode, "summary"] = measure("report data, score summary", args.iterations,
+                                           lambda: app.fetch_candidate_data_for_report(rng.choice(ids), with_responses=False))
+        results[mode, "route"] = measure("GET /api/report (cache cleared)", args.iterations, report_route)
+
+    print("speedup (p50)")
+    for key, label in (("raw", "raw evaluations"), ("summary", "score summary"), ("route", "GET /api/report")):
+        print(f"  {label:<34} {results['sequential', key] / results['concurrent', key]:.2f}x")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""PDF text layout: the old per-word stringWidth wrap loop vs cached, linear wrapping.
+
+    python benchmarks/bench_pdf_layout.py --sections 300 --comment-words 400
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from reportlab.pdfbase.pdfmetrics import stringWidth  # noqa: E402
+
+from pdf_layout import _width_cache, wrap_text  # noqa: E402
+from report_pdf import render_pdf_report  # noqa: E402
+from synthetic import make_comment  # noqa: E402
+
+FONT, SIZE, WIDTH = "Helvetica", 9, 480
+
+
+def legacy_wrap(text, font, size, max_width):
+    """The loop the report used before: re-measures the whole growing line for every word."""
+    lines = []
+    line_buffer = ""
+    for word in text.split(' '):
+        if stringWidth(line_buffer + word, font, size) < max_width:
+            line_buffer += word + " "
+        else:
+            lines.append(line_buffer.strip())
+            line_buffer = word + " "
+    lines.append(line_buffer.strip())
+    return lines
+
+
+def make_report(sections, comment_words, seed):
+    rng = random.Random(seed)
+    section_scores = []
+    for i in range(sections):
+        score = rng.randint(0, 40)
+        section_scores.append({
+            "section": f"Section {i + 1}", "score": score, "max": 40,
+            "avg_score": round(score / 40 * 100, 2), "comment": make_comment(rng, comment_words),
+        })
+    return {
+        "candidate_info": {
+            "name": "Benchmark Candidate", "position": "Lecturer", "recommendation": "Recommended",
+            "total_score_sum": sum(s["score"] for s in section_scores), "total_max_score_sum": 40 * sections,
+        },
+        "grouped_by_round": [{"round": "Technical", "score": 10, "max_score": 20, "avg_score": 50.0}],
+        "section_scores": section_scores,
+        "ai_summary": make_comment(rng, comment_words),
+    }
+
+
+def best_of(repeat, fn):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--comment-words", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = make_report(args.sections, args.comment_words, args.seed)
+    comments = [s["comment"] for s in report["section_scores"]]
+    words = sum(len(comment.split()) for comment in comments)
+    print(f"{args.sections} comments, {words} words")
+
+    legacy_time, legacy_lines = best_of(args.repeat, lambda: [legacy_wrap(c, FONT, SIZE, WIDTH) for c in comments])
+
+    def wrap_cold():
+        _width_cache.clear()
+        return [wrap_text(c, FONT, SIZE, WIDTH) for c in comments]
+
+    cold_time, new_lines = best_of(args.repeat, wrap_cold)
+    warm_time, _ = best_of(args.repeat, lambda: [wrap_text(c, FONT, SIZE, WIDTH) for c in comments])
+
+    kept = sum(len(line.split()) for lines in new_lines for line in lines)
+    print(f"  legacy wrap        {legacy_time * 1000:9.1f} ms  ({sum(map(len, legacy_lines))} lines)")
+    print(f"  linear wrap, cold  {cold_time * 1000:9.1f} ms  ({sum(map(len, new_lines))} lines)")
+    print(f"  linear wrap, warm  {warm_time * 1000:9.1f} ms  ({legacy_time / warm_time:.1f}x)")
+    print(f"  words kept         {kept}/{words}")
+
+    render_time, pdf_bytes = best_of(args.repeat, lambda: render_pdf_report(report, "benchmark"))
+    pages = pdf_bytes.count(b"/Type /Page\n") or pdf_bytes.count(b"/Type /Page")
+    print(f"  full render        {render_time * 1000:9.1f} ms  ({len(pdf_bytes) / 1024:.0f} KiB, ~{pages} pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Report, export and analytics read latency from Supabase vs the local SQLite replica, against a local stub with injected delay.
+
+    python benchmarks/bench_replica.py --delay-ms 40 --candidates 500 --iterations 50
+
+The replica is bootstrapped once (full resync of every table); the
+incremental sync that keeps it current is timed with a handful of changed
+rows, the steady-state cost each sync interval.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_fanout import measure  # noqa: E402
+from fake_supabase import FakeSupabase, _now, seed_tables  # noqa: E402
+from synthetic import POSITIONS  # noqa: E402
+
+
+def run(args, directory):
+    tables = seed_tables(args.candidates, rounds=4, sections=20, seed=args.seed)
+    # Seeded rows last changed a day ago, outside the sync overlap window.
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat(timespec="microseconds")
+    for name in ("users", "candidate_profiles", "evaluations"):
+        for row in tables[name]:
+            row["updated_at"] = yesterday
+    stub = FakeSupabase(tables, delay=args.delay_ms / 1000).start()
+
+    os.environ["SUPABASE_URL"] = stub.url
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+    os.environ["SCORE_SUMMARIES"] = "0"
+    os.environ["REPLICA_PATH"] = os.path.join(directory, "replica.sqlite3")
+    # Keep the background thread out of the timings; syncs are run explicitly below.
+    os.environ["REPLICA_SYNC_INTERVAL"] = "3600"
+    os.environ["REPLICA_MAX_STALENESS"] = "3600"
+    os.environ["RESUME_INDEX_PATH"] = os.path.join(directory, "resume_index.sqlite3")
+    import app  # noqa: E402
+
+    replica = app.replica
+    start = time.perf_counter()
+    copied = sum(replica.resync(table) for table in replica.tables)
+    print(f"stub delay {args.delay_ms:.0f} ms per request; bootstrap resync of {copied} rows in {time.perf_counter() - start:.2f} s, "
+          f"replica {os.path.getsize(replica.path) / 1e6:.1f} MB")
+
+    rng = random.Random(args.seed)
+    ids = [profile["user_id"] for profile in tables["candidate_profiles"]]
+    calls = {
+        "report data (one candidate)": lambda: app.fetch_candidate_data_for_report(rng.choice(ids)),
+        "report version stamp": lambda: app.fetch_report_version(rng.choice(ids)),
+        "report data (50 candidates)": lambda: app.fetch_candidates_data_for_report(rng.sample(ids, 50)),
+        "cohort statistics": lambda: app.load_cohort_stats(rng.choice(POSITIONS)),
+        "candidate directory load": app.load_candidate_directory,
+    }
+    results = {}
+    for source in ("supabase", "replica"):
+        app.replica = replica if source == "replica" else None
+        print(source)
+        for label, call in calls.items():
+            results[source, label] = measure(label, args.iterations, call)
+    app.replica = replica
+
+    print("speedup (p50)")
+    for label in calls:
+        print(f"  {label:<34} {results['supabase', label] / results['replica', label]:.1f}x")
+
+    stamp = _now()
+    for row in rng.sample(tables["evaluations"], 10):
+        row["updated_at"] = stamp
+    start = time.perf_counter()
+    changed = sum(replica.sync(table, force=True) for table in replica.tables)
+    print(f"incremental sync of all tables ({changed} rows re-read) {(time.perf_counter() - start) * 1000:.0f} ms")
+    stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=40)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="replica-bench-")
+    try:
+        run(args, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
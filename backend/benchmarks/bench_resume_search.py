@@ -0,0 +1,200 @@
+"""Resume ingestion and search: extraction throughput, incremental indexing and ranked query latency.
+
+    python benchmarks/bench_resume_search.py --resumes 50000 --words 300
+
+Builds a throwaway index of synthetic resumes (resume text plus academic,
+experience and skills fields) through the same per-event writes the server
+makes as uploads finish and profiles are saved, then times searches:
+common and rare terms, multi-word queries and the prefix match used while
+typing. "scan" is what answering the same query takes without an index
+(a substring check over every candidate's text); --fts5 also times the
+same top-20 bm25 query against an SQLite FTS5 table of the same documents.
+Extraction throughput is measured for a generated PDF and DOCX with the
+installed extractor.
+"""
+import argparse
+import hashlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from resume_index import ResumeIndex, query_words  # noqa: E402
+from resume_text import extract_file  # noqa: E402
+from synthetic import FIRST_NAMES, POSITIONS  # noqa: E402
+
+SKILLS = ["python", "java", "tally", "excel", "sap", "autocad", "matlab", "django", "react", "sql", "gst", "accounting",
+          "pedagogy", "curriculum", "research", "machine learning", "statistics", "physics", "chemistry", "marathi"]
+ORGANIZATIONS = ["Infosys", "TCS", "Wipro", "Deloitte", "Bajaj Finserv", "Tata Motors", "Persistent", "Kotak", "L&T", "Cipla"]
+CITIES = ["Pune", "Mumbai", "Nashik", "Nagpur", "Bengaluru", "Hyderabad", "Chennai", "Delhi"]
+DEGREES = ["B.Com", "M.Com", "B.Tech", "M.Tech", "B.Sc", "M.Sc", "MBA", "Ph.D", "B.Ed", "M.A"]
+FILLER = ("responsible for managing team projects delivered reports clients students department worked years "
+          "experience developed implemented designed taught coordinated analysis quality training documentation "
+          "improved process planning budget reviews laboratory university college school course syllabus").split()
+# A few words that occur in well under 1% of resumes.
+RARE = ["kubernetes", "spectroscopy", "actuarial", "sanskrit", "blockchain"]
+
+QUERIES = {
+    "common term": ["python", "pune", "experience", "tally", "research"],
+    "rare term": RARE,
+    "two terms": ["python django", "tally gst", "pune accounting", "research physics", "excel mumbai"],
+    "three terms": ["python django pune", "m.com tally gst", "research physics ph.d"],
+    "prefix (typing)": ["pyt", "acc", "deloi", "stat", "curr"],
+}
+
+
+def make_resume(rng, words):
+    body = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.08:
+            body.append(rng.choice(SKILLS))
+        elif roll < 0.11:
+            body.append(rng.choice(ORGANIZATIONS))
+        elif roll < 0.14:
+            body.append(rng.choice(CITIES))
+        else:
+            body.append(rng.choice(FILLER))
+    if rng.random() < 0.005:
+        body.insert(rng.randrange(len(body)), rng.choice(RARE))
+    text = f"{rng.choice(FIRST_NAMES)} - {rng.choice(POSITIONS)}\n" + " ".join(body)
+    profile = {
+        "academic_details": [{"degree": rng.choice(DEGREES), "board": f"University of {rng.choice(CITIES)}"}],
+        "experience_details": [{"organization": rng.choice(ORGANIZATIONS), "designation": rng.choice(POSITIONS)}],
+        "computer_skills": {skill: rng.choice(["Good", "Expert"]) for skill in rng.sample(SKILLS, 3)},
+    }
+    return text, profile
+
+
+def make_pdf(text):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    buffer = io.BytesIO()
+    style = getSampleStyleSheet()["Normal"]
+    SimpleDocTemplate(buffer).build([Paragraph(escape(line), style) for line in text.split("\n")])
+    return buffer.getvalue()
+
+
+def make_docx(text):
+    namespace = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    paragraphs = "".join(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in text.split("\n"))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", f"<w:document {namespace}><w:body>{paragraphs}</w:body></w:document>")
+    return buffer.getvalue()
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95) - 1] * 1000
+
+
+def extraction_rate(path, kind, seconds=2.0):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        extract_file(path, kind)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(args, rng, directory):
+    # --- Extraction ---
+    sample_text, _ = make_resume(rng, 600)
+    sample_text = "\n".join(sample_text[i:i + 90] for i in range(0, len(sample_text), 90))
+    for kind, data in (("pdf", make_pdf(sample_text)), ("docx", make_docx(sample_text))):
+        path = os.path.join(directory, f"sample.{kind}")
+        with open(path, "wb") as handle:
+            handle.write(data)
+        print(f"extract {kind:<5} {len(data) / 1024:>6.1f} KB  {extraction_rate(path, kind):>8.0f} files/s per worker")
+
+    # --- Incremental indexing ---
+    index = ResumeIndex(os.path.join(directory, "resume_index.sqlite3"))
+    corpus = []
+    start = time.perf_counter()
+    for number in range(args.resumes):
+        text, profile = make_resume(rng, args.words)
+        sha256 = hashlib.sha256(text.encode()).hexdigest()
+        url = f"https://example.supabase.co/storage/v1/object/public/resumes/{sha256}.pdf"
+        uid = f"candidate-{number}"
+        # What the server does per candidate: the upload completes, its extraction lands, the profile is saved.
+        index.add_file(sha256, "pdf", len(text), "cv.pdf", url)
+        index.set_file_result(sha256, "done", text=text)
+        index.upsert_candidate(uid, {**profile, "resume_url": url})
+        corpus.append((uid, text, profile))
+    elapsed = time.perf_counter() - start
+    index.optimize()
+    print(f"indexed {args.resumes} resumes ({args.words} words each) in {elapsed:.1f} s: "
+          f"{args.resumes / elapsed:.0f} candidates/s, database {index.stats()['size_bytes'] / 1e6:.0f} MB")
+
+    # A freshly started worker builds its in-memory index from the database on the first search.
+    index = ResumeIndex(index.path)
+    start = time.perf_counter()
+    index.terms.ensure_loaded()
+    memory = index.terms.stats()
+    print(f"in-memory index loaded in {time.perf_counter() - start:.2f} s: {memory['terms']} terms, {memory['postings']} postings")
+
+    fts = None
+    if args.fts5:
+        fts = sqlite3.connect(os.path.join(directory, "fts5.sqlite3"))
+        fts.execute("CREATE VIRTUAL TABLE docs USING fts5(resume, profile, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+        fts.executemany("INSERT INTO docs (resume, profile) VALUES (?, ?)", ((text, str(profile)) for _, text, profile in corpus))
+        fts.commit()
+    scan_corpus = [(uid, " ".join([text, str(profile)]).lower()) for uid, text, profile in corpus]
+
+    # --- Queries ---
+    print(f"{'query (limit 20)':<18}{'matches':>9}{'p50 ms':>9}{'p95 ms':>9}{'scan p50 ms':>13}" + (f"{'fts5 p50 ms':>13}" if fts else ""))
+    for label, queries in QUERIES.items():
+        timings, matches = [], []
+        for _ in range(args.repeat):
+            for query in queries:
+                begin = time.perf_counter()
+                _, total = index.search(query, limit=20)
+                timings.append(time.perf_counter() - begin)
+                matches.append(total)
+        scans = []
+        for query in queries:
+            words = query.lower().split()
+            begin = time.perf_counter()
+            [uid for uid, text in scan_corpus if all(word in text for word in words)]
+            scans.append(time.perf_counter() - begin)
+        p50, p95 = percentiles(timings)
+        line = f"{label:<18}{statistics.median(matches):>9.0f}{p50:>9.2f}{p95:>9.2f}{statistics.median(scans) * 1000:>13.1f}"
+        if fts:
+            fts_timings = []
+            for query in queries:
+                terms = [f'"{word}"' for word in query_words(query)]
+                terms[-1] += "*"
+                begin = time.perf_counter()
+                fts.execute("SELECT rowid FROM docs WHERE docs MATCH ? ORDER BY bm25(docs) LIMIT 20", (" ".join(terms),)).fetchall()
+                fts_timings.append(time.perf_counter() - begin)
+            line += f"{statistics.median(fts_timings) * 1000:>13.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=300, help="Words per synthetic resume.")
+    parser.add_argument("--repeat", type=int, default=40, help="Runs per query.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fts5", action="store_true", help="Also time an SQLite FTS5 index of the same documents.")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="resume-bench-")
+    try:
+        run(args, random.Random(args.seed), directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Scheduling engine: interval-index conflict checks and auto-slotting on synthetic calendars.
+
+    python benchmarks/bench_schedule_engine.py --interviews 6000 --evaluators 80 --rooms 20
+
+Builds a ScheduleBook from a synthetic calendar, then reports conflict-check
+latency (p50/p95) against a linear scan over every schedule (what checking
+conflicts against the schedules table row by row amounts to), and the time to
+auto-slot a batch of candidates across a set of panels.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from schedule_engine import ScheduleBook, parse_minutes, slot_resources  # noqa: E402
+from synthetic import ROUND_TYPES, make_candidates  # noqa: E402
+
+DURATIONS = (30, 45, 60, 90)
+
+
+def make_calendar(interviews, evaluators, rooms, days, seed=0):
+    """Schedule rows spread over working hours of `days` weekdays starting tomorrow (overlaps included)."""
+    rng = random.Random(seed)
+    candidates = make_candidates(max(1, interviews // 3), seed=seed)
+    first = date.today() + timedelta(days=1)
+    dates = [first + timedelta(days=offset) for offset in range(days * 2)]
+    dates = [day.isoformat() for day in dates if day.isoweekday() <= 5][:days]
+    schedules = []
+    for number in range(interviews):
+        start = rng.randrange(9 * 60, 17 * 60, 15)
+        end = start + rng.choice(DURATIONS)
+        offline = rng.random() < 0.5
+        schedules.append({
+            "id": f"s{number}", "candidate_id": rng.choice(candidates)["user_id"],
+            "evaluator_uids": [f"ev{uid}" for uid in rng.sample(range(evaluators), rng.randint(1, 3))],
+            "mode": "Offline" if offline else "Online", "location": f"Room {rng.randrange(rooms)}" if offline else None,
+            "date": rng.choice(dates), "start_time": f"{start // 60:02d}:{start % 60:02d}",
+            "end_time": f"{end // 60:02d}:{end % 60:02d}", "status": rng.choice(["Scheduled", "Pending Approval"]),
+            "round_type": rng.choice(ROUND_TYPES),
+        })
+    return schedules, dates
+
+
+def linear_conflicts(schedules, proposal):
+    """The baseline: compare the proposal with every schedule."""
+    start = parse_minutes(proposal["date"], proposal["start_time"])
+    end = parse_minutes(proposal["date"], proposal["end_time"])
+    resources = set(slot_resources(proposal))
+    found = []
+    for schedule in schedules:
+        other_start = parse_minutes(schedule["date"], schedule["start_time"])
+        other_end = parse_minutes(schedule["date"], schedule["end_time"])
+        if other_start < end and start < other_end and resources.intersection(slot_resources(schedule)):
+            found.append(schedule["id"])
+    return found
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=6000)
+    parser.add_argument("--evaluators", type=int, default=80)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--checks", type=int, default=500)
+    parser.add_argument("--slot-candidates", type=int, default=300)
+    parser.add_argument("--panels", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    schedules, dates = make_calendar(args.interviews, args.evaluators, args.rooms, args.days, args.seed)
+    book = ScheduleBook(lambda: schedules, refresh_interval=0)
+    start = time.perf_counter()
+    book.ensure_loaded()
+    print(f"{args.interviews} interviews, {args.evaluators} evaluators, {args.rooms} rooms over {len(dates)} days: "
+          f"book built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(args.seed + 1)
+    proposals, _ = make_calendar(args.checks, args.evaluators, args.rooms, args.days, args.seed + 2)
+    indexed, linear, mismatches = [], [], 0
+    for proposal in proposals:
+        start = time.perf_counter()
+        found = book.conflicts(proposal)
+        indexed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = linear_conflicts(schedules, proposal)
+        linear.append(time.perf_counter() - start)
+        mismatches += {conflict["schedule_id"] for conflict in found} != set(expected)
+    print(f"{'conflict check':<24}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, timings in (("interval index", indexed), ("linear scan", linear)):
+        p50, p95 = percentiles(timings)
+        print(f"{label:<24}{p50:>10.3f}{p95:>10.3f}")
+    print(f"results differing from the linear scan: {mismatches} of {len(proposals)}")
+
+    timings = []
+    for number in range(args.checks):
+        schedule = dict(rng.choice(schedules), start_time=f"{rng.randrange(9, 17):02d}:00")
+        start = time.perf_counter()
+        book.apply_schedule("update", schedule)
+        timings.append(time.perf_counter() - start)
+    p50, p95 = percentiles(timings)
+    print(f"incremental update: p50 {p50:.3f} ms, p95 {p95:.3f} ms")
+
+    candidate_ids = [candidate["user_id"] for candidate in make_candidates(args.slot_candidates, seed=args.seed + 3)]
+    panels = [{"evaluator_uids": [f"ev{uid}" for uid in rng.sample(range(args.evaluators), 2)],
+               "location": f"Room {number % args.rooms}"} for number in range(args.panels)]
+    start = time.perf_counter()
+    assignments, unplaced = book.auto_slot(candidate_ids, panels, dates[:10], "09:00", "17:00", 45, buffer=10, mode="Offline")
+    elapsed = time.perf_counter() - start
+    print(f"auto-slot: {len(assignments)} of {len(candidate_ids)} candidates placed across {len(panels)} panels "
+          f"in {elapsed * 1000:.0f} ms ({len(unplaced)} unplaced)")
+    clashes = sum(bool(book.conflicts(assignment)) for assignment in assignments)
+    print(f"auto-slot assignments clashing with existing bookings: {clashes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Checks that importing the backend stays within its start-up budget, using `python -X importtime`.
+
+    python benchmarks/check_import_time.py --budget-ms 500 --runs 3
+
+Fails (exit 1) if the fastest run's total import time exceeds the budget, or if a
+heavy dependency that should load lazily (ReportLab, NumPy, the GenAI SDK) is
+imported by `import app`. Listed under "Backend Checks" in the README.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LAZY_MODULES = ("reportlab", "numpy", "google.genai")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_import(module="app"):
+    """Returns [(name, self_us, cumulative_us, depth)] for one fresh interpreter importing `module`."""
+    env = {
+        **os.environ,
+        "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://127.0.0.1:54321"),
+        "SUPABASE_SERVICE_ROLE_KEY": os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "import-check"),
+        "WARMUP_ON_START": "0",
+    }
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=500, help="Maximum total import time (fastest run).")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure; the fastest counts.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports of the module to list.")
+    parser.add_argument("--lazy", default=",".join(LAZY_MODULES), help="Modules that must not load at import.")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(max(1, args.runs))]
+    # Interpreter start-up (site, encodings) is not the backend's to budget; only the module's own entry counts.
+    totals = [sum(cumulative for name, _, cumulative, depth in entries if depth == 0 and name == args.module) / 1000
+              for entries in runs]
+    best = runs[totals.index(min(totals))]
+
+    print(f"import {args.module}: {min(totals):.0f} ms (fastest of {len(runs)}; budget {args.budget_ms:.0f} ms)")
+    top_level = sorted((entry for entry in best if entry[3] == 1), key=lambda entry: entry[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if not min(totals):
+        failures.append(f"no import time was reported for {args.module}")
+    elif min(totals) > args.budget_ms:
+        failures.append(f"total import time {min(totals):.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    loaded = {name for name, _, _, _ in best}
+    for module in filter(None, args.lazy.split(",")):
+        if module in loaded:
+            failures.append(f"{module} is imported at start-up; import it where it is used")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Local stand-in for the Supabase PostgREST and auth-admin endpoints the backend calls.
+
+    python benchmarks/fake_supabase.py --port 54321 --candidates 500 --delay-ms 20
+
+Then start the backend with SUPABASE_URL=http://127.0.0.1:54321.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RESERVED_PARAMS = ("select", "order", "limit", "offset", "on_conflict", "columns")
+# Primary keys used for upserts (Prefer: resolution=merge-duplicates) and duplicate detection.
+PRIMARY_KEYS = {"candidate_score_summaries": "candidate_uid"}
+# Tables whose `updated_at` a trigger maintains (moddatetime in the real schema), so the local replica can sync them.
+TIMESTAMPED_TABLES = ("users", "candidate_profiles", "schedules", "evaluations")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _matches(row, column, expression):
+    op, _, value = expression.partition(".")
+    cell = row.get(column)
+    text = str(cell).lower() if isinstance(cell, bool) else (None if cell is None else str(cell))
+    if op == "eq":
+        return text == value
+    if op == "neq":
+        return text != value
+    if op == "in":
+        return text in {item.strip('"') for item in value.strip("()").split(",")}
+    if op == "is":
+        return cell is None if value == "null" else text == value
+    if op in ("gt", "gte", "lt", "lte"):
+        if text is None:
+            return False
+        return {"gt": text > value, "gte": text >= value, "lt": text < value, "lte": text <= value}[op]
+    return True
+
+
+def _order(rows, spec):
+    for part in reversed(spec.split(",")):
+        column, _, direction = part.partition(".")
+        rows = sorted(rows, key=lambda row: (row.get(column) is None, str(row.get(column) or "")), reverse=direction.startswith("desc"))
+    return rows
+
+
+def _project(row, select):
+    """Applies a select list: plain columns, `alias:column` and `alias:column->key` JSON paths. Embeds are skipped."""
+    projected = {}
+    for item in select.split(","):
+        alias, _, source = item.partition(":")
+        column, _, path = (source or alias).partition("->")
+        if column not in row:
+            continue
+        value = row[column]
+        if path:
+            value = json.loads(value) if isinstance(value, str) else value
+            value = (value or {}).get(path.lstrip(">"))
+        projected[alias if source else (path.lstrip(">") or column)] = value
+    return projected
+
+
+def seed_tables(candidates=200, rounds=4, sections=20, evaluators=2, comment_words=12, seed=0):
+    """Synthetic candidate_profiles, users and evaluations tables at the requested scale."""
+    from synthetic import make_candidates, make_evaluations
+
+    profiles = make_candidates(candidates, seed=seed)
+    evaluations = make_evaluations(profiles, rounds=rounds, sections=sections, evaluators=evaluators,
+                                   comment_words=comment_words, seed=seed)
+    users = [
+        {"uid": profile["user_id"], "full_name": f"{profile['first_name']} {profile['surname']}", "role": "candidate"}
+        for profile in profiles
+    ]
+    stamp = _now()
+    for row in (*profiles, *users, *evaluations):
+        row.setdefault("updated_at", stamp)
+    return {"candidate_profiles": profiles, "users": users, "evaluations": evaluations, "schedules": [], "candidate_score_summaries": []}
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline hang up mid-response; that is expected here.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class FakeSupabase:
+    """Serves `tables` (name -> list of row dicts) over PostgREST-shaped REST plus the auth admin and storage APIs.
+
+    Every response is delayed by `delay` seconds to stand in for network
+    latency. Reads support eq/neq/in/is/gt/lt filters, select, order, limit,
+    Range paging and `Prefer: count=exact`; writes support insert, upsert
+    (`resolution=merge-duplicates`), filtered PATCH and DELETE, stamping
+    `updated_at` on the TIMESTAMPED_TABLES as their triggers would. Storage
+    objects are uploaded with POST and read back from their public URL.
+    """
+
+    def __init__(self, tables, delay=0.0, host="127.0.0.1", port=0):
+        self.tables = tables
+        self.delay = delay
+        self.auth_users = {}
+        # "bucket/name" -> (content type, bytes)
+        self.objects = {}
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this, Nagle plus delayed ACKs add ~40 ms.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _parse(self):
+                time.sleep(fake.delay)
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                return parsed.path, params
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"null")
+
+            def _filtered(self, table, params):
+                rows = fake.tables.get(table, [])
+                for column, expression in params.items():
+                    if column not in RESERVED_PARAMS:
+                        rows = [row for row in rows if _matches(row, column, expression)]
+                return rows
+
+            def _returning(self, rows, status):
+                if "return=minimal" in (self.headers.get("Prefer") or ""):
+                    return self._send(status if status != 200 else 204, None)
+                self._send(status, rows)
+
+            def _storage_object(self, path):
+                return path.split("/storage/v1/object/", 1)[1].removeprefix("public/")
+
+            def do_GET(self):
+                path, params = self._parse()
+                if "/storage/v1/object/public/" in path:
+                    stored = fake.objects.get(self._storage_object(path))
+                    if stored is None:
+                        return self._send(404, {"statusCode": "404", "error": "not_found", "message": "Object not found"})
+                    return self._send_bytes(200, stored[1], stored[0])
+                table = path.rsplit("/", 1)[-1]
+                if table not in fake.tables:
+                    return self._send(404, {"message": f"relation {table} does not exist"})
+                with fake.lock:
+                    rows = self._filtered(table, params)
+                if "order" in params:
+                    rows = _order(rows, params["order"])
+                total = len(rows)
+                if "offset" in params:
+                    rows = rows[int(params["offset"]):]
+                if "limit" in params:
+                    rows = rows[:int(params["limit"])]
+
+                headers = {}
+                if self.headers.get("Range"):
+                    first, last = (int(bound) for bound in self.headers["Range"].split("-"))
+                    rows = rows[first:last + 1]
+                    headers["Content-Range"] = f"{first}-{first + len(rows) - 1}/{total}"
+                elif "count=exact" in (self.headers.get("Prefer") or ""):
+                    headers["Content-Range"] = f"0-{max(len(rows) - 1, 0)}/{total}"
+                if params.get("select", "*") != "*":
+                    rows = [_project(row, params["select"]) for row in rows]
+                self._send(200, rows, headers)
+
+            def do_POST(self):
+                path, params = self._parse()
+                if "/storage/v1/object/" in path:
+                    name = self._storage_object(path)
+                    data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                    with fake.lock:
+                        if name in fake.objects and self.headers.get("x-upsert") != "true":
+                            return self._send(400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"})
+                        fake.objects[name] = (self.headers.get("Content-Type"), data)
+                    return self._send(200, {"Key": name})
+                body = self._body()
+                if path.endswith("/auth/v1/admin/users"):
+                    if not body or not body.get("email"):
+                        return self._send(422, {"msg": "email is required"})
+                    user_id = str(uuid.uuid4())
+                    with fake.lock:
+                        if any(user["email"] == body["email"] for user in fake.auth_users.values()):
+                            return self._send(422, {"msg": "A user with this email address has already been registered"})
+                        fake.auth_users[user_id] = {"id": user_id, **body}
+                    return self._send(200, {"id": user_id, "email": body["email"]})
+
+                table = path.rsplit("/", 1)[-1]
+                rows = body if isinstance(body, list) else [body]
+                key = PRIMARY_KEYS.get(table, "id")
+                merge = "merge-duplicates" in (self.headers.get("Prefer") or "")
+                with fake.lock:
+                    stored = fake.tables.setdefault(table, [])
+                    by_key = {row.get(key): row for row in stored if row.get(key) is not None}
+                    stamp = _now()
+                    for row in rows:
+                        if key == "id":
+                            row.setdefault("id", str(uuid.uuid4()))
+                        if table in TIMESTAMPED_TABLES:
+                            row["updated_at"] = stamp
+                        existing = by_key.get(row.get(key))
+                        if existing is not None and not merge:
+                            return self._send(409, {"code": "23505", "message": "duplicate key value violates unique constraint"})
+                        if existing is not None:
+                            existing.update(row)
+                        else:
+                            stored.append(row)
+                            by_key[row.get(key)] = row
+                self._returning(rows, 201)
+
+            def do_PATCH(self):
+                path, params = self._parse()
+                body = self._body()
+                table = path.rsplit("/", 1)[-1]
+                with fake.lock:
+                    rows = self._filtered(table, params)
+                    stamp = _now()
+                    for row in rows:
+                        row.update(json.loads(json.dumps(body)))
+                        if table in TIMESTAMPED_TABLES:
+                            row["updated_at"] = stamp
+                self._returning(rows, 200)
+
+            def do_DELETE(self):
+                path, params = self._parse()
+                if "/auth/v1/admin/users/" in path:
+                    with fake.lock:
+                        fake.auth_users.pop(path.rsplit("/", 1)[-1], None)
+                    return self._send(200, {})
+                table = path.rsplit("/", 1)[-1]
+                with fake.lock:
+                    doomed = self._filtered(table, params)
+                    doomed_ids = {id(row) for row in doomed}
+                    fake.tables[table] = [row for row in fake.tables.get(table, []) if id(row) not in doomed_ids]
+                self._returning(doomed, 200)
+
+            def _send(self, status, body, headers=None):
+                payload = b"" if body is None else json.dumps(body).encode()
+                self._send_bytes(status, payload, "application/json", headers)
+
+            def _send_bytes(self, status, payload, content_type, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = _QuietServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tables = seed_tables(args.candidates, args.rounds, args.sections, seed=args.seed)
+    fake = FakeSupabase(tables, delay=args.delay_ms / 1000, host=args.host, port=args.port)
+    print(f"Fake Supabase on {fake.url}: {len(tables['candidate_profiles'])} candidates, {len(tables['evaluations'])} evaluations")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Load generator for the backend: drives candidate creation, reports, CSV exports and summaries at a
+target concurrency and records p50/p95/p99 latency and throughput.
+
+By default the backend runs in-process against a seeded fake Supabase:
+
+    python benchmarks/load_test.py --concurrency 16 --duration 30 --candidates 500 --delay-ms 10
+
+Or point it at a backend that is already running (with its own fake Supabase):
+
+    python benchmarks/load_test.py --target http://127.0.0.1:5000 --supabase-url http://127.0.0.1:54321
+
+Results are written to benchmarks/results/latest.json, which check_metrics.py reads.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+from fake_supabase import FakeSupabase, seed_tables  # noqa: E402
+from synthetic import COMMENT_WORDS, FIRST_NAMES, POSITIONS, SURNAMES  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_MIX = "add=1,report=4,excel=3,summarize=2"
+
+
+# --- SCENARIOS ---
+def add_candidate(session, base_url, candidate_ids, rng):
+    return session.post(f"{base_url}/api/candidate/add", json={
+        "first_name": rng.choice(FIRST_NAMES),
+        "surname": rng.choice(SURNAMES),
+        "email": f"load-{uuid.uuid4().hex}@example.com",
+        "position_applied_for": rng.choice(POSITIONS),
+    })
+
+
+def pdf_report(session, base_url, candidate_ids, rng):
+    return session.get(f"{base_url}/api/report", params={"candidate_id": rng.choice(candidate_ids)})
+
+
+def excel_report(session, base_url, candidate_ids, rng):
+    return session.get(f"{base_url}/api/report/excel", params={"candidate_id": rng.choice(candidate_ids)})
+
+
+def summarize(session, base_url, candidate_ids, rng):
+    comments = [" ".join(rng.choice(COMMENT_WORDS) for _ in range(20)) for _ in range(rng.randint(4, 16))]
+    return session.post(f"{base_url}/api/summarize", json={"comments": comments})
+
+
+SCENARIOS = {"add": add_candidate, "report": pdf_report, "excel": excel_report, "summarize": summarize}
+ENDPOINTS = {"add": "POST /api/candidate/add", "report": "GET /api/report", "excel": "GET /api/report/excel", "summarize": "POST /api/summarize"}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from {', '.join(SCENARIOS)}.")
+        mix[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+# --- STATISTICS ---
+def percentile(ordered, pct):
+    if not ordered:
+        return None
+    rank = pct / 100 * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_samples(samples, elapsed):
+    latencies = sorted(ms for ms, ok in samples)
+    errors = sum(1 for ms, ok in samples if not ok)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        **{f"p{pct}_ms": round(percentile(latencies, pct), 2) if latencies else None for pct in (50, 95, 99)},
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+# --- RUNNER ---
+def run_load(base_url, candidate_ids, mix, concurrency, duration, total_requests=None, seed=0):
+    """Runs `concurrency` closed-loop clients until `duration` seconds pass (or `total_requests` are sent)."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    failures = {}
+    lock = threading.Lock()
+    sent = [0]
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            with lock:
+                if total_requests is not None and sent[0] >= total_requests:
+                    return
+                sent[0] += 1
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = SCENARIOS[name](session, base_url, candidate_ids, rng)
+                response.content
+                ok = response.status_code < 400
+                error = None if ok else f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                ok, error = False, type(e).__name__
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with lock:
+                samples[name].append((elapsed_ms, ok))
+                if error:
+                    failures[f"{name}: {error}"] = failures.get(f"{name}: {error}", 0) + 1
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_samples = [sample for rows in samples.values() for sample in rows]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "overall": summarize_samples(all_samples, elapsed),
+        "scenarios": {ENDPOINTS[name]: summarize_samples(rows, elapsed) for name, rows in samples.items()},
+        "failures": failures,
+    }
+
+
+def start_in_process_backend(args):
+    """Seeds a fake Supabase, imports the backend against it and serves it on a free local port."""
+    tables = seed_tables(args.candidates, args.rounds, args.sections, seed=args.seed)
+    fake = FakeSupabase(tables, delay=args.delay_ms / 1000).start()
+
+    os.environ["SUPABASE_URL"] = fake.url
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "load-test"
+    if args.cold:
+        # No cached report data or files, so every report request does the full fetch + render.
+        os.environ["REPORT_CACHE_SIZE"] = "0"
+
+    from werkzeug.serving import make_server
+    import app
+
+    # Per-request access logs would dominate the output and skew timings.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    candidate_ids = [profile["user_id"] for profile in tables["candidate_profiles"]]
+    return f"http://127.0.0.1:{server.server_port}", candidate_ids, {
+        "candidates": len(candidate_ids), "evaluations": len(tables["evaluations"]), "supabase_delay_ms": args.delay_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Base URL of a running backend. Omit to run the backend in-process.")
+    parser.add_argument("--supabase-url", default="http://127.0.0.1:54321", help="With --target: where to read candidate IDs from.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run after warm-up.")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead of at the end of --duration.")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of unrecorded load before measuring.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX}).")
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=10, help="Latency injected into every fake Supabase response.")
+    parser.add_argument("--cold", action="store_true", help="Disable the report cache (in-process backend only).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.target:
+        base_url = args.target.rstrip("/")
+        response = requests.get(f"{args.supabase_url.rstrip('/')}/rest/v1/candidate_profiles", params={"select": "user_id"})
+        candidate_ids = [row["user_id"] for row in response.json()]
+        dataset = {"candidates": len(candidate_ids)}
+    else:
+        base_url, candidate_ids, dataset = start_in_process_backend(args)
+    if not candidate_ids:
+        raise SystemExit("No candidates to request reports for.")
+
+    if args.warmup > 0:
+        run_load(base_url, candidate_ids, mix, args.concurrency, args.warmup, seed=args.seed + 1)
+    result = run_load(base_url, candidate_ids, mix, args.concurrency, args.duration, args.requests, seed=args.seed)
+
+    result = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "target": args.target or "in-process", "concurrency": args.concurrency, "duration_s": args.duration,
+            "mix": mix, "cold_cache": args.cold, **dataset,
+        },
+        **result,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as output_file:
+        json.dump(result, output_file, indent=2)
+
+    print(f"{result['overall']['count']} requests in {result['elapsed_s']} s at concurrency {args.concurrency}")
+    print(f"{'endpoint':<26} {'count':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, stats in [*result["scenarios"].items(), ("overall", result["overall"])]:
+        print(f"{endpoint:<26} {stats['count']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms'] or 0:>9.1f} {stats['p95_ms'] or 0:>9.1f} {stats['p99_ms'] or 0:>9.1f} {stats['max_ms'] or 0:>9.1f}")
+    for failure, count in sorted(result["failures"].items()):
+        print(f"  {count} x {failure}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Synthetic candidates and evaluations shaped like the rows the frontend writes."""
+import json
+import random
+import uuid
+
+ROUND_TYPES = ["Technical", "HR", "Demo Lecture", "Psychometric", "Group Discussion", "Principal"]
+POSITIONS = ["Assistant Professor", "Associate Professor", "Lecturer", "Lab Assistant"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Kavya", "Rohan", "Sneha", "Vikram", "Ananya", "Arjun", "Meera", "Nikhil", "Pooja"]
+SURNAMES = ["Patil", "Sharma", "Iyer", "Kulkarni", "Deshmukh", "Nair", "Joshi", "Reddy", "Gupta", "Menon"]
+COMMENT_WORDS = ("clear structured confident articulate thorough practical strong weak needs improvement "
+                 "depth examples communication subject knowledge pedagogy research experience teamwork").split()
+
+
+def make_comment(rng, words=12):
+    return " ".join(rng.choice(COMMENT_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_candidates(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "user_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "first_name": rng.choice(FIRST_NAMES),
+            "surname": rng.choice(SURNAMES),
+            "position_applied_for": rng.choice(POSITIONS),
+            "final_verdict": None,
+        }
+        for _ in range(count)
+    ]
+
+
+def make_evaluations(candidates, rounds=4, sections=40, evaluators=2, comment_words=12, seed=0, encode_json=True):
+    """Every candidate gets `evaluators` evaluations per round; sections are split evenly across rounds."""
+    rng = random.Random(seed)
+    round_names = (ROUND_TYPES * (rounds // len(ROUND_TYPES) + 1))[:rounds]
+    round_names = [name if i < len(ROUND_TYPES) else f"{name} {i}" for i, name in enumerate(round_names)]
+    section_names = [f"Section {i + 1}" for i in range(sections)]
+    per_round = max(1, sections // rounds)
+
+    evaluations = []
+    for candidate in candidates:
+        for r, round_type in enumerate(round_names):
+            round_sections = section_names[r * per_round:(r + 1) * per_round] or section_names[:per_round]
+            for e in range(evaluators):
+                quantitative = {}
+                qualitative = []
+                for section in round_sections:
+                    quantitative[section] = {"score": rng.randint(0, 40), "max": 40}
+                    if rng.random() < 0.5:
+                        qualitative.append({"round": section, "comment": make_comment(rng, comment_words)})
+                evaluations.append({
+                    "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    "candidate_uid": candidate["user_id"],
+                    "evaluator_uid": f"evaluator-{e}",
+                    "round_type": round_type,
+                    "total_score": sum(v["score"] for v in quantitative.values()),
+                    "total_max_score": sum(v["max"] for v in quantitative.values()),
+                    "quantitative_scores": json.dumps(quantitative) if encode_json else quantitative,
+                    "qualitative_comments": json.dumps(qualitative) if encode_json else qualitative,
+                    "is_complete": True,
+                    "submission_time": f"2026-03-{1 + e:02d}T10:00:00+00:00",
+                })
+    return evaluations
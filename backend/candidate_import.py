@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from json_codec import dumps
+
+# Profile columns stored as JSON strings, with the default used when the field is empty.
+JSON_PROFILE_FIELDS = {
+    "academic_details": list,
+    "experience_details": list,
+    "computer_skills": dict,
+    "languages_known": dict,
+    "additional_info": dict,
+    "reporting_officers": list,
+    "self_ratings": dict,
+    "family_details": list,
+}
+
+PLAIN_PROFILE_FIELDS = [
+    "position_applied_for", "first_name", "father_or_husband_name", "surname",
+    "current_address", "permanent_address", "mobile", "email", "date_of_birth",
+    "marital_status", "gender", "religion", "caste", "category", "nationality",
+    "blood_group", "allergies", "disability", "aadhar_card_no", "pan_no", "resume_url",
+]
+
+
+# --- PAYLOAD BUILDERS ---
+def build_auth_payload(data):
+    """Builds the auth admin payload for a candidate. Raises ValueError if the name is missing."""
+    full_name = f"{data.get('first_name') or ''} {data.get('surname') or ''}".strip()
+    if not full_name:
+        raise ValueError("First name and surname are required.")
+
+    email = data.get('email') or f"temp_{uuid.uuid4().hex[:8]}@candidate.vit.edu.in"
+    return {
+        "email": email,
+        "password": str(uuid.uuid4()),
+        "email_confirm": True,
+        "user_metadata": {"full_name": full_name, "role": "candidate"}
+    }
+
+
+def build_profile_payload(data, user_id):
+    """Builds the candidate_profiles row. Every row has the same keys so rows can be bulk-inserted."""
+    payload = {"user_id": user_id}
+    for field in PLAIN_PROFILE_FIELDS:
+        payload[field] = data.get(field)
+    payload["date_of_birth"] = data.get("date_of_birth") or None
+
+    # Defaults prevent errors on null data from frontend
+    for field, default in JSON_PROFILE_FIELDS.items():
+        payload[field] = dumps(data.get(field) or default())
+    return payload
+
+
+# --- INPUT PARSING ---
+def _decode_cell(field, value):
+    """CSV cells for nested fields carry JSON text; blank cells become None."""
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    if field in JSON_PROFILE_FIELDS:
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            raise ValueError(f"Column '{field}' must contain valid JSON.")
+    return value
+
+
+def parse_candidate_rows(raw, fmt):
+    """Parses an upload into a list of candidate dicts. `fmt` is 'json', 'ndjson' or 'csv'."""
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8-sig")
+
+    if fmt == "json":
+        rows = json.loads(raw)
+        if isinstance(rows, dict):
+            rows = rows.get("candidates")
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of candidates or {\"candidates\": [...]}.")
+        return rows
+
+    if fmt == "ndjson":
+        rows = []
+        for line_no, line in enumerate(raw.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                raise ValueError(f"Invalid JSON on line {line_no}.")
+        return rows
+
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(raw))
+        return [
+            {field.strip(): _decode_cell(field.strip(), value) for field, value in row.items() if field}
+            for row in reader
+        ]
+
+    raise ValueError(f"Unsupported upload format '{fmt}'.")
+
+
+def detect_format(content_type, filename=None):
+    """Maps a content type or file extension onto one of the formats parse_candidate_rows accepts."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "json"
+
+
+# --- BULK CREATION ---
+def _supabase_error(response):
+    try:
+        return response.json() if response.content else "No response content"
+    except ValueError:
+        return response.text
+
+
+def _insert_profiles(client, payload):
+    """Inserts one profile or a list of profiles. Returns (ok, error_text)."""
+    try:
+        response = client.post("candidate_profiles", json=payload, prefer="return=minimal")
+    except Exception as e:
+        return False, str(e)
+    if response.status_code in (200, 201, 204):
+        return True, None
+    return False, response.text
+
+
+def bulk_create_candidates(client, rows, max_workers=8):
+    """Creates auth users concurrently, then inserts all profiles in one multi-row request.
+
+    Returns a manifest with one entry per input row. Auth users whose profile
+    could not be saved are deleted again, matching the single-candidate route.
+    """
+    results = [{"row": index, "status": "pending"} for index in range(len(rows))]
+    pending = []
+
+    for index, data in enumerate(rows):
+        if not isinstance(data, dict):
+            results[index].update(status="error", error="Row is not an object.")
+            continue
+        try:
+            auth_payload = build_auth_payload(data)
+        except ValueError as e:
+            results[index].update(status="error", error=str(e))
+            continue
+        results[index]["email"] = auth_payload["email"]
+        pending.append((index, data, auth_payload))
+
+    # --- Step 1: Create auth users on a bounded pool ---
+    def create_user(item):
+        index, data, auth_payload = item
+        try:
+            response = client.create_auth_user(auth_payload)
+        except Exception as e:
+            return index, data, None, str(e)
+        if response.status_code != 200:
+            return index, data, None, _supabase_error(response)
+        return index, data, response.json().get('id'), None
+
+    created = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for index, data, user_id, error in pool.map(create_user, pending):
+            if error is not None:
+                results[index].update(status="error", error="Failed to create authentication user.", supabase_error=error)
+            else:
+                results[index]["uid"] = user_id
+                created.append((index, build_profile_payload(data, user_id)))
+
+    # --- Step 2: Insert every profile in one request ---
+    failed = []
+    if created:
+        ok, _ = _insert_profiles(client, [payload for _, payload in created])
+        if ok:
+            for index, _ in created:
+                results[index]["status"] = "created"
+        else:
+            # PostgREST inserts a batch atomically, so one bad row fails them all.
+            # Retry row by row to keep the good rows and pinpoint the bad ones.
+            for index, payload in created:
+                ok, error = _insert_profiles(client, payload)
+                if ok:
+                    results[index]["status"] = "created"
+                else:
+                    results[index].update(status="error", error="Failed to save candidate profile.", supabase_error=error)
+                    failed.append(index)
+
+    # --- Step 3: Roll back auth users whose profile was not saved ---
+    def delete_user(index):
+        try:
+            client.delete_auth_user(results[index]["uid"])
+        except Exception as e:
+            results[index]["rollback_error"] = str(e)
+
+    if failed:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            list(pool.map(delete_user, failed))
+        for index in failed:
+            results[index]["uid"] = None
+
+    created_count = sum(1 for result in results if result["status"] == "created")
+    return {
+        "summary": {"total": len(rows), "created": created_count, "failed": len(rows) - created_count},
+        "results": results,
+    }
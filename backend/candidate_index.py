@@ -0,0 +1,368 @@
+import base64
+import bisect
+import json
+import unicodedata
+from collections import Counter
+
+from live_index import LiveIndex
+from report_cache import TTLCache
+
+NOT_SCHEDULED = "Not Scheduled"
+# A candidate's overall round status is the first of these found among their schedules.
+ROUND_STATUS_PRECEDENCE = ("Scheduled", "Pending Approval", "Completed")
+# Score bands are percentages of the maximum score: lower bound inclusive, upper exclusive (100 inclusive).
+SCORE_BANDS = {"low": (0, 50), "medium": (50, 75), "high": (75, 100)}
+PUBLIC_FIELDS = ("uid", "full_name", "profile_image_url", "resume_url", "position", "final_verdict",
+                 "score_pct", "round_status", "rounds")
+# pg_trgm's default similarity threshold.
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize(text):
+    """Lowercase, accent-free, alphanumeric words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch if ch.isalnum() else " " for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().split())
+
+
+def trigrams(normalized):
+    """pg_trgm-style trigrams: each word padded with two leading spaces and one trailing space."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def parse_score_band(value):
+    """Returns (low, high) percentages, or None for 'unscored'. Accepts a band name or 'low-high'."""
+    value = (value or "").strip().lower()
+    if value == "unscored":
+        return None
+    if value in SCORE_BANDS:
+        return SCORE_BANDS[value]
+    low, sep, high = value.partition("-")
+    try:
+        low, high = float(low), float(high)
+    except ValueError:
+        low = high = None
+    if not sep or low is None or not 0 <= low < high <= 100:
+        raise ValueError(f"Unknown score band '{value}'. Use {', '.join(SCORE_BANDS)}, unscored, or e.g. 60-80.")
+    return low, high
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, types):
+    """The sort key a cursor points after; raises ValueError if it is not one of ours."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(key, list) or len(key) != len(types) or not all(map(isinstance, key, types)):
+        raise ValueError("Invalid cursor.")
+    return tuple(key)
+
+
+class CandidateFilters:
+    """Position / round status / score band filters shared by browsing and search."""
+
+    def __init__(self, position=None, round_status=None, round_type=None, score_band=None):
+        self.position = position or None
+        self.round_status = round_status or None
+        self.round_type = round_type or None
+        self.score_band = score_band or None
+        self._band = parse_score_band(score_band) if score_band else None
+
+    def key(self):
+        return (self.position, self.round_status, self.round_type, self.score_band)
+
+    def matches(self, record):
+        if self.position and record["position"] != self.position:
+            return False
+        if self.round_status:
+            status = record["rounds"].get(self.round_type, NOT_SCHEDULED) if self.round_type else record["round_status"]
+            if status != self.round_status:
+                return False
+        elif self.round_type and self.round_type not in record["rounds"]:
+            return False
+        if self.score_band:
+            score = record["score_pct"]
+            if self._band is None:
+                return score is None
+            low, high = self._band
+            return score is not None and low <= score and (score < high or high == 100)
+        return True
+
+
+class CandidateIndex(LiveIndex):
+    """In-memory candidate directory with keyset pagination and prefix / fuzzy name search.
+
+    Records are kept sorted by normalized name, so browsing pages start with a
+    bisect on the cursor instead of an OFFSET. Name tokens are kept in a
+    sorted list for prefix lookups, and trigram postings give fuzzy matches
+    ranked by pg_trgm-style similarity. The snapshot is (users, profiles,
+    schedules, scores); the routes that create candidates, change schedules
+    or submit evaluations update it in place.
+    """
+
+    name = "candidate-index"
+
+    def __init__(self, loader, refresh_interval=300, search_cache_size=128):
+        super().__init__(loader, refresh_interval)
+        self._records = {}
+        self._by_name = []
+        # Distinct name words: sorted for prefix lookups, each with the candidates using it and trigram postings.
+        self._token_list = []
+        self._token_uids = {}
+        self._trigrams = {}
+        self._schedules = {}
+        self._search_cache = TTLCache(maxsize=search_cache_size, ttl=refresh_interval or 300)
+
+    def _load(self, snapshot):
+        users, profiles, schedules, scores = snapshot
+        profiles = {profile["user_id"]: profile for profile in profiles}
+        self._records, self._by_name, self._schedules = {}, [], {}
+        self._token_list, self._token_uids, self._trigrams = [], {}, {}
+        for user in users:
+            profile = profiles.get(user["uid"]) or {}
+            self._insert(self._new_record(user["uid"], user, profile), bulk=True)
+        self._by_name.sort()
+        self._token_list.sort()
+        for schedule in schedules:
+            self._set_schedule(schedule)
+        for candidate_id, score in scores.items():
+            if candidate_id in self._records:
+                self._records[candidate_id]["score_pct"] = score
+
+    def _new_record(self, uid, user, profile):
+        return {
+            "uid": uid,
+            "full_name": user.get("full_name") or "",
+            "profile_image_url": user.get("profile_image_url"),
+            "resume_url": user.get("resume_url"),
+            "position": profile.get("position_applied_for"),
+            "final_verdict": profile.get("final_verdict"),
+            "score_pct": None,
+            "round_status": NOT_SCHEDULED,
+            "rounds": {},
+            "schedule_ids": set(),
+        }
+
+    # --- INCREMENTAL UPDATES ---
+    def upsert_candidate(self, uid, full_name=None, position=None, **fields):
+        """Adds or changes one candidate's name, position and display fields."""
+        def apply():
+            record = self._records.get(uid)
+            if record is None:
+                record = self._new_record(uid, {}, {})
+            else:
+                self._remove(record)
+            if full_name is not None:
+                record["full_name"] = full_name
+            if position is not None:
+                record["position"] = position
+            record.update((field, value) for field, value in fields.items() if field in PUBLIC_FIELDS)
+            self._insert(record)
+        self._update(apply)
+
+    def set_score(self, uid, total_score, total_max_score):
+        def apply():
+            record = self._records.get(uid)
+            if record is not None:
+                record["score_pct"] = score_pct(total_score, total_max_score)
+        self._update(apply)
+
+    def apply_schedule(self, op, schedule):
+        """Applies a schedule insert, update or delete (as published on the schedule change feed)."""
+        def apply():
+            if op == "delete":
+                self._drop_schedule(schedule.get("id"))
+            else:
+                self._set_schedule(schedule)
+        self._update(apply)
+
+    # --- INTERNAL STRUCTURES (caller holds the lock) ---
+    def _insert(self, record, bulk=False):
+        """Indexes one record; with `bulk` the sorted lists are only appended to and the caller sorts them."""
+        name_key = normalize(record["full_name"])
+        record["name_key"] = name_key
+        self._records[record["uid"]] = record
+        add = list.append if bulk else bisect.insort
+        add(self._by_name, (name_key, record["uid"]))
+        for token in set(name_key.split()):
+            uids = self._token_uids.get(token)
+            if uids is None:
+                uids = self._token_uids[token] = set()
+                add(self._token_list, token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            uids.add(record["uid"])
+
+    def _remove(self, record):
+        uid, name_key = record["uid"], record["name_key"]
+        _discard_sorted(self._by_name, (name_key, uid))
+        for token in set(name_key.split()):
+            uids = self._token_uids.get(token)
+            if uids is None:
+                continue
+            uids.discard(uid)
+            if not uids:
+                del self._token_uids[token]
+                _discard_sorted(self._token_list, token)
+                for gram in trigrams(token):
+                    postings = self._trigrams[gram]
+                    postings.discard(token)
+                    if not postings:
+                        del self._trigrams[gram]
+
+    def _set_schedule(self, schedule):
+        schedule_id = schedule.get("id")
+        previous = self._schedules.get(schedule_id)
+        candidate_id = schedule.get("candidate_id", previous["candidate_id"] if previous else None)
+        if previous and previous["candidate_id"] != candidate_id:
+            self._drop_schedule(schedule_id)
+            previous = None
+        entry = {
+            "candidate_id": candidate_id,
+            "round_type": schedule.get("round_type", previous["round_type"] if previous else None),
+            "status": schedule.get("status", previous["status"] if previous else None),
+            "order": (schedule.get("date") or "", schedule.get("start_time") or "", str(schedule_id)),
+        }
+        self._schedules[schedule_id] = entry
+        record = self._records.get(candidate_id)
+        if record is not None:
+            record["schedule_ids"].add(schedule_id)
+            self._refresh_rounds(record)
+
+    def _drop_schedule(self, schedule_id):
+        entry = self._schedules.pop(schedule_id, None)
+        record = self._records.get(entry["candidate_id"]) if entry else None
+        if record is not None:
+            record["schedule_ids"].discard(schedule_id)
+            self._refresh_rounds(record)
+
+    def _refresh_rounds(self, record):
+        """Each round's status is that of its latest schedule; the overall status follows ROUND_STATUS_PRECEDENCE."""
+        entries = sorted((self._schedules[schedule_id] for schedule_id in record["schedule_ids"]), key=lambda e: e["order"])
+        record["rounds"] = {entry["round_type"]: entry["status"] for entry in entries if entry["round_type"]}
+        statuses = {entry["status"] for entry in entries}
+        record["round_status"] = next((status for status in ROUND_STATUS_PRECEDENCE if status in statuses), NOT_SCHEDULED)
+
+    # --- QUERIES ---
+    def get(self, uid):
+        """One candidate's public fields, or None."""
+        with self._lock:
+            record = self._records.get(uid)
+            return {field: record[field] for field in PUBLIC_FIELDS} if record else None
+
+    def candidates_for_round(self, position, round_type):
+        """IDs (by name) of the position's candidates with no pending, scheduled or completed `round_type`."""
+        with self._lock:
+            return [uid for _, uid in self._by_name
+                    if self._records[uid]["position"] == position
+                    and self._records[uid]["rounds"].get(round_type, "Cancelled") == "Cancelled"]
+
+    def page(self, q=None, filters=None, cursor=None, limit=50):
+        """One page of candidates: {"items", "next_cursor", "mode"}.
+
+        Without `q`, candidates are listed by name. With `q`, prefix matches
+        on any name word come first, then fuzzy (trigram) matches by
+        similarity. `cursor` is the `next_cursor` of the previous page.
+        """
+        filters = filters or CandidateFilters()
+        query = normalize(q)
+        with self._lock:
+            if not query:
+                after = decode_cursor(cursor, (str, str)) if cursor else None
+                keys, items = self._browse(filters, after, limit + 1)
+                mode = "browse"
+            else:
+                after = decode_cursor(cursor, ((int, float), str, str)) if cursor else None
+                ranked = self._search_cache.get_or_load((self.version, query, filters.key()),
+                                                        lambda: self._search(query, filters))
+                start = bisect.bisect_right(ranked, after) if after else 0
+                keys = ranked[start:start + limit + 1]
+                items = [self._records[key[-1]] for key in keys]
+                mode = "search"
+            has_more = len(items) > limit
+            return {
+                "items": [{field: record[field] for field in PUBLIC_FIELDS} for record in items[:limit]],
+                "next_cursor": encode_cursor(list(keys[limit - 1])) if has_more else None,
+                "mode": mode,
+            }
+
+    def _browse(self, filters, after, count):
+        keys, items = [], []
+        start = bisect.bisect_right(self._by_name, after) if after else 0
+        for index in range(start, len(self._by_name)):
+            key = self._by_name[index]
+            record = self._records[key[1]]
+            if filters.matches(record):
+                keys.append(key)
+                items.append(record)
+                if len(items) == count:
+                    break
+        return keys, items
+
+    def _word_matches(self, word):
+        """Candidate -> score for one query word: 1.0 if a name word starts with it, else the best trigram similarity."""
+        scores = {}
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        for token, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(token)) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                for uid in self._token_uids[token]:
+                    if similarity > scores.get(uid, 0.0):
+                        scores[uid] = similarity
+        for index in range(bisect.bisect_left(self._token_list, word), len(self._token_list)):
+            token = self._token_list[index]
+            if not token.startswith(word):
+                break
+            for uid in self._token_uids[token]:
+                scores[uid] = 1.0
+        return scores
+
+    def _search(self, query, filters):
+        """Sorted keys (-score, name_key, uid) of every match, best first. Every query word has to match."""
+        words = query.split()
+        combined = None
+        for word in words:
+            scores = self._word_matches(word)
+            combined = scores if combined is None else {uid: combined[uid] + score for uid, score in scores.items() if uid in combined}
+            if not combined:
+                return []
+        ranked = []
+        for uid, total in combined.items():
+            record = self._records[uid]
+            if filters.matches(record):
+                score = total / len(words)
+                # Whole-name prefix matches outrank matches on a later word (e.g. the surname).
+                if record["name_key"].startswith(query):
+                    score += 1.0
+                ranked.append((-round(score, 4), record["name_key"], uid))
+        ranked.sort()
+        return ranked
+
+    def stats(self):
+        with self._lock:
+            return {**super().stats(), "candidates": len(self._records), "schedules": len(self._schedules),
+                    "search_cache": self._search_cache.stats()}
+
+
+def score_pct(total_score, total_max_score):
+    """Total score as a percentage of the maximum, or None when nothing has been scored."""
+    if not total_max_score:
+        return None
+    return round(100.0 * (total_score or 0) / total_max_score, 2)
+
+
+def _discard_sorted(items, item):
+    index = bisect.bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
@@ -0,0 +1,259 @@
+import math
+import warnings
+
+import numpy as np
+
+from json_codec import decode_field
+
+PERCENTILES = (10, 25, 50, 75, 90)
+# Ten equal-width bins over 0-100%.
+HISTOGRAM_BINS = 10
+
+
+class ScoreMatrix:
+    """Completed evaluations for a cohort, accumulated into dense NumPy arrays.
+
+    Rows are candidates; columns are sections (section_score/section_max) or
+    rounds (round_score/round_max). Sections or rounds a candidate was never
+    scored on have a max of 0 and are treated as missing.
+    """
+
+    __slots__ = ("candidate_ids", "sections", "rounds", "section_score", "section_max",
+                 "round_score", "round_max", "total_score", "total_max", "evaluation_count")
+
+    def __init__(self, candidate_ids, sections, rounds, section_score, section_max,
+                 round_score, round_max, total_score, total_max, evaluation_count):
+        self.candidate_ids = candidate_ids
+        self.sections = sections
+        self.rounds = rounds
+        self.section_score = section_score
+        self.section_max = section_max
+        self.round_score = round_score
+        self.round_max = round_max
+        self.total_score = total_score
+        self.total_max = total_max
+        self.evaluation_count = evaluation_count
+
+
+def _index_of(index, key):
+    position = index.get(key)
+    if position is None:
+        position = index[key] = len(index)
+    return position
+
+
+def _accumulate(rows, cols, weights, shape):
+    """Sums `weights` into a dense rows x cols matrix in one bincount call."""
+    flat = np.bincount(rows * shape[1] + cols, weights=weights, minlength=shape[0] * shape[1])
+    return flat.reshape(shape)
+
+
+def build_score_matrix(evaluations, candidate_ids=()):
+    """Loads evaluation rows into a ScoreMatrix.
+
+    The only per-row Python work is decoding the JSON columns into flat index
+    and value lists; all summing happens in NumPy. `candidate_ids` seeds the
+    row order so candidates with no evaluations are still listed.
+    """
+    candidate_index = {candidate_id: i for i, candidate_id in enumerate(candidate_ids)}
+    section_index = {}
+    round_index = {}
+
+    eval_candidate, eval_round, eval_score, eval_max = [], [], [], []
+    item_candidate, item_section, item_score, item_max = [], [], [], []
+    # Evaluations of the same round share a section layout, so map each layout to indices once.
+    layouts = {}
+
+    for eval_data in evaluations:
+        candidate = _index_of(candidate_index, eval_data['candidate_uid'])
+        eval_candidate.append(candidate)
+        eval_round.append(_index_of(round_index, eval_data['round_type']))
+        eval_score.append(eval_data.get('total_score') or 0)
+        eval_max.append(eval_data.get('total_max_score') or 0)
+
+        quantitative = decode_field(eval_data.get('quantitative_scores'), {})
+        if not isinstance(quantitative, dict):
+            continue
+        values = [data for data in quantitative.values() if isinstance(data, dict)]
+        if len(values) != len(quantitative):
+            quantitative = {section: data for section, data in quantitative.items() if isinstance(data, dict)}
+        layout = tuple(quantitative)
+        indices = layouts.get(layout)
+        if indices is None:
+            indices = layouts[layout] = [_index_of(section_index, section) for section in layout]
+
+        item_candidate.extend([candidate] * len(indices))
+        item_section.extend(indices)
+        item_score.extend([data.get('score') or 0 for data in values])
+        item_max.extend([data.get('max') or 0 for data in values])
+
+    n_candidates = len(candidate_index)
+    n_sections = len(section_index)
+    n_rounds = len(round_index)
+
+    eval_candidate = np.asarray(eval_candidate, dtype=np.int64)
+    eval_round = np.asarray(eval_round, dtype=np.int64)
+    eval_score = np.asarray(eval_score, dtype=np.float64)
+    eval_max = np.asarray(eval_max, dtype=np.float64)
+    item_candidate = np.asarray(item_candidate, dtype=np.int64)
+    item_section = np.asarray(item_section, dtype=np.int64)
+    item_score = np.asarray(item_score, dtype=np.float64)
+    item_max = np.asarray(item_max, dtype=np.float64)
+
+    section_shape = (n_candidates, n_sections)
+    round_shape = (n_candidates, n_rounds)
+    return ScoreMatrix(
+        candidate_ids=list(candidate_index),
+        sections=list(section_index),
+        rounds=list(round_index),
+        section_score=_accumulate(item_candidate, item_section, item_score, section_shape),
+        section_max=_accumulate(item_candidate, item_section, item_max, section_shape),
+        round_score=_accumulate(eval_candidate, eval_round, eval_score, round_shape),
+        round_max=_accumulate(eval_candidate, eval_round, eval_max, round_shape),
+        total_score=np.bincount(eval_candidate, weights=eval_score, minlength=n_candidates),
+        total_max=np.bincount(eval_candidate, weights=eval_max, minlength=n_candidates),
+        evaluation_count=len(eval_candidate),
+    )
+
+
+def percentages(score, maximum):
+    """score / max * 100, with NaN wherever max is 0 (not evaluated)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(maximum > 0, score / maximum * 100, np.nan)
+
+
+def describe_columns(values):
+    """Per-column count, mean, std, min/max, percentiles and a 10-bin histogram, ignoring NaN."""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+
+    if values.shape[0] == 0:
+        empty = np.full(values.shape[1], np.nan)
+        return {
+            "count": counts, "mean": empty, "std": empty, "min": empty, "max": empty,
+            "percentiles": np.full((len(PERCENTILES), values.shape[1]), np.nan),
+            "histogram": np.zeros((values.shape[1], HISTOGRAM_BINS), dtype=np.int64),
+        }
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        low = np.nanmin(values, axis=0)
+        high = np.nanmax(values, axis=0)
+        quantiles = np.nanpercentile(values, PERCENTILES, axis=0)
+
+    # Histogram for every column at once: bin each value, then count (column, bin) pairs.
+    columns = np.broadcast_to(np.arange(values.shape[1]), values.shape)[present]
+    bins = np.clip((values[present] // (100 / HISTOGRAM_BINS)).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+    histogram = np.bincount(columns * HISTOGRAM_BINS + bins, minlength=values.shape[1] * HISTOGRAM_BINS)
+    histogram = histogram.reshape(values.shape[1], HISTOGRAM_BINS)
+
+    return {
+        "count": counts, "mean": mean, "std": std, "min": low, "max": high,
+        "percentiles": quantiles, "histogram": histogram,
+    }
+
+
+def z_scores(values, mean, std):
+    """Standard scores per column; 0 where a column has no spread, NaN where a value is missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (values - mean) / std
+    return np.where(std > 0, z, np.where(np.isnan(values), np.nan, 0.0))
+
+
+def competition_ranks(values):
+    """1-based ranks, highest value first, ties share a rank (1, 2, 2, 4). Missing values rank last."""
+    present = ~np.isnan(values)
+    ordered = -np.sort(values[present])[::-1]
+    ranks = np.searchsorted(ordered, -values, side="left") + 1
+    return np.where(present, ranks, present.sum() + 1)
+
+
+def percentile_ranks(values):
+    """Share of the cohort scoring below each value (ties count half), as 0-100."""
+    present = ~np.isnan(values)
+    ordered = np.sort(values[present])
+    if ordered.size == 0:
+        return np.full(values.shape, np.nan)
+    below = np.searchsorted(ordered, values, side="left")
+    at_or_below = np.searchsorted(ordered, values, side="right")
+    return np.where(present, (below + 0.5 * (at_or_below - below)) / ordered.size * 100, np.nan)
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
+
+
+def _rounded_rows(values):
+    """2-decimal nested lists with NaN replaced by None, for JSON output."""
+    rounded = np.round(values, 2).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+
+def _summary(stats, column):
+    return {
+        "count": int(stats["count"][column]),
+        "mean": _clean(stats["mean"][column]),
+        "median": _clean(stats["percentiles"][PERCENTILES.index(50)][column]),
+        "std": _clean(stats["std"][column]),
+        "min": _clean(stats["min"][column]),
+        "max": _clean(stats["max"][column]),
+        "percentiles": {f"p{p}": _clean(stats["percentiles"][i][column]) for i, p in enumerate(PERCENTILES)},
+        "histogram": [int(count) for count in stats["histogram"][column]],
+    }
+
+
+def compute_cohort_stats(matrix, include_candidates=True):
+    """Cohort-wide statistics for overall, per-round and per-section percentages.
+
+    Each candidate also gets an overall z-score, competition rank and
+    percentile rank, plus per-section z-scores.
+    """
+    overall_pct = percentages(matrix.total_score, matrix.total_max)
+    round_pct = percentages(matrix.round_score, matrix.round_max)
+    section_pct = percentages(matrix.section_score, matrix.section_max)
+
+    overall_stats = describe_columns(overall_pct[:, None])
+    round_stats = describe_columns(round_pct)
+    section_stats = describe_columns(section_pct)
+
+    result = {
+        "candidate_count": len(matrix.candidate_ids),
+        "evaluated_count": int(overall_stats["count"][0]),
+        "evaluation_count": matrix.evaluation_count,
+        "histogram_bins": [[int(i * 100 / HISTOGRAM_BINS), int((i + 1) * 100 / HISTOGRAM_BINS)] for i in range(HISTOGRAM_BINS)],
+        "overall": _summary(overall_stats, 0),
+        "rounds": {name: _summary(round_stats, i) for i, name in enumerate(matrix.rounds)},
+        "sections": {name: _summary(section_stats, i) for i, name in enumerate(matrix.sections)},
+    }
+
+    if include_candidates:
+        overall_z = z_scores(overall_pct, overall_stats["mean"][0], overall_stats["std"][0])
+        section_z = z_scores(section_pct, section_stats["mean"], section_stats["std"])
+        ranks = competition_ranks(overall_pct)
+        percentile = percentile_ranks(overall_pct)
+
+        # Convert to plain lists once; per-candidate dicts are then built without NumPy scalars.
+        overall_rows = _rounded_rows(np.column_stack([overall_pct, overall_z, percentile]))
+        round_rows = _rounded_rows(round_pct)
+        section_z_rows = _rounded_rows(section_z)
+        rank_list = ranks.tolist()
+
+        candidates = []
+        for i in np.argsort(ranks, kind="stable").tolist():
+            overall, z, pct_rank = overall_rows[i]
+            candidates.append({
+                "candidate_id": matrix.candidate_ids[i],
+                "rank": rank_list[i],
+                "overall_pct": overall,
+                "z_score": z,
+                "percentile": pct_rank,
+                "rounds": {name: value for name, value in zip(matrix.rounds, round_rows[i]) if value is not None},
+                "section_z_scores": {name: value for name, value in zip(matrix.sections, section_z_rows[i]) if value is not None},
+            })
+        result["candidates"] = candidates
+
+    return result
@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+
+from json_codec import decode_field
+
+NO_COMMENT = "N/A"
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Field names match the stored JSON, so json_codec serializes these directly.
+@dataclass(slots=True)
+class SectionScore:
+    score: float
+    max: float
+
+
+@dataclass(slots=True)
+class Comment:
+    """One qualitative comment. `round` is the name of the section it belongs to, as the form stores it."""
+
+    round: str
+    comment: str
+
+
+@dataclass(slots=True)
+class Evaluation:
+    """A completed evaluation with its JSON columns decoded once.
+
+    `sections` keeps the form's section order. `comments_by_section` holds
+    the first comment per section (what reports show), so lookups are O(1)
+    instead of a scan of the comment list per section.
+    """
+
+    id: object
+    candidate_uid: str
+    round_type: str
+    total_score: float
+    total_max_score: float
+    sections: dict
+    comments: tuple = ()
+    evaluator_name: str = None
+    comments_by_section: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.comments_by_section = {}
+        for comment in self.comments:
+            self.comments_by_section.setdefault(comment.round, comment.comment)
+
+    @classmethod
+    def from_row(cls, row):
+        """Decodes an `evaluations` row (JSON columns as text or jsonb). Malformed entries are skipped, never raised."""
+        quantitative = decode_field(row.get('quantitative_scores', '{}'), {})
+        qualitative = decode_field(row.get('qualitative_comments', '[]'), [])
+        sections = {}
+        if isinstance(quantitative, dict):
+            for section, scores in quantitative.items():
+                if isinstance(scores, dict):
+                    sections[section] = SectionScore(scores.get('score', 0), scores.get('max', 0))
+        comments = tuple(
+            Comment(comment.get('round'), comment.get('comment', NO_COMMENT))
+            for comment in (qualitative if isinstance(qualitative, list) else ()) if isinstance(comment, dict)
+        )
+        return cls(
+            id=row.get('id'),
+            candidate_uid=row.get('candidate_uid'),
+            round_type=row['round_type'],
+            total_score=row['total_score'],
+            total_max_score=row['total_max_score'],
+            sections=sections,
+            comments=comments,
+            evaluator_name=(row.get('evaluator') or {}).get('full_name'),
+        )
+
+    @classmethod
+    def from_submission(cls, data):
+        """Validates a submitted evaluation. Totals are recomputed from the section scores rather than trusted.
+
+        Raises ValueError describing the first problem found.
+        """
+        for name in ("candidate_uid", "round_type"):
+            if not data.get(name):
+                raise ValueError(f"'{name}' is required.")
+
+        quantitative = data.get("quantitative_scores")
+        if not isinstance(quantitative, dict):
+            raise ValueError("'quantitative_scores' must be an object of section -> {score, max}.")
+        sections = {}
+        for section, scores in quantitative.items():
+            if not isinstance(scores, dict) or not all(_is_number(scores.get(key)) for key in ("score", "max")):
+                raise ValueError(f"Section '{section}' needs numeric 'score' and 'max'.")
+            if scores["score"] < 0 or scores["score"] > scores["max"]:
+                raise ValueError(f"Section '{section}' score must be between 0 and its max.")
+            sections[section] = SectionScore(scores["score"], scores["max"])
+
+        qualitative = data.get("qualitative_comments") or []
+        if not isinstance(qualitative, list) or not all(isinstance(comment, dict) for comment in qualitative):
+            raise ValueError("'qualitative_comments' must be a list of {round, comment} objects.")
+        for comment in qualitative:
+            if not isinstance(comment.get("round"), str) or not isinstance(comment.get("comment"), str):
+                raise ValueError("Each comment needs a string 'round' (its section) and 'comment'.")
+
+        return cls(
+            id=None,
+            candidate_uid=data["candidate_uid"],
+            round_type=data["round_type"],
+            total_score=sum(scores.score for scores in sections.values()),
+            total_max_score=sum(scores.max for scores in sections.values()),
+            sections=sections,
+            comments=tuple(Comment(comment["round"], comment["comment"]) for comment in qualitative),
+        )
+
+    def comment_for(self, section):
+        """The section's first comment, or None."""
+        comment = self.comments_by_section.get(section, NO_COMMENT)
+        return None if comment == NO_COMMENT else comment
+
+    def sections_json(self):
+        return {section: {"score": scores.score, "max": scores.max} for section, scores in self.sections.items()}
+
+    def comments_json(self):
+        return [{"round": comment.round, "comment": comment.comment} for comment in self.comments]
@@ -0,0 +1,125 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+
+class Subscription:
+    """One subscriber's queue of matching events; see EventBroker.subscribe()."""
+
+    def __init__(self, broker, predicate, queue_size):
+        self.broker = broker
+        self.predicate = predicate
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Set when the subscriber falls too far behind; its stream ends and the client resumes from its last ID.
+        self.overflowed = False
+
+    def offer(self, event):
+        if self.overflowed or (self.predicate is not None and not self.predicate(event)):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next event, or None if nothing arrives within `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """In-process publish/subscribe with a bounded replay log for resuming by event ID.
+
+    Event IDs are "<epoch>-<sequence>", where the epoch changes with every
+    process start, so an ID from another process (or one older than the
+    replay log) is recognised as unresumable. Events only reach subscribers
+    connected to the same process.
+    """
+
+    def __init__(self, history=1000, queue_size=256):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history)
+        self._sequence = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, event_type, data):
+        with self._lock:
+            self._sequence += 1
+            event = {"id": f"{self.epoch}-{self._sequence}", "seq": self._sequence, "type": event_type, "data": data, "time": time.time()}
+            self._history.append(event)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(event)
+        return event
+
+    def subscribe(self, last_event_id=None, predicate=None):
+        """Returns (subscription, replay, head_id, resumed).
+
+        `replay` holds the matching events published after `last_event_id`.
+        `resumed` is False when there is nothing to resume from: no ID, an
+        unknown epoch, or an ID already dropped from the log. The client then
+        needs to reload its full state, and `head_id` is the ID to resume from
+        after that reload.
+        """
+        subscription = Subscription(self, predicate, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            head_id = f"{self.epoch}-{self._sequence}"
+            epoch, _, sequence = (last_event_id or "").partition("-")
+            oldest = self._history[0]["seq"] if self._history else self._sequence + 1
+            if epoch != self.epoch or not sequence.isdigit() or not oldest - 1 <= int(sequence) <= self._sequence:
+                return subscription, [], head_id, False
+            replay = [event for event in self._history if event["seq"] > int(sequence)]
+        return subscription, [event for event in replay if predicate is None or predicate(event)], head_id, True
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                if subscription.overflowed:
+                    self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped,
+                    "history": len(self._history), "last_event_id": f"{self.epoch}-{self._sequence}"}
+
+
+def format_sse(event=None, comment=None, retry=None):
+    """One Server-Sent Events frame: an event, a comment line (heartbeat) or a retry hint."""
+    if comment is not None:
+        return f": {comment}\n\n"
+    if retry is not None:
+        return f"retry: {int(retry)}\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], separators=(',', ':'))}\n\n"
+
+
+def stream_events(subscription, replay, heartbeat=15.0, preamble=()):
+    """Yields SSE frames: `preamble`, the replayed events, then live events with heartbeats between them.
+
+    Ends when the subscriber overflows its queue; the client reconnects with
+    Last-Event-ID and picks up from the replay log.
+    """
+    try:
+        for frame in preamble:
+            yield frame
+        for event in replay:
+            yield format_sse(event)
+        while not subscription.overflowed:
+            event = subscription.get(heartbeat)
+            yield format_sse(comment="heartbeat") if event is None else format_sse(event)
+    finally:
+        subscription.close()
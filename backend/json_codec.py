@@ -0,0 +1,42 @@
+import dataclasses
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Parses JSON text or UTF-8 bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode_dataclass(value):
+    if dataclasses.is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(value):
+    """Compact UTF-8 JSON bytes. Dataclass instances are encoded as objects of their fields."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_encode_dataclass).encode("utf-8")
+
+
+def dumps(value):
+    """Compact JSON text, for JSON stored in text columns."""
+    return dumps_bytes(value).decode("utf-8")
+
+
+def decode_field(value, default):
+    """A JSON column that arrives as text (or already decoded for jsonb columns); `default` if it is not valid JSON."""
+    if isinstance(value, (dict, list)):
+        return value
+    try:
+        return loads(value)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+class LiveIndex:
+    """Base for in-memory indexes built from a Supabase snapshot and kept current in place.
+
+    `loader()` returns the snapshot and `_load(snapshot)` builds the index from
+    it. The first `ensure_loaded()` builds synchronously; later calls start a
+    background rebuild once `refresh_interval` seconds have passed (0 turns
+    refreshes off). Updates go through `_update(apply)`: `apply` runs under
+    the lock, and when a rebuild is reading Supabase it is also replayed on
+    top of the new snapshot, so it has to be idempotent. `version` changes on
+    every build and update, so caches keyed on it never serve stale results.
+    """
+
+    name = "index"
+
+    def __init__(self, loader, refresh_interval=300):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self.loaded_at = None
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._replay = None
+
+    def ensure_loaded(self):
+        """Builds the index on first use; afterwards starts a background refresh when it is due."""
+        if self.loaded_at is None:
+            with self._load_lock:
+                if self.loaded_at is None:
+                    self.rebuild()
+            return
+        if self.refresh_interval and time.time() - self.loaded_at > self.refresh_interval:
+            with self._lock:
+                if self._refreshing:
+                    return
+                self._refreshing = True
+            threading.Thread(target=self._background_refresh, name=f"{self.name}-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            with self._load_lock:
+                self.rebuild()
+        except Exception as e:
+            print(f"{self.name} refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def rebuild(self):
+        """Replaces the index with a fresh snapshot from `loader`."""
+        with self._lock:
+            self._replay = []
+        try:
+            snapshot = self.loader()
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            self._load(snapshot)
+            for update in self._replay:
+                update()
+            self._replay = None
+            self.loaded_at = time.time()
+            self.version += 1
+
+    def _load(self, snapshot):
+        raise NotImplementedError
+
+    def _update(self, apply):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(apply)
+            if self.loaded_at is not None:
+                apply()
+                self.version += 1
+
+    def stats(self):
+        with self._lock:
+            return {"version": self.version, "loaded_at": self.loaded_at, "refreshing": self._refreshing}
@@ -0,0 +1,472 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from json_codec import dumps_bytes, loads
+
+WATERMARK_COLUMN = "updated_at"
+# Bumped whenever the tables below change shape; an older file is dropped and rebuilt on open (it is derived data).
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ReplicatedTable:
+    name: str
+    key: str
+    # Row fields copied into their own SQL columns, so reads can filter and order on them.
+    columns: tuple = ()
+    indexes: tuple = ()
+
+
+REPLICATED_TABLES = (
+    ReplicatedTable("users", "uid", ("role",), (("role",),)),
+    ReplicatedTable("candidate_profiles", "user_id", ("position_applied_for",), (("position_applied_for",),)),
+    ReplicatedTable("schedules", "id", ("candidate_id", "date", "status"), (("candidate_id",), ("date",))),
+    ReplicatedTable("evaluations", "id", ("candidate_uid", "is_complete", "round_type", "submission_time"),
+                    (("candidate_uid", "submission_time"),)),
+)
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS replica_state (
+    table_name TEXT PRIMARY KEY,
+    watermark REAL,
+    synced_at REAL,
+    next_sync_at REAL NOT NULL DEFAULT 0,
+    reconciled_at REAL,
+    next_reconcile_at REAL NOT NULL DEFAULT 0,
+    rows_copied INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+"""
+
+
+def timestamp(value):
+    """Epoch seconds of an ISO timestamp from PostgREST (naive values are UTC), or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _isoformat(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="microseconds")
+
+
+class LocalReplica:
+    """Read replica of slowly changing Supabase tables in a local SQLite database (WAL).
+
+    Each table is copied row by row (the full row as JSON, plus the columns
+    reads filter and order on) and kept current incrementally: a sync asks
+    for rows whose `updated_at` is past the table's watermark, re-reading
+    `overlap` seconds back while the last change is that recent (for
+    transactions that committed late; database and server clocks must agree
+    to within it), and pages by (updated_at, key) so rows changing mid-sync
+    cannot shift a page. Rows this backend writes are applied immediately
+    through `apply`/`remove`, as Supabase returned them (with `updated_at`
+    and column defaults); rows deleted elsewhere are dropped by a periodic
+    key reconciliation, and `resync` rebuilds a table from scratch. A table
+    counts as fresh while its last successful sync started within
+    `max_staleness` seconds, and callers read Supabase for anything that is
+    not. Worker processes share the file: whichever claims a table's next
+    sync in `replica_state` runs it, so they do not all poll Supabase.
+    """
+
+    def __init__(self, client, path, max_staleness=60, sync_interval=10, overlap=30, reconcile_interval=3600,
+                 tables=REPLICATED_TABLES):
+        self.client = client
+        self.path = path
+        self.max_staleness = max_staleness
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self.reconcile_interval = reconcile_interval
+        self.tables = {table.name: table for table in tables}
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.local_reads = 0
+        self.fallback_reads = 0
+
+    # --- STORAGE ---
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._schema_lock:
+            if not self._ready:
+                self._create_schema()
+                self._ready = True
+        # Autocommit: reads see the latest committed state and writes open their own transactions.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        setup = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            setup.execute("PRAGMA journal_mode=WAL")
+            setup.execute("BEGIN IMMEDIATE")
+            if setup.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for (name,) in setup.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'replica%'").fetchall():
+                    setup.execute(f'DROP TABLE "{name}"')
+                setup.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            setup.execute(STATE_SCHEMA)
+            for table in self.tables.values():
+                columns = "".join(f', "{column}"' for column in table.columns)
+                setup.execute(f'CREATE TABLE IF NOT EXISTS "replica_{table.name}" (key TEXT PRIMARY KEY, updated_at REAL, '
+                              f'replicated_at REAL NOT NULL{columns}, row BLOB NOT NULL)')
+                for index in table.indexes:
+                    indexed = ", ".join(f'"{column}"' for column in index)
+                    setup.execute(f'CREATE INDEX IF NOT EXISTS "replica_{table.name}_{"_".join(index)}" '
+                                  f'ON "replica_{table.name}" ({indexed})')
+                setup.execute("INSERT OR IGNORE INTO replica_state (table_name) VALUES (?)", (table.name,))
+            setup.execute("COMMIT")
+        finally:
+            setup.close()
+
+    @contextmanager
+    def _write(self):
+        """One write transaction; the lock keeps this process's writers from contending for SQLite's."""
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _table(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise ValueError(f"{name} is not replicated.")
+
+    def _upsert_sql(self, table, target=None, source=None):
+        """INSERT of one row per parameter tuple into `target`, or of every row of the `source` table."""
+        target = target or f'"replica_{table.name}"'
+        names = ["key", "updated_at", "replicated_at", *(f'"{column}"' for column in table.columns), "row"]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        # "WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint of the SELECT.
+        values = f"SELECT * FROM {source} WHERE true" if source else f"VALUES ({', '.join('?' * len(names))})"
+        # An older copy of a row (a sync page read before this backend's own write landed) never replaces a newer one.
+        return (f"INSERT INTO {target} ({', '.join(names)}) {values} "
+                f"ON CONFLICT(key) DO UPDATE SET {updates} "
+                f"WHERE excluded.updated_at IS NULL OR {target}.updated_at IS NULL OR excluded.updated_at >= {target}.updated_at")
+
+    def _records(self, table, rows, replicated_at):
+        return [
+            (str(row[table.key]), timestamp(row.get(WATERMARK_COLUMN)), replicated_at,
+             *(row.get(column) for column in table.columns), dumps_bytes(row))
+            for row in rows if row.get(table.key) is not None
+        ]
+
+    # --- WRITES FROM THIS BACKEND ---
+    def apply(self, table_name, rows):
+        """Stores rows this backend just wrote (as Supabase returned them), ahead of the next sync."""
+        table = self._table(table_name)
+        records = self._records(table, rows, time.time())
+        if records:
+            with self._write() as conn:
+                conn.executemany(self._upsert_sql(table), records)
+
+    def remove(self, table_name, keys):
+        """Drops rows this backend just deleted."""
+        table = self._table(table_name)
+        keys = [(str(key),) for key in keys]
+        if keys:
+            with self._write() as conn:
+                conn.executemany(f'DELETE FROM "replica_{table.name}" WHERE key = ?', keys)
+
+    # --- READS ---
+    def usable(self, *table_names):
+        """True if every named table was synced within `max_staleness` seconds; callers read Supabase otherwise.
+
+        Also starts the background sync on first use.
+        """
+        self.ensure_running()
+        try:
+            synced = dict(self._connect().execute("SELECT table_name, synced_at FROM replica_state").fetchall())
+        except sqlite3.Error as e:
+            print(f"Local replica unavailable: {e}")
+            synced = {}
+        now = time.time()
+        fresh = all(synced.get(name) is not None and now - synced[name] <= self.max_staleness for name in table_names)
+        with self._stats_lock:
+            if fresh:
+                self.local_reads += 1
+            else:
+                self.fallback_reads += 1
+        return fresh
+
+    def select(self, table_name, columns=None, where=None, order=()):
+        """Rows of a replicated table as dicts, like a PostgREST select of plain `columns`.
+
+        `where` maps the key or a copied column to a value (equality) or a
+        list of values (IN); `order` lists such columns, ascending with nulls
+        last as PostgREST sorts them.
+        """
+        table = self._table(table_name)
+        condition, params = self._where(table, where)
+        if condition is None:
+            return []
+        sql = f'SELECT row FROM "replica_{table.name}"{condition}'
+        if order:
+            sql += " ORDER BY " + ", ".join(f"{column} IS NULL, {column}" for column in map(lambda c: self._sql_column(table, c), order))
+        rows = [loads(row) for (row,) in self._connect().execute(sql, params)]
+        if columns:
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return rows
+
+    def count(self, table_name, column, where=None):
+        """Rows matching `where` (as in `select`), grouped by the key or copied `column`: value -> count."""
+        table = self._table(table_name)
+        condition, params = self._where(table, where)
+        if condition is None:
+            return {}
+        sql_column = self._sql_column(table, column)
+        return dict(self._connect().execute(
+            f'SELECT {sql_column}, count(*) FROM "replica_{table.name}"{condition} GROUP BY {sql_column}', params).fetchall())
+
+    def _where(self, table, where):
+        """(" WHERE ..." or "", params), or (None, None) when an empty IN list means nothing can match."""
+        clauses, params = [], []
+        for column, value in (where or {}).items():
+            sql_column = self._sql_column(table, column)
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                if not values:
+                    return None, None
+                clauses.append(f"{sql_column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{sql_column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _sql_column(self, table, column):
+        if column == table.key:
+            return "key"
+        if column in table.columns:
+            return f'"{column}"'
+        raise ValueError(f"{table.name}.{column} is not an indexed replica column.")
+
+    # --- SYNC ---
+    def ensure_running(self):
+        """Starts the background sync thread once per process."""
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="local-replica-sync", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.sync_due()
+            time.sleep(self.sync_interval)
+
+    def sync_due(self):
+        """Runs every sync and key reconciliation that is due and not claimed by another process."""
+        for name in self.tables:
+            try:
+                self.sync(name)
+                if self.reconcile_interval and self._claim(name, "next_reconcile_at", self.reconcile_interval):
+                    self.reconcile(name)
+            except Exception as e:
+                print(f"Local replica sync of {name} failed: {e}")
+
+    def _claim(self, name, column, interval, force=False):
+        """Moves the table's `column` deadline `interval` seconds ahead; True if this call did so (and owns the run)."""
+        now = time.time()
+        with self._write() as conn:
+            return conn.execute(f"UPDATE replica_state SET {column} = ? WHERE table_name = ? AND (? OR {column} <= ?)",
+                                (now + interval, name, force, now)).rowcount == 1
+
+    def _state(self, name):
+        row = self._connect().execute("SELECT watermark, synced_at FROM replica_state WHERE table_name = ?", (name,)).fetchone()
+        return row or (None, None)
+
+    def _fetch(self, table, params):
+        response = self.client.get(table.name, params={"select": "*", "limit": str(self.client.page_size), **params})
+        if response.status_code not in (200, 206):
+            raise Exception(f"Supabase error reading {table.name}: {response.text}")
+        return loads(response.content)
+
+    def _changed_pages(self, table, bound):
+        """Pages of rows matching the `updated_at` filter `bound`, in (updated_at, key) order, paged by value rather than offset."""
+        size = self.client.page_size
+        while True:
+            rows = self._fetch(table, {WATERMARK_COLUMN: bound, "order": f"{WATERMARK_COLUMN},{table.key}"})
+            if rows:
+                yield rows
+            if len(rows) < size:
+                return
+            last = rows[-1][WATERMARK_COLUMN]
+            if rows[0][WATERMARK_COLUMN] == last:
+                # A whole page written in one statement (bulk import) shares a timestamp: walk it by key, then move on.
+                after = rows[-1][table.key]
+                while True:
+                    group = self._fetch(table, {WATERMARK_COLUMN: f"eq.{last}", table.key: f"gt.{after}", "order": table.key})
+                    if group:
+                        yield group
+                    if len(group) < size:
+                        break
+                    after = group[-1][table.key]
+                bound = f"gt.{last}"
+            else:
+                # Rows at `last` may continue on the next page; re-reading the ones already copied is harmless.
+                bound = f"gte.{last}"
+
+    def _all_pages(self, table, select="*"):
+        """Every row of the table in key order, paged by key."""
+        after = None
+        while True:
+            params = {"select": select, "order": table.key}
+            if after is not None:
+                params[table.key] = f"gt.{after}"
+            rows = self._fetch(table, params)
+            if rows:
+                yield rows
+            if len(rows) < self.client.page_size:
+                return
+            after = rows[-1][table.key]
+
+    def sync(self, name, force=False):
+        """Copies rows changed since the table's watermark. The first sync of a table is a full resync.
+
+        Returns the number of rows copied, or None if the sync was not due or another process claimed it.
+        """
+        table = self._table(name)
+        if not self._claim(name, "next_sync_at", self.sync_interval, force):
+            return None
+        watermark, synced_at = self._state(name)
+        if synced_at is None:
+            return self.resync(name)
+
+        # A transaction stamps rows when it starts but they only become visible when it commits, so rows stamped up
+        # to `overlap` seconds before the previous sync started may have been missed by it. Once the watermark is
+        # older than that, everything up to it was seen and only newer rows are read.
+        settled = synced_at - self.overlap
+        watermark = watermark or 0
+        bound = f"gt.{_isoformat(watermark)}" if settled >= watermark else f"gte.{_isoformat(settled)}"
+        started = time.time()
+        copied, newest = 0, watermark
+        try:
+            for page in self._changed_pages(table, bound):
+                records = self._records(table, page, time.time())
+                with self._write() as conn:
+                    conn.executemany(self._upsert_sql(table), records)
+                copied += len(records)
+                newest = max([newest or 0] + [record[1] for record in records if record[1] is not None])
+        except Exception as e:
+            self._record_error(name, e)
+            raise
+        with self._write() as conn:
+            conn.execute("UPDATE replica_state SET watermark = max(coalesce(watermark, 0), ?), synced_at = max(coalesce(synced_at, 0), ?), "
+                         "rows_copied = rows_copied + ?, error = NULL WHERE table_name = ?", (newest or 0, started, copied, name))
+        return copied
+
+    def resync(self, name):
+        """Replaces the table's copy with a full read of Supabase. Returns the number of rows copied.
+
+        Rows land in a staging table first, so reads keep seeing the previous
+        copy until a single swap transaction; rows this backend wrote during
+        the read are kept.
+        """
+        table = self._table(name)
+        with self._write() as conn:
+            conn.execute("UPDATE replica_state SET next_sync_at = ? WHERE table_name = ?", (time.time() + 3600, name))
+        started = time.time()
+        conn = self._connect()
+        staging = f'temp."resync_{table.name}"'
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.execute(f'CREATE TABLE {staging} AS SELECT * FROM "replica_{table.name}" WHERE 0')
+        conn.execute(f'CREATE UNIQUE INDEX temp."resync_{table.name}_key" ON "resync_{table.name}" (key)')
+        copied, newest = 0, None
+        try:
+            for page in self._all_pages(table):
+                records = self._records(table, page, started)
+                conn.executemany(self._upsert_sql(table, staging), records)
+                copied += len(records)
+                newest = max([newest or 0] + [record[1] for record in records if record[1] is not None])
+            with self._write() as conn:
+                conn.execute(f'DELETE FROM "replica_{table.name}" WHERE replicated_at < ?', (started,))
+                conn.execute(self._upsert_sql(table, source=staging))
+                conn.execute("UPDATE replica_state SET watermark = max(coalesce(watermark, 0), ?), synced_at = ?, reconciled_at = ?, "
+                             "next_sync_at = ?, rows_copied = rows_copied + ?, error = NULL WHERE table_name = ?",
+                             (newest or 0, started, started, time.time() + self.sync_interval, copied, name))
+        except Exception as e:
+            self._record_error(name, e)
+            raise
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        return copied
+
+    def reconcile(self, name):
+        """Drops rows whose key no longer exists in Supabase (deleted outside this backend). Returns how many."""
+        table = self._table(name)
+        started = time.time()
+        keys = [(str(row[table.key]),) for page in self._all_pages(table, select=table.key) for row in page]
+        conn = self._connect()
+        conn.execute("DROP TABLE IF EXISTS temp.reconcile_keys")
+        conn.execute("CREATE TEMP TABLE reconcile_keys (key TEXT PRIMARY KEY)")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO temp.reconcile_keys VALUES (?)", keys)
+            with self._write() as conn:
+                # Rows copied after the key listing started may be newer than it; they are left alone.
+                removed = conn.execute(f'DELETE FROM "replica_{table.name}" WHERE replicated_at < ? '
+                                       "AND key NOT IN (SELECT key FROM temp.reconcile_keys)", (started,)).rowcount
+                conn.execute("UPDATE replica_state SET reconciled_at = ? WHERE table_name = ?", (started, name))
+        finally:
+            conn.execute("DROP TABLE IF EXISTS temp.reconcile_keys")
+        return removed
+
+    def _record_error(self, name, error):
+        try:
+            with self._write() as conn:
+                # A failed resync gives up its claim, so the next sync retries on schedule.
+                conn.execute("UPDATE replica_state SET error = ?, next_sync_at = min(next_sync_at, ?) WHERE table_name = ?",
+                             (str(error)[:500], time.time() + self.sync_interval, name))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        conn = self._connect()
+        now = time.time()
+        tables = {}
+        for name, watermark, synced_at, reconciled_at, rows_copied, error in conn.execute(
+                "SELECT table_name, watermark, synced_at, reconciled_at, rows_copied, error FROM replica_state"):
+            if name not in self.tables:
+                continue
+            tables[name] = {
+                "rows": conn.execute(f'SELECT count(*) FROM "replica_{name}"').fetchone()[0],
+                "watermark": _isoformat(watermark) if watermark else None,
+                "lag_seconds": round(now - synced_at, 1) if synced_at else None,
+                "fresh": synced_at is not None and now - synced_at <= self.max_staleness,
+                "reconciled_at": reconciled_at,
+                "rows_copied": rows_copied,
+                "error": error,
+            }
+        return {
+            "path": self.path,
+            "max_staleness": self.max_staleness,
+            "sync_interval": self.sync_interval,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "local_reads": self.local_reads,
+            "fallback_reads": self.fallback_reads,
+            "tables": tables,
+        }
@@ -0,0 +1,250 @@
+import contextvars
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers fast cached responses through slow batch renders.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# --- METRIC TYPES ---
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = self.header()
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and collector callbacks, and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+        # Callables returning [(name, kind, help, [(labels dict, value)])], read at scrape time.
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+                for labels, value in samples:
+                    lines.append(f"{name}{_label_text(labels, labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to serve a request; streamed bodies are timed until fully sent.", ("method", "route", "status")))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Requests currently being served.", ("route",)))
+SPAN_DURATION = REGISTRY.register(Histogram(
+    "span_duration_seconds", "Time spent in instrumented steps (aggregation, PDF rendering, ...).", ("span",)))
+SUPABASE_DURATION = REGISTRY.register(Histogram(
+    "supabase_request_duration_seconds", "Supabase calls including retries, per endpoint and final status.", ("endpoint", "status")))
+
+
+# --- REQUEST TRACES & SPANS ---
+class RequestTrace:
+    """Span timings collected while serving one request (from any thread that carries its context)."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def summary(self):
+        with self._lock:
+            return {name: {"count": count, "ms": round(total * 1000, 2)} for name, (count, total) in self.spans.items()}
+
+
+_current_trace = contextvars.ContextVar("request_trace", default=None)
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block into span_duration_seconds and the current request's trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_DURATION.observe(elapsed, span=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, elapsed)
+
+
+def record_supabase_call(endpoint, elapsed, status):
+    """SupabaseClient observer: one histogram sample per call, plus a span on the current request."""
+    SUPABASE_DURATION.observe(elapsed, endpoint=endpoint, status=status)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(f"supabase {endpoint}", elapsed)
+
+
+# --- FLASK INTEGRATION ---
+def init_app(app, log_sample_rate=0.0, slow_request_ms=None):
+    """Times every request and logs a JSON line for a sample of them.
+
+    `log_sample_rate` is the fraction of requests logged (0 to 1); requests
+    slower than `slow_request_ms` are always logged.
+    """
+    from flask import g, request
+
+    def finish(state, status):
+        # Runs from the response's close callback, outside the request context, so it only uses `state`.
+        if state["finished"]:
+            return
+        state["finished"] = True
+        elapsed = time.perf_counter() - state["start"]
+        REQUESTS_IN_FLIGHT.dec(route=state["route"])
+        REQUEST_DURATION.observe(elapsed, method=state["method"], route=state["route"], status=status)
+
+        duration_ms = elapsed * 1000
+        if random.random() < log_sample_rate or (slow_request_ms is not None and duration_ms >= slow_request_ms):
+            print(json.dumps({
+                "event": "request_timing",
+                "ts": round(time.time(), 3),
+                "method": state["method"],
+                "route": state["route"],
+                "path": state["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "spans": state["trace"].summary(),
+            }, separators=(",", ":")), flush=True)
+
+    @app.before_request
+    def start_request_timer():
+        trace = RequestTrace()
+        _current_trace.set(trace)
+        g.metrics_state = state = {
+            "start": time.perf_counter(),
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule is not None else "unmatched",
+            "path": request.path,
+            "trace": trace,
+            "finished": False,
+            "closing": False,
+        }
+        REQUESTS_IN_FLIGHT.inc(route=state["route"])
+
+    @app.after_request
+    def time_response(response):
+        state = g.get("metrics_state")
+        if state is not None:
+            state["status"] = response.status_code
+            # Generated bodies are still being produced here, so stop the clock when the server closes the
+            # response. Werkzeug skips close callbacks for direct-passthrough (send_file) responses.
+            if response.is_streamed and not response.direct_passthrough:
+                response.call_on_close(lambda: finish(state, state["status"]))
+                state["closing"] = True
+        return response
+
+    @app.teardown_request
+    def finish_request_timer(exc):
+        # Streamed bodies tear down with GeneratorExit; their close callback records them instead.
+        state = g.get("metrics_state")
+        if state is not None and not state["closing"]:
+            finish(state, state.get("status") or (500 if exc is not None else 200))
@@ -0,0 +1,280 @@
+from reportlab.lib.colors import HexColor
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+RULE_COLOR = HexColor('#BBBBBB')
+
+# Word widths per (font, size). Standard PDF fonts have no kerning, so a line's
+# width is exactly the sum of its word widths plus the spaces between them.
+_WIDTH_CACHE_LIMIT = 50000
+_width_cache = {}
+
+
+def _widths_for(font, size):
+    widths = _width_cache.get((font, size))
+    if widths is None or len(widths) > _WIDTH_CACHE_LIMIT:
+        widths = _width_cache[(font, size)] = {}
+    return widths
+
+
+def measure(word, font, size):
+    """Width of `word` in points, measured once per (word, font, size)."""
+    widths = _widths_for(font, size)
+    width = widths.get(word)
+    if width is None:
+        width = widths[word] = stringWidth(word, font, size)
+    return width
+
+
+def _break_word(word, font, size, max_width):
+    """Splits a word wider than the line into pieces that fit, character by character."""
+    pieces = []
+    piece = ""
+    piece_width = 0.0
+    for char in word:
+        char_width = measure(char, font, size)
+        if piece and piece_width + char_width > max_width:
+            pieces.append(piece)
+            piece, piece_width = "", 0.0
+        piece += char
+        piece_width += char_width
+    if piece:
+        pieces.append(piece)
+    return pieces
+
+
+def wrap_text(text, font, size, max_width):
+    """Wraps text into lines no wider than `max_width`, in one pass over the words.
+
+    Each word is measured once (and cached across calls), so the cost is
+    linear in the text length. Newlines start a new line and words wider
+    than a whole line are broken rather than dropped.
+    """
+    space = measure(" ", font, size)
+    lines = []
+    for paragraph in (text or "").splitlines() or [""]:
+        line = []
+        line_width = 0.0
+        for word in paragraph.split():
+            width = measure(word, font, size)
+            if width >= max_width:
+                if line:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+                pieces = _break_word(word, font, size, max_width)
+                lines.extend(pieces[:-1])
+                word = pieces[-1]
+                width = measure(word, font, size)
+            if line and line_width + space + width >= max_width:
+                lines.append(" ".join(line))
+                line, line_width = [], 0.0
+            line_width = width if not line else line_width + space + width
+            line.append(word)
+        lines.append(" ".join(line))
+    return lines
+
+
+# --- PAGE FLOW ---
+class PageFlow:
+    """Tracks the write position on a canvas and starts new pages as blocks run out of room.
+
+    `continued_header(flow)` is called at the top of every page after the
+    first, so long reports keep their context when they spill over.
+    """
+
+    def __init__(self, canvas, top=750, bottom=60, left=50, right=550, continued_header=None):
+        self.canvas = canvas
+        self.top = top
+        self.bottom = bottom
+        self.left = left
+        self.right = right
+        self.continued_header = continued_header
+        self.y = top
+        self.page = 1
+        # Title of the section being drawn, for continued headers.
+        self.section = None
+
+    @property
+    def width(self):
+        return self.right - self.left
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.page += 1
+        self.y = self.top
+        if self.continued_header:
+            self.continued_header(self)
+
+    def ensure(self, height):
+        """Starts a new page unless `height` points fit above the bottom margin. Returns True on a break."""
+        if self.y - height < self.bottom:
+            self.new_page()
+            return True
+        return False
+
+    def draw(self, blocks):
+        for block in blocks:
+            block.draw(self)
+
+
+# --- BLOCKS ---
+class Spacer:
+    def __init__(self, height):
+        self.height = height
+
+    def draw(self, flow):
+        flow.y -= self.height
+
+
+class Header:
+    """Report title followed by rows of text fields, each row a list of (x offset, text)."""
+
+    def __init__(self, title, rows, color, text_color, title_size=20, size=10, leading=16):
+        self.title = title
+        self.rows = rows
+        self.color = color
+        self.text_color = text_color
+        self.title_size = title_size
+        self.size = size
+        self.leading = leading
+
+    def draw(self, flow):
+        c = flow.canvas
+        c.setFillColor(self.color)
+        c.setFont("Helvetica-Bold", self.title_size)
+        c.drawString(flow.left, flow.y, self.title)
+        c.setFillColor(self.text_color)
+        flow.y -= 25
+
+        c.setFont("Helvetica", self.size)
+        for i, row in enumerate(self.rows):
+            for x, text in row:
+                c.drawString(flow.left + x, flow.y, text)
+            flow.y -= self.leading if i < len(self.rows) - 1 else 30
+
+
+class SummaryBox:
+    """Rounded panel of label/value rows; each row is (label, value, value color)."""
+
+    def __init__(self, rows, background, text_color, value_x=150, height=50):
+        self.rows = rows
+        self.background = background
+        self.text_color = text_color
+        self.value_x = value_x
+        self.height = height
+
+    def draw(self, flow):
+        flow.ensure(self.height)
+        c = flow.canvas
+        y = flow.y
+        c.setFillColor(self.background)
+        c.roundRect(flow.left, y - 5, flow.width, self.height, 8, fill=1)
+
+        row_y = y + self.height - 25
+        for label, value, color in self.rows:
+            c.setFillColor(self.text_color)
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(flow.left + 10, row_y, label)
+            c.setFillColor(color or self.text_color)
+            c.setFont("Helvetica-Bold", 16)
+            c.drawString(flow.left + self.value_x, row_y, value)
+            row_y -= 15
+        c.setFillColor(self.text_color)
+        flow.y -= self.height + 10
+
+
+class SectionTitle:
+    """Underlined section heading. `keep_with_next` reserves room so it is never left alone at a page bottom."""
+
+    def __init__(self, title, rule_color, space_after=20, keep_with_next=40):
+        self.title = title
+        self.rule_color = rule_color
+        self.space_after = space_after
+        self.keep_with_next = keep_with_next
+
+    def draw(self, flow):
+        flow.ensure(5 + self.space_after + self.keep_with_next)
+        flow.section = self.title
+        c = flow.canvas
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(flow.left, flow.y, self.title)
+        flow.y -= 5
+        c.setStrokeColor(self.rule_color)
+        c.line(flow.left, flow.y, flow.right, flow.y)
+        flow.y -= self.space_after
+
+
+class Table:
+    """Rows of cells at fixed column offsets. The header row is repeated on every page the table spans."""
+
+    def __init__(self, columns, rows, size=10, leading=16):
+        self.columns = columns
+        self.rows = rows
+        self.size = size
+        self.leading = leading
+
+    def _draw_header(self, flow):
+        c = flow.canvas
+        c.setFont("Helvetica-Bold", self.size)
+        for label, x in self.columns:
+            c.drawString(flow.left + x, flow.y, label)
+        c.setStrokeColor(RULE_COLOR)
+        c.line(flow.left, flow.y - 2, flow.right, flow.y - 2)
+        flow.y -= 15
+        c.setFont("Helvetica", self.size)
+
+    def draw(self, flow):
+        flow.ensure(15 + self.leading)
+        self._draw_header(flow)
+        c = flow.canvas
+        for row in self.rows:
+            if flow.ensure(0):
+                self._draw_header(flow)
+            for (_, x), cell in zip(self.columns, row):
+                c.drawString(flow.left + x, flow.y, str(cell))
+            flow.y -= self.leading
+
+
+class Heading:
+    """Single line of bold text, kept on the same page as the first lines that follow it."""
+
+    def __init__(self, text, color, text_color, indent=5, size=10, leading=16, keep_with_next=24):
+        self.text = text
+        self.color = color
+        self.text_color = text_color
+        self.indent = indent
+        self.size = size
+        self.leading = leading
+        self.keep_with_next = keep_with_next
+
+    def draw(self, flow):
+        flow.ensure(self.leading + self.keep_with_next)
+        c = flow.canvas
+        c.setFont("Helvetica-Bold", self.size)
+        c.setFillColor(self.color)
+        c.drawString(flow.left + self.indent, flow.y, self.text)
+        c.setFillColor(self.text_color)
+        flow.y -= self.leading
+
+
+class Paragraph:
+    """Wrapped text that flows across as many pages as it needs."""
+
+    def __init__(self, text, font="Helvetica", size=10, leading=16, indent=10, right_padding=10, space_after=0):
+        self.text = text
+        self.font = font
+        self.size = size
+        self.leading = leading
+        self.indent = indent
+        self.right_padding = right_padding
+        self.space_after = space_after
+
+    def draw(self, flow):
+        c = flow.canvas
+        c.setFont(self.font, self.size)
+        max_width = flow.width - self.indent - self.right_padding
+        for line in wrap_text(self.text, self.font, self.size, max_width):
+            if flow.ensure(0):
+                c.setFont(self.font, self.size)
+            c.drawString(flow.left + self.indent, flow.y, line)
+            flow.y -= self.leading
+        flow.y -= self.space_after
@@ -0,0 +1,149 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+PROFILE_HEADER = "X-Profile-Token"
+SORT_KEYS = {"cumulative": 3, "tottime": 2, "calls": 1}
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _slug(path):
+    return re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+
+
+class RequestProfiler:
+    """Runs selected requests under cProfile and keeps the newest `keep` profiles in `directory`.
+
+    A request is profiled when it carries the admin token or is picked by
+    `sample_rate`. The token is only read from the X-Profile-Token header,
+    never the query string, so it stays out of access logs and proxy URLs.
+    With no token and a zero sample rate no hooks are installed at all. Only
+    one request is profiled at a time; others run normally meanwhile.
+    cProfile follows the request's own thread, so time in gather() workers
+    shows up as waiting.
+    """
+
+    def __init__(self, directory=None, keep=50, sample_rate=0.0, admin_token=None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "vrecruit-profiles")
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token or None
+        self._active = threading.Lock()
+        self._files_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.admin_token is not None or self.sample_rate > 0
+
+    def is_admin(self, token):
+        return self.admin_token is not None and bool(token) and hmac.compare_digest(token, self.admin_token)
+
+    def init_app(self, app, skip_prefixes=()):
+        """Installs the hooks; paths starting with any of `skip_prefixes` are never profiled."""
+        if not self.enabled:
+            return
+        from flask import g, request
+
+        @app.before_request
+        def start_profile():
+            if request.path.startswith(tuple(skip_prefixes)):
+                return
+            token = request.headers.get(PROFILE_HEADER)
+            if not (self.is_admin(token) or random.random() < self.sample_rate):
+                return
+            if not self._active.acquire(blocking=False):
+                return
+            profiler = cProfile.Profile()
+            g.profile = (profiler, time.perf_counter())
+            profiler.enable()
+
+        @app.teardown_request
+        def stop_profile(exc):
+            started = g.pop("profile", None)
+            if started is None:
+                return
+            profiler, start = started
+            try:
+                profiler.disable()
+                duration_ms = (time.perf_counter() - start) * 1000
+                self._save(profiler, request.method, request.path, duration_ms, exc)
+            except OSError as e:
+                print(f"Could not save request profile: {e}")
+            finally:
+                self._active.release()
+
+    # --- STORAGE ---
+    def _save(self, profiler, method, path, duration_ms, exc):
+        os.makedirs(self.directory, exist_ok=True)
+        captured_at = time.time()
+        profile_id = f"{int(captured_at * 1000)}-{_slug(path)}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as meta_file:
+            json.dump({
+                "id": profile_id, "method": method, "path": path, "duration_ms": round(duration_ms, 2),
+                "captured_at": round(captured_at, 3), "error": None if exc is None else repr(exc),
+            }, meta_file)
+        self._rotate()
+
+    def _rotate(self):
+        with self._files_lock:
+            profile_ids = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".prof"))
+            for profile_id in profile_ids[:max(0, len(profile_ids) - self.keep)]:
+                for extension in (".prof", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, profile_id + extension))
+                    except FileNotFoundError:
+                        pass
+
+    def list_profiles(self):
+        """Metadata of the stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as meta_file:
+                    profiles.append(json.load(meta_file))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def top_functions(self, profile_id, limit=25, sort="cumulative"):
+        """The `limit` hottest functions of one profile, or None if it does not exist."""
+        if not _PROFILE_ID.match(profile_id or ""):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        try:
+            stats = pstats.Stats(path).stats
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        column = SORT_KEYS.get(sort, SORT_KEYS["cumulative"])
+        rows = sorted(stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        total = sum(tottime for _, _, tottime, _, _ in stats.values())
+        return {
+            "id": profile_id,
+            "sort": sort if sort in SORT_KEYS else "cumulative",
+            "total_ms": round(total * 1000, 3),
+            "functions": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "primitive_calls": primitive_calls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                    "percall_ms": round(cumtime * 1000 / calls, 3) if calls else 0,
+                }
+                for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in rows
+            ],
+        }
@@ -0,0 +1,149 @@
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import span
+
+# ReportLab is CPU-bound and holds the GIL, so batch rendering uses processes.
+# REPORT_RENDER_WORKERS=0 renders inline (useful where forking is not allowed).
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Returns the shared render pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_RENDER_WORKERS)
+        return _pool
+
+
+def _reset_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_pdf_off_thread(report_data, candidate_id):
+    """Renders one report on the shared process pool (or inline when it is disabled)."""
+    from report_pdf import render_pdf_report
+
+    with span("render_pdf"):
+        if REPORT_RENDER_WORKERS <= 0:
+            return render_pdf_report(report_data, candidate_id)
+        try:
+            return get_render_pool().submit(render_pdf_report, report_data, candidate_id).result()
+        except BrokenProcessPool:
+            _reset_render_pool()
+            raise
+
+
+def report_filename(candidate_id):
+    return f"VRecruitment_Report_{candidate_id}.pdf"
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands zip bytes back to the caller as they are produced."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _render_results(reports, prepare=None):
+    """Yields (candidate_id, pdf_bytes, error) in completion order.
+
+    At most two renders per worker are in flight, so finished PDFs are
+    released as soon as they are written instead of piling up in memory.
+    `prepare` runs on each report just before its render is started.
+    """
+    from report_pdf import render_pdf_report
+
+    if REPORT_RENDER_WORKERS <= 0:
+        for candidate_id, report_data in reports.items():
+            try:
+                if prepare is not None:
+                    report_data = prepare(report_data)
+                with span("render_pdf"):
+                    pdf_bytes = render_pdf_report(report_data, candidate_id)
+                yield candidate_id, pdf_bytes, None
+            except Exception as e:
+                yield candidate_id, None, str(e)
+        return
+
+    pool = get_render_pool()
+    queue = iter(reports.items())
+    in_flight = {}
+
+    def submit_next():
+        for candidate_id, report_data in queue:
+            try:
+                if prepare is not None:
+                    report_data = prepare(report_data)
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            else:
+                future = pool.submit(render_pdf_report, report_data, candidate_id)
+            in_flight[future] = candidate_id
+            return True
+        return False
+
+    try:
+        for _ in range(REPORT_RENDER_WORKERS * 2):
+            if not submit_next():
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                candidate_id = in_flight.pop(future)
+                try:
+                    yield candidate_id, future.result(), None
+                except BrokenProcessPool:
+                    _reset_render_pool()
+                    raise
+                except Exception as e:
+                    yield candidate_id, None, str(e)
+                submit_next()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def stream_reports_zip(reports, prepare=None):
+    """Renders every report in `reports` (candidate ID -> report data) and streams a zip archive.
+
+    Each PDF is added to the archive, and its bytes yielded, as soon as its
+    render finishes. Failed renders are recorded as a .error.txt entry.
+    `prepare(report_data)`, if given, returns the data to render; it runs
+    as each report's render is started rather than for the whole batch up
+    front, so slow preparation does not hold back the first entries.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for candidate_id, pdf_bytes, error in _render_results(reports, prepare):
+            if error is None:
+                archive.writestr(report_filename(candidate_id), pdf_bytes)
+            else:
+                archive.writestr(f"{report_filename(candidate_id)}.error.txt", f"PDF generation failed: {error}\n")
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Returns the cached value, or runs `loader` once for all concurrent callers missing `key`.
+
+        Callers that arrive while a load is in flight wait for its result (or
+        its exception) instead of starting their own.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            future = self._loading.get(key)
+            leader = future is None
+            if leader:
+                future = self._loading[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value = loader()
+            self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def invalidate(self, predicate):
+        """Drops every entry whose key matches `predicate`. Returns the number removed."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl, "hits": self.hits, "misses": self.misses,
+                    "coalesced": self.coalesced}
+
+
+class ReportCache:
+    """Caches aggregated report data and rendered report files per candidate.
+
+    Entries are keyed by (kind, candidate ID, version stamp), where the stamp
+    changes whenever the candidate's completed evaluations change. The stamp
+    itself is cached briefly so repeat downloads skip even the version query;
+    invalidate() drops everything for a candidate immediately.
+    """
+
+    def __init__(self, maxsize=256, ttl=300, version_ttl=5):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.versions = TTLCache(maxsize=maxsize * 4, ttl=version_ttl)
+
+    def get_version(self, candidate_id, loader):
+        version = self.versions.get(candidate_id)
+        if version is None:
+            version = loader(candidate_id)
+            self.versions.set(candidate_id, version)
+        return version
+
+    def get(self, kind, candidate_id, version):
+        return self.entries.get((kind, candidate_id, version))
+
+    def set(self, kind, candidate_id, version, value):
+        self.entries.set((kind, candidate_id, version), value)
+
+    def get_or_load(self, kind, candidate_id, version, loader):
+        """Returns the cached entry, or runs `loader` once for all concurrent requests missing it."""
+        return self.entries.get_or_load((kind, candidate_id, version), loader)
+
+    def invalidate(self, candidate_id=None):
+        """Drops cached entries for one candidate, or for everyone when no ID is given."""
+        if candidate_id is None:
+            self.versions.clear()
+            return self.entries.clear()
+        self.versions.invalidate(lambda key: key == candidate_id)
+        return self.entries.invalidate(lambda key: key[1] == candidate_id)
+
+    def stats(self):
+        return {"entries": self.entries.stats(), "versions": self.versions.stats()}
+
+
+def make_etag(kind, candidate_id, version):
+    """Strong ETag value (unquoted) for one rendering of a candidate's report at a given version."""
+    return hashlib.sha1(f"{kind}:{candidate_id}:{version}".encode("utf-8")).hexdigest()[:32]
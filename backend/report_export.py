@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+import re
+import tempfile
+
+# Rows in the single-candidate CSV keep the original layout and `\n` line endings.
+CSV_LINE_TERMINATOR = "\n"
+
+# Excel rejects these in worksheet names, and names longer than 31 characters.
+WORKSHEET_NAME_INVALID = re.compile(r"[\[\]:*?/\\]")
+WORKSHEET_NAME_MAX = 31
+
+COHORT_HEADER = ["Candidate ID", "Candidate", "Position", "Row Type", "Round/Section", "Score", "Max Score", "Average Percentage", "Comment"]
+
+
+def candidate_report_rows(candidate_id, report_data):
+    """Yields the rows of the grouped single-candidate report."""
+    info = report_data['candidate_info']
+    yield ["V-Recruitment Grouped Report for", info['name']]
+    yield ["Candidate ID", candidate_id]
+    yield ["Overall Score", f"{info['total_score_sum']}/{info['total_max_score_sum']}"]
+    yield ["Final Recommendation", info['recommendation']]
+    yield []
+
+    yield ["Round", "Score", "Max Score", "Average Percentage"]
+    for round_data in report_data['grouped_by_round']:
+        yield [round_data['round'], round_data['score'], round_data['max_score'], f"{round_data['avg_score']}%"]
+    yield []
+
+    yield ["Detailed Section Scores/Comments"]
+    yield ["Section", "Score", "Max Score", "Comment"]
+    for section_data in report_data['section_scores']:
+        yield [section_data['section'], section_data.get('score', 'N/A'), section_data.get('max', 'N/A'), section_data.get('comment', 'N/A')]
+
+
+def cohort_report_rows(candidate_id, report_data):
+    """Yields one overall row, then one row per round and per section, for a candidate in a cohort export."""
+    info = report_data['candidate_info']
+    prefix = [candidate_id, info['name'], info['position']]
+    yield prefix + ["Overall", info['recommendation'], info['total_score_sum'], info['total_max_score_sum'], f"{info['overall_score']}%", ""]
+    for round_data in report_data['grouped_by_round']:
+        yield prefix + ["Round", round_data['round'], round_data['score'], round_data['max_score'], f"{round_data['avg_score']}%", ""]
+    for section_data in report_data['section_scores']:
+        yield prefix + ["Section", section_data['section'], section_data['score'], section_data['max'], f"{section_data['avg_score']}%", section_data['comment']]
+
+
+def stream_csv(rows, flush_bytes=64 * 1024):
+    """Encodes rows with csv.writer quoting and yields UTF-8 chunks of roughly `flush_bytes`."""
+    line = io.StringIO()
+    writer = csv.writer(line, lineterminator=CSV_LINE_TERMINATOR)
+    for row in rows:
+        writer.writerow(row)
+        if line.tell() >= flush_bytes:
+            yield line.getvalue().encode('utf-8')
+            line.seek(0)
+            line.truncate()
+    if line.tell():
+        yield line.getvalue().encode('utf-8')
+
+
+def xlsx_available():
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def worksheet_name(name, default="Report"):
+    """Makes user text (e.g. a position) a valid worksheet name, falling back to `default` if nothing usable is left."""
+    cleaned = WORKSHEET_NAME_INVALID.sub("", name or "").strip().strip("'").strip()[:WORKSHEET_NAME_MAX].strip()
+    # "History" is reserved by Excel.
+    return cleaned if cleaned and cleaned.lower() != "history" else default
+
+
+def stream_xlsx(rows, sheet_name="Report", chunk_size=64 * 1024):
+    """Writes rows to an .xlsx in xlsxwriter's constant-memory mode and streams the finished file.
+
+    `sheet_name` must already be valid (see worksheet_name): by the time
+    xlsxwriter sees it the response has started, so it cannot fail cleanly.
+
+    Rows are flushed to a temporary file as they are written, so memory use
+    does not grow with the row count. The file is removed once streamed.
+    """
+    import xlsxwriter
+
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "tmpdir": tempfile.gettempdir()})
+        worksheet = workbook.add_worksheet(sheet_name)
+        for row_number, row in enumerate(rows):
+            worksheet.write_row(row_number, 0, row)
+        workbook.close()
+
+        with open(path, "rb") as workbook_file:
+            while True:
+                chunk = workbook_file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of unfinished jobs has reached the configured limit."""
+
+
+# --- RESULT STORES ---
+class MemoryResultStore:
+    """Keeps finished job files in process memory."""
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def save(self, job_id, chunks):
+        data = b"".join(chunks)
+        with self._lock:
+            self._results[job_id] = data
+        return len(data)
+
+    def open(self, job_id, chunk_size=64 * 1024):
+        with self._lock:
+            data = self._results.get(job_id)
+        if data is None:
+            return None
+        return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+    def delete(self, job_id):
+        with self._lock:
+            self._results.pop(job_id, None)
+
+
+class DiskResultStore:
+    """Writes finished job files under a local directory, so large results never sit in memory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.bin")
+
+    def save(self, job_id, chunks):
+        path = self._path(job_id)
+        size = 0
+        with open(f"{path}.part", "wb") as result_file:
+            for chunk in chunks:
+                result_file.write(chunk)
+                size += len(chunk)
+        os.replace(f"{path}.part", path)
+        return size
+
+    def open(self, job_id, chunk_size=64 * 1024):
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            return None
+
+        def read():
+            with open(path, "rb") as result_file:
+                while True:
+                    chunk = result_file.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+        return read()
+
+    def delete(self, job_id):
+        for path in (self._path(job_id), f"{self._path(job_id)}.part"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def make_result_store(kind, directory=None):
+    if kind == "disk":
+        return DiskResultStore(directory or os.path.join(os.getcwd(), "report_jobs"))
+    if kind == "memory":
+        return MemoryResultStore()
+    raise ValueError(f"Unknown result store '{kind}'. Use 'memory' or 'disk'.")
+
+
+# --- JOB MANAGER ---
+class ReportJobManager:
+    """Runs report jobs on a bounded thread pool and keeps their results until they expire.
+
+    A job is a callable returning (chunks, filename, mimetype), where chunks is
+    an iterable of bytes written straight into the result store. No external
+    broker is involved; jobs live for the lifetime of the process.
+    """
+
+    def __init__(self, store, max_workers=2, max_pending=50, ttl=900):
+        self.store = store
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params, work):
+        self.expire()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job["status"] in (JOB_QUEUED, JOB_RUNNING))
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} report jobs are already pending.")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id, "type": kind, "params": params, "status": JOB_QUEUED,
+                "created_at": time.time(), "started_at": None, "finished_at": None,
+                "filename": None, "mimetype": None, "size": None, "error": None,
+            }
+        self._pool.submit(self._run, job_id, work)
+        return self.get(job_id)
+
+    def _update(self, job_id, **changes):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(changes)
+
+    def _run(self, job_id, work):
+        self._update(job_id, status=JOB_RUNNING, started_at=time.time())
+        try:
+            chunks, filename, mimetype = work()
+            size = self.store.save(job_id, chunks)
+            self._update(job_id, status=JOB_DONE, finished_at=time.time(), filename=filename, mimetype=mimetype, size=size)
+        except Exception as e:
+            print(f"--- REPORT JOB {job_id} FAILED ---")
+            print(traceback.format_exc())
+            print(f"--- END ERROR ---")
+            self.store.delete(job_id)
+            self._update(job_id, status=JOB_FAILED, finished_at=time.time(), error=str(e))
+
+    def get(self, job_id):
+        """Returns a copy of the job record, or None if it does not exist or has expired."""
+        self.expire()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def open_result(self, job_id):
+        return self.store.open(job_id)
+
+    def expire(self):
+        """Drops finished jobs (and their files) older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        for job_id in expired:
+            self.store.delete(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"jobs": counts, "max_pending": self.max_pending, "ttl": self.ttl}
@@ -0,0 +1,75 @@
+import io
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.lib.colors import HexColor
+
+from pdf_layout import Header, Heading, PageFlow, Paragraph, SectionTitle, Spacer, SummaryBox, Table
+
+# --- PDF COLORS ---
+COLOR_PRIMARY = HexColor('#FF3B5F') # Red/Pink (V-Recruit theme)
+COLOR_SECONDARY = HexColor('#4CAF50') # Green (Recommended)
+COLOR_TEXT = HexColor('#333333')
+COLOR_BG_LIGHT = HexColor('#F5F5F5')
+
+
+def report_blocks(report_data, candidate_id):
+    """The report as a list of layout blocks, top to bottom."""
+    info = report_data['candidate_info']
+    rec_color = COLOR_SECONDARY if "Recommended" in info['recommendation'] else COLOR_PRIMARY
+
+    blocks = [
+        Header("Candidate Performance Report", [
+            [(0, f"Candidate: {info['name']}"), (250, f"ID: {candidate_id}")],
+            [(0, f"Position: {info['position']}")],
+        ], COLOR_PRIMARY, COLOR_TEXT),
+        SummaryBox([
+            ("Overall Score:", f"{info['total_score_sum']}/{info['total_max_score_sum']}", None),
+            ("Recommendation:", info['recommendation'], rec_color),
+        ], COLOR_BG_LIGHT, COLOR_TEXT),
+        SectionTitle("Evaluation Scores Breakdown", COLOR_PRIMARY, space_after=15),
+        Table(
+            [("Round Type", 10), ("Total Score", 200), ("Average %", 350)],
+            [(r['round'], f"{r['score']}/{r['max_score']}", f"{r['avg_score']}%") for r in report_data['grouped_by_round']],
+        ),
+        Spacer(20),
+        SectionTitle("AI Summary & Insights", COLOR_PRIMARY),
+        Paragraph(report_data['ai_summary'], font="Helvetica-Oblique", size=10, leading=16, indent=10, space_after=20),
+    ]
+
+    if report_data['section_scores']:
+        blocks.append(SectionTitle("Detailed Dimension Analysis", COLOR_PRIMARY))
+        for score_data in report_data['section_scores']:
+            comment = score_data.get('comment') or 'No comments available.'
+            blocks.append(Heading(f"{score_data['section']} ({score_data['avg_score']}%)", COLOR_PRIMARY, COLOR_TEXT))
+            # Tighter spacing for detailed comments
+            blocks.append(Paragraph(
+                f"Score: {score_data['score']}/{score_data['max']} | Comment: {comment}",
+                font="Helvetica", size=9, leading=12, indent=15, right_padding=5, space_after=10,
+            ))
+    return blocks
+
+
+def render_pdf_report(report_data, candidate_id):
+    """Draws the candidate performance report and returns the PDF bytes.
+
+    Kept free of Flask and Supabase state so it can run in a worker process.
+    Long reports continue onto further pages; no text is truncated.
+    """
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    p.setTitle("Candidate Performance Report")
+    name = report_data['candidate_info']['name']
+
+    def continued_header(flow):
+        p.setFillColor(COLOR_TEXT)
+        p.setFont("Helvetica", 12)
+        p.drawString(flow.left, flow.y, f"{flow.section or 'Candidate Performance Report'} (Continued for {name})")
+        flow.y -= 20
+
+    flow = PageFlow(p, top=750, bottom=60, left=50, right=550, continued_header=continued_header)
+    flow.draw(report_blocks(report_data, candidate_id))
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
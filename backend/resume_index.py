@@ -0,0 +1,708 @@
+import bisect
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+
+from candidate_index import normalize
+from json_codec import decode_field
+from live_index import LiveIndex
+
+# Profile columns indexed alongside the resume text, as (resume_candidates column, candidate_profiles column).
+PROFILE_TEXT_FIELDS = (("academic", "academic_details"), ("experience", "experience_details"), ("skills", "computer_skills"))
+# Weights for (resume, academic, experience, skills): a term in a short, curated profile field says more than the
+# same term somewhere in a long resume.
+RANK_WEIGHTS = (1.0, 2.0, 2.0, 3.0)
+# Typical length in words of each column. BM25 length normalization pivots on these fixed values instead of the
+# corpus averages, so a stored document's term impacts never have to be recomputed as the corpus grows.
+TYPICAL_LENGTHS = (400, 12, 12, 8)
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_QUERY_TERMS = 12
+# Longer tokens are almost always extraction debris (base64, URLs run together) and are not indexed.
+MAX_TERM_LENGTH = 40
+# The last query word matches as a prefix once it has this many characters, against at most this many of the
+# most frequent terms it starts (enough for search-as-you-type; "pr" alone would otherwise mean thousands).
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_TERMS = 64
+SNIPPET_WORDS = 16
+
+STATUS_QUEUED = "queued"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_UNSUPPORTED = "unsupported"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_files (
+    sha256 TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    filename TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    text TEXT,
+    created_at REAL NOT NULL,
+    extracted_at REAL
+);
+CREATE TABLE IF NOT EXISTS resume_urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES resume_files(sha256)
+);
+CREATE INDEX IF NOT EXISTS resume_urls_sha256 ON resume_urls(sha256);
+CREATE TABLE IF NOT EXISTS resume_terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS resume_candidates (
+    candidate_uid TEXT PRIMARY KEY,
+    resume_url TEXT,
+    academic TEXT NOT NULL DEFAULT '',
+    experience TEXT NOT NULL DEFAULT '',
+    skills TEXT NOT NULL DEFAULT '',
+    vector BLOB,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS resume_candidates_url ON resume_candidates(resume_url);
+CREATE INDEX IF NOT EXISTS resume_candidates_seq ON resume_candidates(seq);
+"""
+
+_WORD = re.compile(r"[^\W_]+")
+_SPACE = re.compile(r"\s+")
+
+
+def profile_field_text(value):
+    """Flattens a profile JSON field (academic rows, experience rows, skill ratings) into searchable text.
+
+    Dict keys are included where the value is set, so a skills object like
+    {"ms_office": "Good"} is found by "office" as well as by its rating.
+    """
+    value = decode_field(value, value)
+    parts = []
+
+    def walk(item, key=None):
+        if isinstance(item, dict):
+            for child_key, child in item.items():
+                walk(child, child_key)
+        elif isinstance(item, list):
+            for child in item:
+                walk(child)
+        elif item not in (None, "", False):
+            if key and isinstance(key, str):
+                parts.append(key.replace("_", " "))
+            parts.append(str(item))
+
+    walk(value)
+    return " ".join(parts)
+
+
+def tokens(text):
+    """The normalized words of `text`, the same way candidate_index.normalize splits a query."""
+    if not text:
+        return []
+    if text.isascii():
+        return _WORD.findall(text.lower())
+    return normalize(text).split()
+
+
+def term_impacts(columns):
+    """{term: impact} for one candidate's (resume, academic, experience, skills) texts.
+
+    The impact is the weighted BM25 term-frequency part summed over columns;
+    a query multiplies it by the term's idf, which is the only corpus-wide
+    statistic and is cheap to compute at query time.
+    """
+    impacts = Counter()
+    for text, weight, typical in zip(columns, RANK_WEIGHTS, TYPICAL_LENGTHS):
+        words = tokens(text)
+        if not words:
+            continue
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(words) / typical)
+        for term, frequency in Counter(words).items():
+            if len(term) <= MAX_TERM_LENGTH:
+                impacts[term] += weight * frequency * (BM25_K1 + 1) / (frequency + norm)
+    return impacts
+
+
+def query_words(text):
+    return normalize(text).split()[:MAX_QUERY_TERMS]
+
+
+def _unpack(vector):
+    """(term ids, impacts) arrays of a stored vector: int32 ids followed by float32 impacts."""
+    count = len(vector) // 8
+    term_ids, impacts = array("i"), array("f")
+    term_ids.frombytes(vector[:4 * count])
+    impacts.frombytes(vector[4 * count:])
+    return term_ids, impacts
+
+
+def _snippet_pattern(words):
+    """Matches any query word, the last one also as a prefix, in lowercased text; longest words first, so one
+    that starts another is not matched in its place. Word boundaries are checked by _matches."""
+    alternatives = sorted({re.escape(word) for word in words[:-1]} | {re.escape(words[-1])}, key=len, reverse=True)
+    if len(words[-1]) >= MIN_PREFIX_LENGTH:
+        alternatives = [alternative for alternative in alternatives if alternative != re.escape(words[-1])]
+        alternatives.append(re.escape(words[-1]) + r"[^\W_]*")
+    return re.compile("|".join(alternatives))
+
+
+def _matches(lowered, pattern):
+    """(start, end) of every whole-word match. A plain search plus this check is several times faster than
+    putting lookarounds and IGNORECASE in the pattern."""
+    size = len(lowered)
+    for match in pattern.finditer(lowered):
+        start, end = match.span()
+        if (start == 0 or not lowered[start - 1].isalnum()) and (end == size or not lowered[end].isalnum()):
+            yield start, end
+
+
+def _lowered(text):
+    lowered = text.lower()
+    # A few characters change length when lowercased; offsets must line up with the original text.
+    return lowered if len(lowered) == len(text) else text
+
+
+def _snippet(text, lowered, pattern, width=SNIPPET_WORDS):
+    """Up to `width` words of `text` around the first match, as [{"text", "match"}] segments, so clients never
+    render markup."""
+    first = next(_matches(lowered, pattern), None)
+    anchor = first[0] if first else 0
+    begin = max(0, anchor - 12 * width)
+    spans = [match.span() for match in _WORD.finditer(text, begin, anchor + 12 * width)]
+    # A window that starts mid-word drops that fragment.
+    if spans and spans[0][0] == begin and begin > 0 and text[begin - 1].isalnum():
+        spans = spans[1:]
+    if not spans:
+        return []
+    starts = [start for start, _ in spans]
+    first_word = max(0, bisect.bisect_left(starts, anchor) - 4)
+    window = spans[first_word:first_word + width]
+    segments = [{"text": "… ", "match": False}] if window[0][0] > 0 else []
+    cursor = window[0][0]
+    for start, end in window:
+        if start > cursor:
+            segments.append({"text": _SPACE.sub(" ", text[cursor:start]), "match": False})
+        segments.append({"text": text[start:end], "match": bool(pattern.fullmatch(lowered, start, end))})
+        cursor = end
+    if text[cursor:].strip():
+        segments.append({"text": " …", "match": False})
+
+    merged = []
+    for segment in segments:
+        if merged and not merged[-1]["match"] and not segment["match"]:
+            merged[-1]["text"] += segment["text"]
+        else:
+            merged.append(segment)
+    return merged
+
+
+def _best_snippet(columns, pattern, wanted):
+    """The snippet of the column that matches the most distinct query words; earlier columns win ties."""
+    best, best_count = None, -1
+    for text in columns:
+        if not text:
+            continue
+        lowered = _lowered(text)
+        seen = set()
+        for start, end in _matches(lowered, pattern):
+            seen.add(lowered[start:end])
+            if len(seen) >= wanted:
+                break
+        if len(seen) > best_count:
+            best, best_count = (text, lowered), len(seen)
+            if best_count >= wanted:
+                break
+    return _snippet(*best, pattern) if best else []
+
+
+class TermIndex(LiveIndex):
+    """In-memory inverted index over the candidates' stored term vectors.
+
+    Postings are numpy arrays of (document number, impact) per term, built
+    from one scan of resume_candidates. Writes append to per-term buffers
+    that are folded into the arrays on the next query touching the term; a
+    replaced or removed candidate's old document number is masked out
+    rather than deleted, and the periodic rebuild drops it. A query adds up
+    impact × idf into a dense score array and partially sorts the matches,
+    so ranking 50k resumes costs a few vector operations per term instead
+    of a per-row scoring callback. Every write bumps the row's `seq`, which
+    is how this index picks up writes made by other worker processes.
+    """
+
+    name = "resume-terms"
+
+    def __init__(self, store, refresh_interval=3600, sync_interval=1.0):
+        super().__init__(store.load_vectors, refresh_interval)
+        self.store = store
+        self.sync_interval = sync_interval
+        self._terms = {}
+        self._vocabulary = []
+        self._max_term_id = 0
+        self._postings = {}
+        self._uids = []
+        self._alive = None
+        self._docs = {}
+        self._live = 0
+        self._seq = 0
+        self._synced_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def _load(self, snapshot):
+        import numpy as np
+
+        terms, rows = snapshot
+        self._terms = {}
+        self._vocabulary = []
+        self._max_term_id = 0
+        self._learn(terms)
+
+        self._uids = []
+        self._docs = {}
+        id_parts, impact_parts, lengths = [], [], []
+        seq = 0
+        for candidate_uid, row_seq, vector in rows:
+            seq = max(seq, row_seq)
+            if vector is None:
+                # A removed candidate; kept as a tombstone so an older write replayed later cannot revive it.
+                self._docs[candidate_uid] = (None, row_seq)
+                continue
+            count = len(vector) // 8
+            id_parts.append(np.frombuffer(vector, np.int32, count, 0))
+            impact_parts.append(np.frombuffer(vector, np.float32, count, 4 * count))
+            lengths.append(count)
+            self._docs[candidate_uid] = (len(self._uids), row_seq)
+            self._uids.append(candidate_uid)
+        self._seq = seq
+        self._synced_at = time.time()
+        self._live = len(self._uids)
+        self._alive = np.ones(max(1024, self._live * 2), dtype=bool)
+
+        self._postings = {}
+        if not id_parts:
+            return
+        term_ids = np.concatenate(id_parts)
+        impacts = np.concatenate(impact_parts)
+        docs = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, docs, impacts = term_ids[order], docs[order], impacts[order]
+        bounds = np.flatnonzero(np.diff(term_ids)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(term_ids)]))
+        for term_id, start, end in zip(term_ids[starts].tolist(), starts.tolist(), ends.tolist()):
+            self._postings[term_id] = [docs[start:end], impacts[start:end], array("i"), array("f")]
+
+    def _learn(self, terms):
+        for term_id, term in terms:
+            if term not in self._terms:
+                self._terms[term] = term_id
+                bisect.insort(self._vocabulary, term)
+            self._max_term_id = max(self._max_term_id, term_id)
+
+    # --- UPDATES ---
+    def apply(self, changes):
+        """Applies committed (candidate_uid, seq, vector or None) changes from this process."""
+        if changes:
+            self._update(lambda: self._apply(changes))
+
+    def _apply(self, changes):
+        import numpy as np
+
+        for candidate_uid, seq, vector in changes:
+            current = self._docs.get(candidate_uid)
+            if current is not None:
+                if current[1] >= seq:
+                    continue
+                if current[0] is not None:
+                    self._alive[current[0]] = False
+                    self._live -= 1
+            if vector is None:
+                self._docs[candidate_uid] = (None, seq)
+                continue
+            term_ids, impacts = _unpack(vector)
+            if term_ids and max(term_ids) > self._max_term_id:
+                self._learn(self.store.terms_after(self._max_term_id))
+            doc = len(self._uids)
+            self._uids.append(candidate_uid)
+            if doc >= len(self._alive):
+                self._alive = np.concatenate((self._alive, np.ones(len(self._alive), dtype=bool)))
+            self._alive[doc] = True
+            self._docs[candidate_uid] = (doc, seq)
+            self._live += 1
+            for term_id, impact in zip(term_ids, impacts):
+                posting = self._postings.get(term_id)
+                if posting is None:
+                    posting = self._postings[term_id] = [np.empty(0, np.int32), np.empty(0, np.float32), array("i"), array("f")]
+                posting[2].append(doc)
+                posting[3].append(impact)
+
+    def sync(self, force=False):
+        """Applies writes other processes committed since the last sync; at most once per `sync_interval`."""
+        if not force and time.time() - self._synced_at < self.sync_interval:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._synced_at = time.time()
+            changes = self.store.changes_since(self._seq)
+            if changes:
+                seq = changes[-1][1]
+
+                def apply():
+                    self._apply(changes)
+                    self._seq = max(self._seq, seq)
+
+                self._update(apply)
+        finally:
+            self._sync_lock.release()
+
+    # --- QUERIES ---
+    def _posting(self, term_id):
+        import numpy as np
+
+        posting = self._postings[term_id]
+        if posting[2]:
+            posting[0] = np.concatenate((posting[0], np.frombuffer(posting[2], np.int32)))
+            posting[1] = np.concatenate((posting[1], np.frombuffer(posting[3], np.float32)))
+            posting[2], posting[3] = array("i"), array("f")
+        return posting[0], posting[1]
+
+    def _expand(self, prefix):
+        """Ids of the most frequent indexed terms starting with `prefix`."""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        term_ids = [self._terms[term] for term in self._vocabulary[start:end] if self._terms[term] in self._postings]
+        if len(term_ids) > MAX_PREFIX_TERMS:
+            term_ids.sort(key=lambda term_id: -(len(self._postings[term_id][0]) + len(self._postings[term_id][2])))
+            term_ids = term_ids[:MAX_PREFIX_TERMS]
+        return term_ids
+
+    def search(self, words, limit, offset):
+        """[(candidate_uid, score)] for one page of the candidates matching every word, best first, and the total.
+
+        The last word also matches as a prefix; a candidate's score for it is
+        that of its best-scoring expansion.
+        """
+        import numpy as np
+
+        self.ensure_loaded()
+        self.sync()
+        with self._lock:
+            groups = []
+            for position, word in enumerate(words):
+                if position == len(words) - 1 and len(word) >= MIN_PREFIX_LENGTH:
+                    term_ids = self._expand(word)
+                else:
+                    term_ids = [self._terms[word]] if self._terms.get(word) in self._postings else []
+                if not term_ids:
+                    return [], 0
+                groups.append(term_ids)
+
+            size = len(self._uids)
+            live = max(self._live, 1)
+            scores = np.zeros(size, np.float32)
+            hits = np.zeros(size, np.int8)
+            for term_ids in groups:
+                best = np.zeros(size, np.float32) if len(term_ids) > 1 else scores
+                for term_id in term_ids:
+                    docs, impacts = self._posting(term_id)
+                    idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+                    if best is scores:
+                        scores[docs] += impacts * idf
+                    else:
+                        # A term lists each document once, so fancy-indexed assignment is safe here.
+                        best[docs] = np.maximum(best[docs], impacts * idf)
+                if best is scores:
+                    hits[docs] += 1
+                else:
+                    scores += best
+                    hits += best > 0
+            matched = np.flatnonzero((hits == len(groups)) & self._alive[:size])
+            total = len(matched)
+            wanted = offset + limit
+            if total > wanted > 0:
+                matched = matched[np.argpartition(-scores[matched], wanted - 1)[:wanted]]
+            page = matched[np.argsort(-scores[matched], kind="stable")][offset:wanted]
+            return [(self._uids[doc], float(scores[doc])) for doc in page.tolist()], total
+
+    def stats(self):
+        with self._lock:
+            stats = super().stats()
+            stats.update({
+                "documents": self._live,
+                "dead_documents": len(self._uids) - self._live,
+                "terms": len(self._postings),
+                "postings": sum(len(posting[0]) + len(posting[2]) for posting in self._postings.values()),
+                "seq": self._seq,
+            })
+            return stats
+
+
+class ResumeIndex:
+    """Ranked full-text search over resume text and profile fields, stored in a local SQLite database.
+
+    One row per candidate: the text of the resume their `resume_url` points
+    at (resolved through the content hash, so identical uploads are
+    extracted once) plus their academic, experience and skills fields, and
+    the BM25 term vector computed from them when the row was written. Rows
+    are rewritten as profiles are saved and as extractions finish; queries
+    run against the in-memory TermIndex, and SQLite is only read for the
+    page's snippets. The whole file is derived data and `flask
+    reindex-resumes` rebuilds it. The database runs in WAL mode with one
+    connection per thread, so reads never wait for writers.
+    """
+
+    def __init__(self, path, refresh_interval=3600, sync_interval=1.0):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        # term -> term_id for terms known to be committed; ids assigned by an open transaction wait in _staged.
+        self._term_ids = {}
+        self._staged = {}
+        self._changes = []
+        self._write_seq = None
+        self.terms = TermIndex(self, refresh_interval, sync_interval)
+        self._stats_lock = threading.Lock()
+        self.searches = 0
+        self.search_ms = 0.0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._schema_lock:
+            if not self._ready:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                setup = sqlite3.connect(self.path, timeout=30)
+                try:
+                    setup.execute("PRAGMA journal_mode=WAL")
+                    setup.executescript(SCHEMA)
+                    setup.commit()
+                finally:
+                    setup.close()
+                self._ready = True
+        # Autocommit: reads see the latest committed state and writes open their own transactions.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """One write transaction; the lock keeps this process's writers from contending for SQLite's.
+
+        Changed term vectors reach the in-memory index only after COMMIT.
+        """
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            self._staged, self._changes, self._write_seq = {}, [], None
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            self._term_ids.update(self._staged)
+            changes = self._changes
+        self.terms.apply(changes)
+
+    def _next_seq(self, conn):
+        if self._write_seq is None:
+            self._write_seq = conn.execute("SELECT coalesce(max(seq), 0) + 1 FROM resume_candidates").fetchone()[0]
+        return self._write_seq
+
+    def _ids_for(self, conn, terms):
+        missing = [term for term in terms if term not in self._term_ids and term not in self._staged]
+        if missing:
+            conn.executemany("INSERT OR IGNORE INTO resume_terms (term) VALUES (?)", [(term,) for term in missing])
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                self._staged.update(
+                    (term, term_id) for term_id, term in conn.execute(
+                        f"SELECT term_id, term FROM resume_terms WHERE term IN ({marks})", chunk))
+        return [self._term_ids[term] if term in self._term_ids else self._staged[term] for term in terms]
+
+    # --- FILES ---
+    def add_file(self, sha256, kind, size, filename, url):
+        """Records a stored file and the URL it lives at. Returns False if the content was already known."""
+        with self._write() as conn:
+            created = conn.execute(
+                "INSERT OR IGNORE INTO resume_files (sha256, kind, size, filename, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, kind, size, filename, STATUS_QUEUED, time.time())).rowcount == 1
+            self._link_url(conn, url, sha256)
+        return created
+
+    def link_url(self, url, sha256):
+        """Records that `url` holds the file with this hash, e.g. an older copy of an already-indexed resume."""
+        with self._write() as conn:
+            self._link_url(conn, url, sha256)
+
+    def _link_url(self, conn, url, sha256):
+        previous = conn.execute("SELECT sha256 FROM resume_urls WHERE url = ?", (url,)).fetchone()
+        if previous and previous[0] == sha256:
+            return
+        conn.execute("INSERT OR REPLACE INTO resume_urls (url, sha256) VALUES (?, ?)", (url, sha256))
+        self._refresh_where(conn, "c.resume_url = ?", (url,))
+
+    def set_file_result(self, sha256, status, text=None, error=None):
+        """Stores an extraction outcome and re-indexes every candidate that uses the file."""
+        with self._write() as conn:
+            conn.execute("UPDATE resume_files SET status = ?, text = ?, error = ?, extracted_at = ? WHERE sha256 = ?",
+                         (status, text, error, time.time(), sha256))
+            self._refresh_where(conn, "c.resume_url IN (SELECT url FROM resume_urls WHERE sha256 = ?)", (sha256,))
+
+    def file(self, sha256):
+        """A stored file's metadata and extraction status (without its text), or None."""
+        row = self._connect().execute(
+            "SELECT f.sha256, f.kind, f.size, f.filename, f.status, f.error, f.created_at, f.extracted_at, "
+            "length(f.text), (SELECT min(url) FROM resume_urls u WHERE u.sha256 = f.sha256) "
+            "FROM resume_files f WHERE f.sha256 = ?", (sha256,)).fetchone()
+        if row is None:
+            return None
+        keys = ("sha256", "kind", "size", "filename", "status", "error", "created_at", "extracted_at", "text_length", "resume_url")
+        return dict(zip(keys, row))
+
+    def sha_for_url(self, url):
+        row = self._connect().execute("SELECT sha256 FROM resume_urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def files_with_status(self, status):
+        """(sha256, kind) of every file in `status`, e.g. to resume extractions interrupted by a restart."""
+        return self._connect().execute("SELECT sha256, kind FROM resume_files WHERE status = ?", (status,)).fetchall()
+
+    # --- CANDIDATES ---
+    def upsert_candidates(self, profiles):
+        """Indexes (candidate_uid, profile) pairs; `profile` is a candidate_profiles row or payload."""
+        with self._write() as conn:
+            for candidate_uid, profile in profiles:
+                fields = {column: profile_field_text(profile.get(source)) for column, source in PROFILE_TEXT_FIELDS}
+                conn.execute(
+                    "INSERT INTO resume_candidates (candidate_uid, resume_url, academic, experience, skills) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(candidate_uid) DO UPDATE SET resume_url = excluded.resume_url, academic = excluded.academic, "
+                    "experience = excluded.experience, skills = excluded.skills, deleted = 0",
+                    (candidate_uid, profile.get("resume_url"), fields["academic"], fields["experience"], fields["skills"]))
+                self._refresh_where(conn, "c.candidate_uid = ?", (candidate_uid,))
+
+    def upsert_candidate(self, candidate_uid, profile):
+        self.upsert_candidates([(candidate_uid, profile)])
+
+    def remove_candidates_except(self, candidate_uids):
+        """Drops every candidate not in `candidate_uids` (used by a full reindex). Returns how many were removed."""
+        keep = set(candidate_uids)
+        with self._write() as conn:
+            doomed = [uid for (uid,) in conn.execute("SELECT candidate_uid FROM resume_candidates WHERE deleted = 0")
+                      if uid not in keep]
+            self._remove(conn, doomed)
+        return len(doomed)
+
+    def _remove(self, conn, candidate_uids):
+        # Rows are kept as tombstones with a new seq, so other processes' indexes see the removal when they sync.
+        if not candidate_uids:
+            return
+        seq = self._next_seq(conn)
+        conn.executemany("UPDATE resume_candidates SET deleted = 1, vector = NULL, seq = ? WHERE candidate_uid = ?",
+                         [(seq, uid) for uid in candidate_uids])
+        self._changes.extend((uid, seq, None) for uid in candidate_uids)
+
+    def _refresh_where(self, conn, condition, params):
+        rows = conn.execute(
+            "SELECT c.candidate_uid, coalesce(f.text, ''), c.academic, c.experience, c.skills FROM resume_candidates c "
+            "LEFT JOIN resume_urls u ON u.url = c.resume_url "
+            f"LEFT JOIN resume_files f ON f.sha256 = u.sha256 AND f.status = '{STATUS_DONE}' "
+            f"WHERE c.deleted = 0 AND {condition}", params).fetchall()
+        if not rows:
+            return
+        seq = self._next_seq(conn)
+        updates = []
+        for candidate_uid, *columns in rows:
+            impacts = term_impacts(columns)
+            term_ids = self._ids_for(conn, list(impacts))
+            vector = array("i", term_ids).tobytes() + array("f", impacts.values()).tobytes()
+            updates.append((vector, seq, candidate_uid))
+            self._changes.append((candidate_uid, seq, vector))
+        conn.executemany("UPDATE resume_candidates SET vector = ?, seq = ? WHERE candidate_uid = ?", updates)
+
+    def clear(self):
+        """Forgets every file, URL and candidate. Term ids are kept: other processes may still hold them."""
+        with self._write() as conn:
+            self._remove(conn, [uid for (uid,) in conn.execute("SELECT candidate_uid FROM resume_candidates WHERE deleted = 0")])
+            conn.execute("UPDATE resume_candidates SET resume_url = NULL, academic = '', experience = '', skills = ''")
+            conn.execute("DELETE FROM resume_urls")
+            conn.execute("DELETE FROM resume_files")
+
+    # --- TermIndex storage ---
+    def load_vectors(self):
+        """The TermIndex snapshot: every term and every candidate's (uid, seq, vector), removed ones with None."""
+        conn = self._connect()
+        rows = conn.execute("SELECT candidate_uid, seq, vector FROM resume_candidates").fetchall()
+        # Read after the rows: terms are only ever added, so every id the rows use is in here.
+        terms = conn.execute("SELECT term_id, term FROM resume_terms").fetchall()
+        return terms, rows
+
+    def changes_since(self, seq):
+        return self._connect().execute(
+            "SELECT candidate_uid, seq, vector FROM resume_candidates WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+
+    def terms_after(self, term_id):
+        return self._connect().execute("SELECT term_id, term FROM resume_terms WHERE term_id > ?", (term_id,)).fetchall()
+
+    # --- SEARCH ---
+    def search(self, text, limit=20, offset=0):
+        """Candidates matching every word of `text`, best BM25 score first.
+
+        Returns (items, total); items carry candidate_uid, a score (higher is
+        better) and a snippet of the column that matches the most query
+        words, as text segments.
+        """
+        words = query_words(text)
+        if not words:
+            return [], 0
+        start = time.perf_counter()
+        ranked, total = self.terms.search(words, limit, offset)
+        columns = {}
+        if ranked:
+            marks = ",".join("?" * len(ranked))
+            for candidate_uid, *texts in self._connect().execute(
+                    "SELECT c.candidate_uid, c.skills, c.experience, c.academic, coalesce(f.text, '') FROM resume_candidates c "
+                    "LEFT JOIN resume_urls u ON u.url = c.resume_url "
+                    f"LEFT JOIN resume_files f ON f.sha256 = u.sha256 AND f.status = '{STATUS_DONE}' "
+                    f"WHERE c.candidate_uid IN ({marks})", [uid for uid, _ in ranked]):
+                columns[candidate_uid] = texts
+        pattern = _snippet_pattern(words)
+        wanted = len(set(words))
+        items = [{"candidate_uid": uid, "score": round(score, 4), "snippet": _best_snippet(columns.get(uid, ()), pattern, wanted)}
+                 for uid, score in ranked]
+        with self._stats_lock:
+            self.searches += 1
+            self.search_ms += (time.perf_counter() - start) * 1000
+        return items, total
+
+    def optimize(self):
+        """Rebuilds the in-memory index without replaced documents and checkpoints the WAL; run after a bulk reindex."""
+        if self.terms.loaded_at is not None:
+            self.terms.rebuild()
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def stats(self):
+        conn = self._connect()
+        files = dict(conn.execute("SELECT status, count(*) FROM resume_files GROUP BY status").fetchall())
+        return {
+            "path": self.path,
+            "candidates": conn.execute("SELECT count(*) FROM resume_candidates WHERE deleted = 0").fetchone()[0],
+            "files": files,
+            "urls": conn.execute("SELECT count(*) FROM resume_urls").fetchone()[0],
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "memory_index": self.terms.stats(),
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_ms / self.searches, 2) if self.searches else 0,
+        }
@@ -0,0 +1,358 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from resume_index import STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_UNSUPPORTED
+from resume_text import EXTRACTABLE_KINDS, RESUME_KINDS, ExtractionError, extract_file, matches_kind, resume_kind
+
+READ_BLOCK = 64 * 1024
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadError(Exception):
+    """Raised for an upload request that cannot be served; `status` is the HTTP code to answer with."""
+
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class UploadSession:
+    __slots__ = ("id", "filename", "kind", "size", "sha256", "path", "received", "hasher", "updated", "lock")
+
+    def __init__(self, upload_id, filename, kind, size, sha256, path):
+        self.id = upload_id
+        self.filename = filename
+        self.kind = kind
+        self.size = size
+        self.sha256 = sha256
+        self.path = path
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class ResumeUploads:
+    """Resumable, chunked uploads spooled to local disk and hashed as they arrive.
+
+    A client declares the file (name, size and optionally its SHA-256), then
+    PUTs it in order in chunks of at most `chunk_size` bytes. Chunks are
+    streamed from the request to disk in small blocks, so a large resume
+    never sits in memory. A chunk at the wrong offset is refused with the
+    offset the server has, which is where the client resumes after a dropped
+    connection. Sessions idle for `ttl` seconds are discarded.
+    """
+
+    def __init__(self, directory, chunk_size=512 * 1024, max_bytes=10 * 1024 * 1024, max_sessions=100, ttl=3600):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for session in [s for s in self._sessions.values() if s.updated < cutoff]:
+            self._discard(session)
+
+    def _discard(self, session):
+        self._sessions.pop(session.id, None)
+        try:
+            os.remove(session.path)
+        except FileNotFoundError:
+            pass
+
+    def start(self, filename, size, sha256=None):
+        """Opens an upload session. Raises UploadError for unsupported, oversized or too many uploads."""
+        kind = resume_kind(filename)
+        if kind is None:
+            raise UploadError(415, f"Unsupported resume format. Accepted: {', '.join('.' + k for k in RESUME_KINDS)}.")
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise UploadError(400, "'size' must be the file size in bytes.")
+        if size > self.max_bytes:
+            raise UploadError(413, f"Resume is larger than the {self.max_bytes // (1024 * 1024)} MB limit.")
+        if sha256 is not None and not _SHA256.match(str(sha256)):
+            raise UploadError(400, "'sha256' must be a lowercase hex SHA-256 digest.")
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise UploadError(503, "Too many uploads in progress; try again shortly.")
+            upload_id = uuid.uuid4().hex
+            session = UploadSession(upload_id, filename, kind, size, sha256, os.path.join(self.directory, f"{upload_id}.part"))
+            open(session.path, "wb").close()
+            self._sessions[upload_id] = session
+        return session
+
+    def _get(self, upload_id):
+        with self._lock:
+            session = self._sessions.get(upload_id)
+        if session is None:
+            raise UploadError(404, "Unknown or expired upload.")
+        return session
+
+    def write_chunk(self, upload_id, offset, stream, length):
+        """Appends one chunk read from `stream` (`length` bytes). Returns the bytes received so far."""
+        session = self._get(upload_id)
+        if length is None or length <= 0:
+            raise UploadError(411, "Each chunk needs a Content-Length.")
+        if length > self.chunk_size:
+            raise UploadError(413, f"Chunks may be at most {self.chunk_size} bytes.")
+        # Non-blocking: a second writer on the same upload means the client lost track of its offset.
+        if not session.lock.acquire(blocking=False):
+            raise UploadError(409, "Another chunk of this upload is being written.", received=session.received)
+        try:
+            if offset != session.received:
+                raise UploadError(409, "Chunk offset does not match the bytes received.", received=session.received)
+            if offset + length > session.size:
+                raise UploadError(413, "Chunk runs past the declared file size.", received=session.received)
+            hasher = session.hasher.copy()
+            written = 0
+            with open(session.path, "r+b") as handle:
+                handle.seek(offset)
+                while written < length:
+                    block = stream.read(min(READ_BLOCK, length - written))
+                    if not block:
+                        break
+                    handle.write(block)
+                    hasher.update(block)
+                    written += len(block)
+                if written != length:
+                    # The connection dropped mid-chunk: keep only what was confirmed before it.
+                    handle.truncate(offset)
+                    raise UploadError(400, "Chunk ended early; resend it.", received=session.received)
+            session.hasher = hasher
+            session.received += written
+            session.updated = time.monotonic()
+            return session.received
+        finally:
+            session.lock.release()
+
+    def finish(self, upload_id):
+        """Closes a fully received upload after checking its size, hash and format. Returns the session.
+
+        The session's file is left in place for the caller, which must delete it.
+        """
+        session = self._get(upload_id)
+        with session.lock:
+            if session.received != session.size:
+                raise UploadError(409, "Upload is incomplete.", received=session.received)
+            digest = session.hasher.hexdigest()
+            with open(session.path, "rb") as handle:
+                head = handle.read(8)
+            with self._lock:
+                self._sessions.pop(upload_id, None)
+        if session.sha256 and session.sha256 != digest:
+            os.remove(session.path)
+            raise UploadError(422, "Uploaded bytes do not match the declared SHA-256; upload the file again.")
+        if not matches_kind(head, session.kind):
+            os.remove(session.path)
+            raise UploadError(415, f"File content is not a valid .{session.kind} file.")
+        session.sha256 = digest
+        return session
+
+    def cancel(self, upload_id):
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is not None:
+                self._discard(session)
+        return session is not None
+
+    def stats(self):
+        with self._lock:
+            return {"active": len(self._sessions), "bytes_buffered": sum(s.received for s in self._sessions.values()),
+                    "chunk_size": self.chunk_size, "max_bytes": self.max_bytes}
+
+
+class ResumeIngestor:
+    """Stores uploaded resumes once per content hash and extracts their text in the background.
+
+    Files are written to the storage bucket under their SHA-256, so a resume
+    uploaded twice is stored, extracted and indexed once and both candidates
+    point at the same URL. Extraction (pure CPU: PDF/DOCX parsing) runs on a
+    process pool of `workers` processes; 0 extracts inline.
+    """
+
+    def __init__(self, client, index, uploads, bucket="resumes", workers=2):
+        self.client = client
+        self.index = index
+        self.uploads = uploads
+        self.bucket = bucket
+        self.workers = workers
+        self.extracted = 0
+        self.failed = 0
+        self._pending = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    # --- EXTRACTION POOL ---
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _extract(self, sha256, kind, path):
+        """Queues extraction of a spooled file, which is deleted afterwards; the index is updated when it finishes."""
+        if kind not in EXTRACTABLE_KINDS:
+            self.index.set_file_result(sha256, STATUS_UNSUPPORTED, error=f"No text extraction for .{kind} files.")
+            os.remove(path)
+            return
+
+        def finished(future):
+            try:
+                self.index.set_file_result(sha256, STATUS_DONE, text=future.result())
+                with self._lock:
+                    self.extracted += 1
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_pool()
+                error = "Extraction worker crashed." if isinstance(e, BrokenProcessPool) else str(e)
+                self.index.set_file_result(sha256, STATUS_FAILED, error=error)
+                with self._lock:
+                    self.failed += 1
+            finally:
+                with self._lock:
+                    self._pending.pop(sha256, None)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(extract_file(path, kind))
+            except (ExtractionError, OSError, ValueError) as e:
+                future.set_exception(e)
+            finished(future)
+            return
+        try:
+            future = self._get_pool().submit(extract_file, path, kind)
+        except BrokenProcessPool:
+            self._reset_pool()
+            future = self._get_pool().submit(extract_file, path, kind)
+        with self._lock:
+            self._pending[sha256] = future
+        future.add_done_callback(finished)
+
+    def _needs_extraction(self, sha256):
+        """True for a known file whose extraction failed or never finished (e.g. the server restarted mid-way)."""
+        with self._lock:
+            if sha256 in self._pending:
+                return False
+        known = self.index.file(sha256)
+        return known is not None and known["status"] in (STATUS_QUEUED, STATUS_FAILED)
+
+    def wait(self, timeout=None):
+        """Blocks until every queued extraction has finished (used by the reindex command). False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                pending[0].exception(timeout=remaining)
+            except Exception:
+                pass
+            # The done callback removes the entry just after the future resolves.
+            time.sleep(0.001)
+
+    # --- INGESTION ---
+    def object_name(self, sha256, kind):
+        return f"{sha256}.{kind}"
+
+    def complete_upload(self, upload_id):
+        """Finishes an upload: dedupes by hash, stores new content and queues extraction.
+
+        Returns {sha256, resume_url, status, duplicate}. Raises UploadError.
+        """
+        session = self.uploads.finish(upload_id)
+        known = self.index.file(session.sha256)
+        if known is not None:
+            os.remove(session.path)
+            return {"sha256": session.sha256, "resume_url": known["resume_url"], "status": known["status"], "duplicate": True}
+
+        name = self.object_name(session.sha256, session.kind)
+        try:
+            with open(session.path, "rb") as handle:
+                response = self.client.upload_object(self.bucket, name, handle, RESUME_KINDS[session.kind][0])
+            if response.status_code not in (200, 201):
+                raise UploadError(502, f"Could not store the resume: {response.text}")
+        except BaseException:
+            os.remove(session.path)
+            raise
+
+        url = self.client.public_object_url(self.bucket, name)
+        if self.index.add_file(session.sha256, session.kind, session.size, session.filename, url):
+            self._extract(session.sha256, session.kind, session.path)
+        else:
+            # Another request finished the same content first and owns its extraction.
+            os.remove(session.path)
+        return {"sha256": session.sha256, "resume_url": url, "status": self.index.file(session.sha256)["status"], "duplicate": False}
+
+    def ingest_url(self, url):
+        """Indexes a resume already in storage, e.g. uploaded before ingestion existed. Returns its hash, or None.
+
+        URLs whose extraction already succeeded are skipped. Only this
+        project's storage URLs are fetched, so the service key is never sent elsewhere.
+        """
+        sha256 = self.index.sha_for_url(url)
+        if sha256 is not None and not self._needs_extraction(sha256):
+            return sha256
+        kind = resume_kind(url.split("?", 1)[0])
+        if kind is None or not url.startswith(self.client.base_url + "/"):
+            return sha256
+
+        response = self.client.request("GET", url, prefer=None, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise UploadError(502, f"Could not download {url}: HTTP {response.status_code}")
+        hasher = hashlib.sha256()
+        os.makedirs(self.uploads.directory, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=self.uploads.directory, suffix=".part", delete=False)
+        size = 0
+        try:
+            with handle, response:
+                for block in response.iter_content(READ_BLOCK):
+                    size += len(block)
+                    if size > self.uploads.max_bytes:
+                        raise UploadError(413, f"{url} is larger than the upload limit.")
+                    hasher.update(block)
+                    handle.write(block)
+        except BaseException:
+            os.remove(handle.name)
+            raise
+
+        sha256 = hasher.hexdigest()
+        if self.index.add_file(sha256, kind, size, url.rsplit("/", 1)[-1], url) or self._needs_extraction(sha256):
+            self._extract(sha256, kind, handle.name)
+        else:
+            os.remove(handle.name)
+        return sha256
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "pending": len(self._pending), "extracted": self.extracted,
+                    "failed": self.failed, "uploads": self.uploads.stats()}
@@ -0,0 +1,206 @@
+import base64
+import binascii
+import io
+import re
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+# Resume formats accepted for upload, by extension: (content type, leading magic bytes). Legacy .doc files are
+# stored but not extracted, so those candidates are searchable by their profile fields only.
+RESUME_KINDS = {
+    "pdf": ("application/pdf", b"%PDF-"),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", b"PK\x03\x04"),
+    "doc": ("application/msword", b"\xd0\xcf\x11\xe0"),
+}
+EXTRACTABLE_KINDS = {"pdf", "docx"}
+
+# Extracted text beyond this many characters is not indexed.
+MAX_TEXT_CHARS = 200_000
+# A DOCX whose document part inflates past this is rejected rather than parsed (zip bombs).
+MAX_DOCX_XML_BYTES = 50 * 1024 * 1024
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PDF_FILTER = re.compile(rb"/Filter\s*(\[[^\]]*\]|/[A-Za-z0-9]+)")
+_PDF_STREAM = re.compile(rb"(?<![A-Za-z])stream\r?\n")
+# Content stream tokens: literal strings (unbalanced inner parentheses must be escaped), hex strings, arrays,
+# names, numbers, operators and comments.
+_PDF_TOKEN = re.compile(rb"\((?:[^()\\]|\\.)*\)|<[0-9A-Fa-f\s]*>|[\[\]]|/[^\s/\[\]()<>{}%]*|[-+]?(?:\d+\.?\d*|\.\d+)"
+                        rb"|[A-Za-z'\"*]+|%[^\r\n]*", re.S)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+                b"(": b"(", b")": b")", b"\\": b"\\", b"\n": b"", b"\r": b""}
+_PDF_ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.S)
+
+
+class ExtractionError(Exception):
+    """Raised when a file cannot be read as the format it claims to be."""
+
+
+def resume_kind(filename):
+    """The RESUME_KINDS key for a file name's extension, or None if the format is not accepted."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower() if "." in (filename or "") else ""
+    return extension if extension in RESUME_KINDS else None
+
+
+def matches_kind(head, kind):
+    """True if a file's first bytes look like `kind`."""
+    return head.startswith(RESUME_KINDS[kind][1])
+
+
+def clean_text(text):
+    """Collapses runs of spaces and blank lines and truncates to MAX_TEXT_CHARS."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:MAX_TEXT_CHARS]
+
+
+# --- DOCX ---
+def docx_text(data):
+    """The body text of a .docx file, one line per paragraph."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            info = archive.getinfo("word/document.xml")
+            if info.file_size > MAX_DOCX_XML_BYTES:
+                raise ExtractionError("The document is too large to index.")
+            root = ElementTree.fromstring(archive.read(info))
+    except (KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        raise ExtractionError(f"Not a readable .docx file: {e}")
+
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD_NS}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{_WORD_NS}tab":
+                parts.append(" ")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+# --- PDF ---
+def _decode_stream(header, raw):
+    """Applies a stream's filters; returns None for filters that do not lead to text (images, unknown codecs)."""
+    match = _PDF_FILTER.search(header)
+    filters = re.findall(rb"/([A-Za-z0-9]+)", match.group(1)) if match else []
+    data = raw
+    for name in filters:
+        if name in (b"FlateDecode", b"Fl"):
+            try:
+                data = zlib.decompressobj().decompress(data)
+            except zlib.error:
+                return None
+        elif name in (b"ASCII85Decode", b"A85"):
+            body = re.sub(rb"\s", b"", data)
+            body = body[2:] if body.startswith(b"<~") else body
+            try:
+                data = base64.a85decode(body.split(b"~>", 1)[0])
+            except ValueError:
+                return None
+        elif name in (b"ASCIIHexDecode", b"AHx"):
+            body = re.sub(rb"\s", b"", data).split(b">", 1)[0]
+            try:
+                data = binascii.unhexlify(body + b"0" * (len(body) % 2))
+            except binascii.Error:
+                return None
+        else:
+            return None
+    return data
+
+
+def _pdf_string(token):
+    if token.startswith(b"<"):
+        hex_digits = re.sub(rb"\s", b"", token[1:-1])
+        raw = binascii.unhexlify(hex_digits + b"0" * (len(hex_digits) % 2))
+    else:
+        raw = _PDF_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8) & 0xFF]) if m.group(1)[:1].isdigit()
+                              else _PDF_ESCAPES.get(m.group(1), m.group(1)), token[1:-1])
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "replace")
+    # Simple fonts are almost always WinAnsi-encoded, i.e. cp1252.
+    return raw.decode("cp1252", "replace")
+
+
+def _content_text(content):
+    """Text shown by one page content stream's Tj/TJ/'/" operators, with line breaks at text moves."""
+    out = []
+    operands = []
+    array = None
+    for match in _PDF_TOKEN.finditer(content):
+        token = match.group()
+        first = token[:1]
+        if first == b"%":
+            continue
+        if first == b"[":
+            array = []
+        elif first == b"]":
+            operands.append(array or [])
+            array = None
+        elif first in (b"(", b"<") or first == b"/" or first.isdigit() or first in b"+-.":
+            (array if array is not None else operands).append(token)
+        else:
+            if token in (b"Tj", b"'", b'"'):
+                if token != b"Tj":
+                    out.append("\n")
+                if operands and isinstance(operands[-1], bytes) and operands[-1][:1] in (b"(", b"<"):
+                    out.append(_pdf_string(operands[-1]))
+            elif token == b"TJ" and operands and isinstance(operands[-1], list):
+                for item in operands[-1]:
+                    if item[:1] in (b"(", b"<"):
+                        out.append(_pdf_string(item))
+                    elif float(item) < -200:
+                        # A large negative kern is how many generators lay out a word space.
+                        out.append(" ")
+            elif token in (b"Td", b"TD"):
+                out.append("\n" if len(operands) >= 2 and operands[-1] not in (b"0", b"0.0") else " ")
+            elif token in (b"T*", b"Tm", b"ET"):
+                out.append("\n")
+            operands = []
+    return "".join(out)
+
+
+def _builtin_pdf_text(data):
+    """Text of an unencrypted PDF whose fonts use simple (single-byte or UTF-16) encodings.
+
+    Covers what office suites and report generators typically produce. Fonts
+    with custom CMaps come out garbled or empty; install pypdf for those.
+    """
+    pages = []
+    for match in _PDF_STREAM.finditer(data):
+        start = data.rfind(b"obj", 0, match.start())
+        header = data[start:match.start()]
+        # Fonts, images, object streams and xref streams all carry /Type, /Subtype or /Length1; page content does not.
+        if b"/Type" in header or b"/Subtype" in header or b"/Length1" in header:
+            continue
+        end = data.find(b"endstream", match.end())
+        if end < 0:
+            break
+        content = _decode_stream(header, data[match.end():end])
+        if content and (b"Tj" in content or b"TJ" in content):
+            pages.append(_content_text(content))
+    return "\n".join(pages)
+
+
+def pdf_text(data):
+    """The text of a PDF, with pypdf when it is installed and the built-in reader otherwise."""
+    if not data.startswith(b"%PDF-"):
+        raise ExtractionError("Not a PDF file.")
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return _builtin_pdf_text(data)
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    except Exception as e:
+        raise ExtractionError(f"Not a readable PDF file: {e}")
+
+
+def extract_file(path, kind):
+    """Reads a stored resume and returns its cleaned text. Runs in the extraction worker processes."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if kind == "pdf":
+        return clean_text(pdf_text(data))
+    if kind == "docx":
+        return clean_text(docx_text(data))
+    raise ExtractionError(f"Text extraction is not supported for .{kind} files.")
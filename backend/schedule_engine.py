@@ -0,0 +1,248 @@
+import bisect
+import math
+from datetime import date as Date, timedelta
+
+from live_index import LiveIndex
+
+# Schedules in these states hold their slot; cancelled ones free it.
+BLOCKING_STATUSES = ("Pending Approval", "Scheduled", "Completed")
+SLOT_FIELDS = ("candidate_id", "evaluator_uids", "location", "mode", "date", "start_time", "end_time", "status")
+ONLINE_MODE = "Online"
+
+
+def parse_minutes(date, clock):
+    """Minutes since 0001-01-01 for a schedule date ('YYYY-MM-DD') and time ('HH:MM[:SS][+TZ]')."""
+    try:
+        day = Date.fromisoformat(str(date)[:10])
+        hours, minutes = str(clock).split("+")[0].split(":")[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date/time: {date} {clock}")
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time: {clock}")
+    return day.toordinal() * 1440 + hours * 60 + minutes
+
+
+def format_minutes(minutes):
+    """(date, 'HH:MM') for a minute value from parse_minutes()."""
+    day, minute = divmod(minutes, 1440)
+    return Date.fromordinal(day).isoformat(), f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def slot_resources(schedule):
+    """What a schedule occupies: each evaluator, the candidate and, for in-person rounds, the location."""
+    resources = [("evaluator", uid) for uid in schedule.get("evaluator_uids") or []]
+    if schedule.get("candidate_id"):
+        resources.append(("candidate", schedule["candidate_id"]))
+    location = " ".join(str(schedule.get("location") or "").lower().split())
+    if location and schedule.get("mode") != ONLINE_MODE:
+        resources.append(("location", location))
+    return resources
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals per resource, sorted by start.
+
+    Anything overlapping [start, end) must start after `start - longest`, where
+    `longest` is the resource's longest interval, so an overlap query is two
+    bisects plus the few intervals in between: O(log n) for calendars whose
+    bookings do not pile up on each other.
+    """
+
+    def __init__(self):
+        self._intervals = {}
+        self._longest = {}
+
+    def add(self, resource, start, end, key):
+        bisect.insort(self._intervals.setdefault(resource, []), (start, end, key))
+        self._longest[resource] = max(self._longest.get(resource, 0), end - start)
+
+    def remove(self, resource, start, end, key):
+        intervals = self._intervals.get(resource)
+        if not intervals:
+            return
+        index = bisect.bisect_left(intervals, (start, end, key))
+        if index < len(intervals) and intervals[index] == (start, end, key):
+            del intervals[index]
+            if not intervals:
+                del self._intervals[resource]
+                del self._longest[resource]
+
+    def overlapping(self, resource, start, end):
+        """(start, end, key) of every interval of `resource` overlapping [start, end)."""
+        intervals = self._intervals.get(resource)
+        if not intervals:
+            return []
+        low = bisect.bisect_right(intervals, (start - self._longest[resource], math.inf))
+        high = bisect.bisect_left(intervals, (end,))
+        return [interval for interval in intervals[low:high] if interval[1] > start]
+
+    def __len__(self):
+        return sum(len(intervals) for intervals in self._intervals.values())
+
+
+class ScheduleBook(LiveIndex):
+    """Every blocking schedule indexed by evaluator, candidate and location for conflict checks and auto-slotting.
+
+    The snapshot is the list of schedule rows; schedule routes keep it current
+    through apply_schedule(). Conflicts are looked up per resource in the
+    IntervalIndex, so a check costs O(resources x log n).
+    """
+
+    name = "schedule-book"
+
+    def __init__(self, loader, refresh_interval=300):
+        super().__init__(loader, refresh_interval)
+        self._index = IntervalIndex()
+        self._bookings = {}
+
+    def _load(self, schedules):
+        self._index, self._bookings = IntervalIndex(), {}
+        for schedule in schedules:
+            self._set(schedule)
+
+    # --- UPDATES (caller holds the lock) ---
+    def _set(self, schedule):
+        schedule_id = str(schedule.get("id"))
+        previous = self._bookings.get(schedule_id)
+        self._drop(schedule_id)
+        # Published updates carry the full row, but keep earlier fields for partial ones.
+        slot = {**(previous or {}), **{field: schedule[field] for field in SLOT_FIELDS if field in schedule}}
+        if slot.get("status") not in BLOCKING_STATUSES:
+            return
+        try:
+            start, end = parse_minutes(slot["date"], slot["start_time"]), parse_minutes(slot["date"], slot["end_time"])
+        except (KeyError, ValueError):
+            return
+        if end <= start:
+            return
+        slot.update(id=schedule_id, start=start, end=end, resources=slot_resources(slot))
+        self._bookings[schedule_id] = slot
+        for resource in slot["resources"]:
+            self._index.add(resource, start, end, schedule_id)
+
+    def _drop(self, schedule_id):
+        slot = self._bookings.pop(schedule_id, None)
+        if slot is not None:
+            for resource in slot["resources"]:
+                self._index.remove(resource, slot["start"], slot["end"], schedule_id)
+
+    def apply_schedule(self, op, schedule):
+        """Applies a schedule insert, update or delete (as published on the schedule change feed)."""
+        def apply():
+            if op == "delete":
+                self._drop(str(schedule.get("id")))
+            else:
+                self._set(schedule)
+        self._update(apply)
+
+    def booking(self, schedule_id):
+        """The slot fields of a blocking schedule, or None."""
+        with self._lock:
+            slot = self._bookings.get(str(schedule_id))
+            return {field: slot.get(field) for field in SLOT_FIELDS} if slot else None
+
+    # --- CONFLICTS ---
+    def conflicts(self, proposal, ignore_id=None):
+        """Blocking schedules that share an evaluator, the candidate or the location with `proposal` and overlap it.
+
+        Raises ValueError if the proposal's date or times are invalid.
+        """
+        start = parse_minutes(proposal.get("date"), proposal.get("start_time"))
+        end = parse_minutes(proposal.get("date"), proposal.get("end_time"))
+        if end <= start:
+            raise ValueError("end_time must be after start_time.")
+        ignore_id = None if ignore_id is None else str(ignore_id)
+        found = []
+        with self._lock:
+            for kind, value in slot_resources(proposal):
+                for other_start, other_end, schedule_id in self._index.overlapping((kind, value), start, end):
+                    if schedule_id == ignore_id:
+                        continue
+                    other = self._bookings[schedule_id]
+                    found.append({
+                        "resource": kind, "value": value, "schedule_id": schedule_id, "status": other.get("status"),
+                        "date": other.get("date"), "start_time": other.get("start_time"), "end_time": other.get("end_time"),
+                    })
+        return found
+
+    # --- AUTO-SLOTTING ---
+    def _next_free(self, resources, earliest, duration, windows, buffer, plan):
+        """Earliest start >= `earliest` inside a window where every resource is free (booked or planned)."""
+        start = earliest
+        window = max(0, bisect.bisect_right(windows, (start, math.inf)) - 1)
+        while window < len(windows):
+            window_start, window_end = windows[window]
+            start = max(start, window_start)
+            if start + duration > window_end:
+                window += 1
+                continue
+            blocked_until = None
+            for resource in resources:
+                for index in (self._index, plan):
+                    for _, other_end, _ in index.overlapping(resource, start - buffer, start + duration + buffer):
+                        blocked_until = max(blocked_until or other_end, other_end)
+            if blocked_until is None:
+                return start
+            start = blocked_until + buffer
+        return None
+
+    def auto_slot(self, candidate_ids, panels, dates, day_start, day_end, duration, buffer=0, mode=ONLINE_MODE):
+        """Packs one interview per candidate into the panels' free time, earliest slot first.
+
+        `panels` is a list of {"evaluator_uids": [...], "location": ...}. Each
+        candidate, in order, gets the panel that can see them soonest;
+        existing bookings of the evaluators, the candidate and the panel's
+        room are respected, with `buffer` minutes between interviews.
+        Returns (assignments, unplaced candidate IDs).
+        """
+        windows = sorted((parse_minutes(day, day_start), parse_minutes(day, day_end)) for day in dates)
+        plan = IntervalIndex()
+        assignments, unplaced = [], []
+        # Bookings only ever get added here, so a panel's own earliest free slot never moves back: each
+        # search resumes from it, and a panel with no free slot left is skipped for the remaining candidates.
+        resume_at = [windows[0][0] if windows else None] * len(panels)
+        with self._lock:
+            for candidate_id in candidate_ids:
+                best = None
+                for number, panel in enumerate(panels):
+                    if resume_at[number] is None:
+                        continue
+                    panel_resources = slot_resources({"mode": mode, **panel})
+                    resume_at[number] = self._next_free(panel_resources, resume_at[number], duration, windows, buffer, plan)
+                    if resume_at[number] is None:
+                        continue
+                    resources = slot_resources({"candidate_id": candidate_id, "mode": mode, **panel})
+                    start = self._next_free(resources, resume_at[number], duration, windows, buffer, plan)
+                    if start is not None and (best is None or start < best[0]):
+                        best = (start, number, resources)
+                if best is None:
+                    unplaced.append(candidate_id)
+                    continue
+                start, number, resources = best
+                for resource in resources:
+                    plan.add(resource, start, start + duration, candidate_id)
+                resume_at[number] = start + duration
+                day, start_time = format_minutes(start)
+                _, end_time = format_minutes(start + duration)
+                assignments.append({
+                    "candidate_id": candidate_id, "evaluator_uids": list(panels[number]["evaluator_uids"]),
+                    "location": panels[number].get("location"), "mode": mode,
+                    "date": day, "start_time": start_time, "end_time": end_time, "duration_minutes": duration,
+                })
+        return assignments, unplaced
+
+    def stats(self):
+        with self._lock:
+            return {**super().stats(), "bookings": len(self._bookings), "intervals": len(self._index)}
+
+
+def date_range(date_from, date_to, weekdays=None):
+    """ISO dates from `date_from` to `date_to` inclusive, optionally only ISO weekdays in `weekdays` (1=Mon)."""
+    first, last = Date.fromisoformat(date_from), Date.fromisoformat(date_to)
+    if last < first:
+        raise ValueError("date_to must not be before date_from.")
+    if (last - first).days > 366:
+        raise ValueError("The date range is limited to one year.")
+    days = (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+    return [day.isoformat() for day in days if weekdays is None or day.isoweekday() in weekdays]
@@ -0,0 +1,245 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from evaluation_model import Evaluation
+from json_codec import decode_field
+
+SUMMARY_TABLE = "candidate_score_summaries"
+SUMMARY_COLUMNS = "candidate_uid,evaluation_count,summary,updated_at"
+SUMMARY_ID_CHUNK_SIZE = 150
+# What a summary is built from: every completed evaluation of the candidate.
+SUMMARY_EVALUATION_COLUMNS = "id,candidate_uid,round_type,total_score,total_max_score,quantitative_scores,qualitative_comments"
+
+
+def new_summary():
+    """An empty per-candidate summary. Every field is plain JSON so it can be stored as jsonb."""
+    return {
+        "evaluation_count": 0,
+        "total_score": 0,
+        "total_max_score": 0,
+        "rounds": {},
+        "sections": {},
+        # jsonb does not keep key order, so first-seen order is stored explicitly.
+        "round_order": [],
+        "section_order": [],
+        # Section -> comments in submission order (the first comment per section from each evaluation)
+        "comments": {},
+    }
+
+
+def apply_evaluation(summary, evaluation):
+    """Adds one completed evaluation (an Evaluation or an `evaluations` row) to `summary` in place.
+
+    Summaries keep no per-evaluation IDs, so callers must apply each
+    evaluation once; SummaryStore.apply does so under a compare-and-set on
+    `evaluation_count`.
+    """
+    if not isinstance(evaluation, Evaluation):
+        evaluation = Evaluation.from_row(evaluation)
+
+    score = evaluation.total_score
+    max_score = evaluation.total_max_score
+    round_totals = summary["rounds"].get(evaluation.round_type)
+    if round_totals is None:
+        round_totals = summary["rounds"][evaluation.round_type] = {"score": 0, "max": 0}
+        summary["round_order"].append(evaluation.round_type)
+    round_totals["score"] += score
+    round_totals["max"] += max_score
+    summary["total_score"] += score
+    summary["total_max_score"] += max_score
+    summary["evaluation_count"] += 1
+
+    for module, scores in evaluation.sections.items():
+        section = summary["sections"].get(module)
+        if section is None:
+            section = summary["sections"][module] = {"score": 0, "max": 0}
+            summary["section_order"].append(module)
+        section["score"] += scores.score
+        section["max"] += scores.max
+        comment = evaluation.comment_for(module)
+        if comment is not None:
+            summary["comments"].setdefault(module, []).append(comment)
+
+
+def build_summary(evaluations):
+    """Full recomputation from raw evaluation rows."""
+    summary = new_summary()
+    for evaluation in evaluations:
+        apply_evaluation(summary, evaluation)
+    return summary
+
+
+def compare_summaries(stored, expected):
+    """Lists the differences between a stored summary and a fresh recomputation (empty when consistent).
+
+    Comment order depends on the order evaluations were applied, so comment
+    lists are compared as multisets.
+    """
+    stored = stored or new_summary()
+    problems = []
+    for field in ("evaluation_count", "total_score", "total_max_score", "rounds", "sections"):
+        if stored.get(field) != expected[field]:
+            problems.append(f"{field}: stored {stored.get(field)!r}, expected {expected[field]!r}")
+    stored_comments = {section: Counter(comments) for section, comments in (stored.get("comments") or {}).items()}
+    expected_comments = {section: Counter(comments) for section, comments in expected["comments"].items()}
+    if stored_comments != expected_comments:
+        problems.append("comments: comment index does not match the evaluations")
+    return problems
+
+
+def build_evaluation_row(data):
+    """Validates a submitted evaluation and returns the `evaluations` row to insert.
+
+    Scores and comments are validated by Evaluation.from_submission(), which
+    also recomputes the totals. Raises ValueError describing the first
+    problem found.
+    """
+    for field in ("schedule_id", "evaluator_uid"):
+        if not data.get(field):
+            raise ValueError(f"'{field}' is required.")
+    evaluation = Evaluation.from_submission(data)
+
+    return {
+        "schedule_id": data["schedule_id"],
+        "evaluator_uid": data["evaluator_uid"],
+        "candidate_uid": evaluation.candidate_uid,
+        "round_type": evaluation.round_type,
+        "submission_time": datetime.now(timezone.utc).isoformat(),
+        "time_remaining_seconds": data.get("time_remaining_seconds"),
+        "quantitative_scores": evaluation.sections_json(),
+        "qualitative_comments": evaluation.comments_json(),
+        "total_score": evaluation.total_score,
+        "total_max_score": evaluation.total_max_score,
+        "is_complete": bool(data.get("is_complete", True)),
+    }
+
+
+class SummaryConflict(Exception):
+    """Raised when a summary kept changing underneath us for every retry."""
+
+
+class SummaryStore:
+    """Reads and writes per-candidate summaries in the `candidate_score_summaries` table.
+
+    Updates are compare-and-set on `evaluation_count`: the row is only patched
+    if nobody else applied an evaluation since it was read, otherwise the
+    update is retried against the fresh row. This keeps concurrent
+    submissions (from any number of backend processes) from losing updates.
+    A candidate's first row is built from all of their completed
+    evaluations, not just the one being applied, so candidates evaluated
+    before summaries existed start out complete. Rows built that way may
+    already count the evaluation being applied, so whenever another writer
+    created the row first it is rebuilt from the history as well rather
+    than incremented.
+    """
+
+    def __init__(self, client, table=SUMMARY_TABLE, max_attempts=5):
+        self.client = client
+        self.table = table
+        self.max_attempts = max_attempts
+
+    def load(self, candidate_id):
+        """Returns (summary, evaluation_count) or (None, None) if the candidate has no row."""
+        response = self.client.get(self.table, params={"select": SUMMARY_COLUMNS, "candidate_uid": f"eq.{candidate_id}"})
+        if response.status_code != 200:
+            raise Exception(f"Supabase error reading {self.table}: {response.text}")
+        rows = response.json()
+        if not rows:
+            return None, None
+        return decode_field(rows[0]["summary"], None), rows[0]["evaluation_count"]
+
+    def load_many(self, candidate_ids):
+        """Returns candidate ID -> summary for every candidate that has a row."""
+        summaries = {}
+        for start in range(0, len(candidate_ids), SUMMARY_ID_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + SUMMARY_ID_CHUNK_SIZE]
+            for row in self.client.get_all(self.table, params={
+                "select": SUMMARY_COLUMNS,
+                "candidate_uid": f"in.({','.join(chunk)})",
+                "order": "candidate_uid"
+            }):
+                summary = decode_field(row["summary"], None)
+                if summary is not None:
+                    summaries[row["candidate_uid"]] = summary
+        return summaries
+
+    def load_all(self):
+        """Returns candidate ID -> summary for every stored row."""
+        return {
+            row["candidate_uid"]: decode_field(row["summary"], None)
+            for row in self.client.get_all(self.table, params={"select": SUMMARY_COLUMNS, "order": "candidate_uid"})
+        }
+
+    def completed_evaluations(self, candidate_id):
+        """The candidate's completed evaluations in submission order."""
+        return self.client.get_all("evaluations", params={
+            "select": SUMMARY_EVALUATION_COLUMNS,
+            "candidate_uid": f"eq.{candidate_id}",
+            "is_complete": "eq.true",
+            "order": "submission_time,id"
+        })
+
+    def _row(self, candidate_id, summary):
+        return {
+            "candidate_uid": candidate_id,
+            "evaluation_count": summary["evaluation_count"],
+            "summary": summary,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def apply(self, candidate_id, evaluation):
+        """Adds one evaluation to the candidate's stored summary. Returns the updated summary."""
+        rebuild = False
+        for attempt in range(self.max_attempts):
+            summary, count = self.load(candidate_id)
+            if summary is None:
+                # The evaluation is saved before this is called, so the history already has it.
+                summary = build_summary(self.completed_evaluations(candidate_id))
+                # Plain insert: a 409 means another writer created the row first, so retry as an update.
+                response = self.client.post(self.table, json=self._row(candidate_id, summary), prefer="return=minimal")
+                if response.status_code in (200, 201, 204):
+                    return summary
+                if response.status_code != 409:
+                    raise Exception(f"Supabase error creating summary: {response.text}")
+                rebuild = True
+            else:
+                if rebuild:
+                    summary = build_summary(self.completed_evaluations(candidate_id))
+                else:
+                    # Rows written before summaries stopped keeping evaluation IDs shed them on their next update.
+                    summary.pop("evaluation_ids", None)
+                    apply_evaluation(summary, evaluation)
+                response = self.client.request(
+                    "PATCH", f"{self.client.rest_url}/{self.table}",
+                    params={"candidate_uid": f"eq.{candidate_id}", "evaluation_count": f"eq.{count}"},
+                    json=self._row(candidate_id, summary),
+                )
+                if response.status_code not in (200, 204):
+                    raise Exception(f"Supabase error updating summary: {response.text}")
+                if response.status_code == 204 or response.json():
+                    return summary
+            # Lost the race; back off briefly and re-read.
+            time.sleep(0.02 * (attempt + 1))
+        raise SummaryConflict(f"Summary for {candidate_id} changed on every attempt.")
+
+    def save_many(self, summaries):
+        """Upserts candidate ID -> summary, replacing whatever is stored."""
+        rows = [self._row(candidate_id, summary) for candidate_id, summary in summaries.items()]
+        for start in range(0, len(rows), SUMMARY_ID_CHUNK_SIZE):
+            response = self.client.post(
+                self.table, json=rows[start:start + SUMMARY_ID_CHUNK_SIZE],
+                params={"on_conflict": "candidate_uid"},
+                prefer="resolution=merge-duplicates,return=minimal",
+            )
+            if response.status_code not in (200, 201, 204):
+                raise Exception(f"Supabase error saving summaries: {response.text}")
+        return len(rows)
+
+    def delete_many(self, candidate_ids):
+        for start in range(0, len(candidate_ids), SUMMARY_ID_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + SUMMARY_ID_CHUNK_SIZE]
+            response = self.client.request("DELETE", f"{self.client.rest_url}/{self.table}",
+                                           params={"candidate_uid": f"in.({','.join(chunk)})"}, prefer="return=minimal")
+            if response.status_code not in (200, 204):
+                raise Exception(f"Supabase error deleting summaries: {response.text}")
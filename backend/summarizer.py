@@ -0,0 +1,265 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from report_cache import TTLCache
+
+NO_COMMENTS = "No qualitative data provided for summary generation."
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not now of off on once only or other our out over own
+same she should so some such than that the their them then there these they this those through to too under until
+up very was we were what when where which while who whom why will with would you your candidate candidates
+""".split())
+
+
+def comment_texts(comments):
+    """Normalizes posted comments (strings or {round, comment} objects) to non-empty texts."""
+    texts = []
+    for comment in comments or []:
+        text = comment.get("comment") if isinstance(comment, dict) else comment
+        if isinstance(text, str) and text.strip() and text.strip() != "N/A":
+            texts.append(" ".join(text.split()))
+    return texts
+
+
+def _tokens(sentence):
+    return [word for word in _WORD.findall(sentence.lower()) if len(word) > 2 and word not in STOPWORDS]
+
+
+def _cosine(a, b, norm_a, norm_b):
+    if not norm_a or not norm_b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items()) / (norm_a * norm_b)
+
+
+def extractive_summary(texts, max_sentences=3, redundancy=0.5):
+    """Picks the `max_sentences` most central sentences, in their original order.
+
+    Sentences are TF-IDF weighted and scored by cosine similarity to the
+    centroid of all sentences (linear in the input, unlike a full TextRank
+    graph); a sentence too similar to one already chosen is skipped.
+    """
+    sentences, seen = [], set()
+    for text in texts:
+        for sentence in _SENTENCE_END.split(text):
+            sentence = sentence.strip()
+            if sentence and sentence.lower() not in seen:
+                seen.add(sentence.lower())
+                sentences.append(sentence)
+    if len(sentences) <= max_sentences:
+        return " ".join(_terminated(sentence) for sentence in sentences)
+
+    tokenized = [Counter(_tokens(sentence)) for sentence in sentences]
+    document_frequency = Counter(term for counts in tokenized for term in counts)
+    idf = {term: math.log((1 + len(sentences)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors, norms = [], []
+    centroid = Counter()
+    for counts in tokenized:
+        vector = {term: count * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append(vector)
+        norms.append(norm)
+        for term, weight in vector.items():
+            centroid[term] += weight / norm
+    centroid_norm = math.sqrt(sum(weight * weight for weight in centroid.values()))
+
+    scores = [_cosine(vector, centroid, norm, centroid_norm) for vector, norm in zip(vectors, norms)]
+    chosen = []
+    for index in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        if not norms[index]:
+            continue
+        if all(_cosine(vectors[index], vectors[other], norms[index], norms[other]) < redundancy for other in chosen):
+            chosen.append(index)
+            if len(chosen) == max_sentences:
+                break
+    return " ".join(_terminated(sentences[index]) for index in sorted(chosen))
+
+
+def _terminated(sentence):
+    return sentence if sentence[-1] in ".!?" else sentence + "."
+
+
+# --- BACKENDS ---
+class ExtractiveBackend:
+    """Offline sentence extraction; deterministic and fast."""
+
+    name = "extractive"
+
+    def summarize(self, texts, max_sentences):
+        return extractive_summary(texts, max_sentences)
+
+
+class GeminiBackend:
+    """Abstractive summaries from a Gemini model through the google-genai SDK (imported on first use)."""
+
+    name = "gemini"
+    # Bounds the prompt for candidates with very long comment histories.
+    MAX_PROMPT_CHARS = 20000
+
+    def __init__(self, api_key, model="gemini-2.0-flash"):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                self._client = genai.Client(api_key=self.api_key)
+            return self._client
+
+    def summarize(self, texts, max_sentences):
+        comments = "\n".join(f"- {text}" for text in texts)[:self.MAX_PROMPT_CHARS]
+        prompt = (
+            f"Summarize these interview evaluator comments about one candidate in at most {max_sentences} sentences. "
+            "Cover strengths and areas for development; do not invent details.\n\n" + comments
+        )
+        response = self._get_client().models.generate_content(model=self.model, contents=prompt)
+        text = (response.text or "").strip()
+        if not text:
+            raise RuntimeError("The model returned an empty summary.")
+        return text
+
+
+def make_backend(kind, api_key=None, model=None):
+    """Returns the backend for SUMMARY_BACKEND ('extractive' or 'gemini')."""
+    if kind == "extractive":
+        return ExtractiveBackend()
+    if kind == "gemini":
+        if not api_key:
+            raise ValueError("SUMMARY_BACKEND=gemini requires GEMINI_API_KEY.")
+        return GeminiBackend(api_key, model or "gemini-2.0-flash")
+    raise ValueError(f"Unknown summary backend '{kind}'. Use 'extractive' or 'gemini'.")
+
+
+# --- SERVICE ---
+class SummaryService:
+    """Summarizes comment sets once: cached by content hash, coalesced, and bounded by a deadline.
+
+    Identical comment sets (in any order) share one cache entry. Concurrent
+    requests for the same set wait on a single computation. A remote backend
+    gets `deadline` seconds; past that, or on error, the extractive summary is
+    returned and cached briefly while the remote call finishes in the
+    background and replaces it.
+    """
+
+    def __init__(self, backend=None, max_sentences=3, deadline=1.5, cache_size=1024, cache_ttl=3600,
+                 fallback_ttl=30, workers=2, max_pending=32):
+        self.extractive = ExtractiveBackend()
+        self.backend = backend or self.extractive
+        self.max_sentences = max_sentences
+        self.deadline = deadline
+        self.fallback_ttl = fallback_ttl
+        self.max_pending = max_pending
+        self.workers = workers
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._remote = {}
+        self._pool = None
+        self.coalesced = 0
+        self.fallbacks = 0
+        self.backend_errors = 0
+
+    def key(self, texts):
+        digest = hashlib.sha256("\x1f".join(sorted(texts)).encode("utf-8")).hexdigest()
+        return f"{self.backend.name}:{self.max_sentences}:{digest}"
+
+    def summarize(self, comments, deadline=None):
+        """Returns {"summary", "source", "cached"}; `deadline` overrides the remote backend's time budget."""
+        texts = comment_texts(comments)
+        if not texts:
+            return {"summary": NO_COMMENTS, "source": "none", "cached": False}
+        key = self.key(texts)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return {**future.result(), "cached": False}
+
+        try:
+            result = self._compute(key, texts, self.deadline if deadline is None else deadline)
+            future.set_result(result)
+            return {**result, "cached": False}
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _compute(self, key, texts, deadline):
+        if self.backend is self.extractive:
+            result = {"summary": self.extractive.summarize(texts, self.max_sentences), "source": self.extractive.name}
+            self.cache.set(key, result)
+            return result
+
+        remote = self._submit_remote(key, texts)
+        if remote is not None:
+            try:
+                return {"summary": remote.result(timeout=max(0.0, deadline)), "source": self.backend.name}
+            except FutureTimeout:
+                pass
+            except Exception as e:
+                with self._lock:
+                    self.backend_errors += 1
+                print(f"Summary backend '{self.backend.name}' failed: {e}")
+
+        with self._lock:
+            self.fallbacks += 1
+        result = {"summary": self.extractive.summarize(texts, self.max_sentences), "source": self.extractive.name}
+        if remote is not None and remote.done() and remote.exception() is None:
+            # Finished while the fallback was computed; do not shadow its cache entry.
+            return {"summary": remote.result(), "source": self.backend.name}
+        # Short-lived, so the remote summary replaces it (or is retried) soon.
+        self.cache.set(key, result, ttl=self.fallback_ttl)
+        return result
+
+    def _submit_remote(self, key, texts):
+        """Starts (or joins) the remote call for `key`; None when too many are already pending."""
+        with self._lock:
+            remote = self._remote.get(key)
+            if remote is not None:
+                return remote
+            if len(self._remote) >= self.max_pending:
+                return None
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="summary")
+            remote = self._remote[key] = self._pool.submit(self._run_remote, key, texts)
+            return remote
+
+    def _run_remote(self, key, texts):
+        try:
+            summary = self.backend.summarize(texts, self.max_sentences)
+            self.cache.set(key, {"summary": summary, "source": self.backend.name})
+            return summary
+        finally:
+            with self._lock:
+                self._remote.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            counters = {"coalesced": self.coalesced, "fallbacks": self.fallbacks, "backend_errors": self.backend_errors,
+                        "pending_remote": len(self._remote)}
+        return {"backend": self.backend.name, "deadline": self.deadline, "cache": self.cache.stats(), **counters}
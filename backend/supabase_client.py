@@ -0,0 +1,299 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from json_codec import loads
+
+# Statuses worth retrying. 429 is always safe to retry because the request was
+# rejected before it was processed; 5xx is only retried for idempotent methods.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_ID_SEGMENT = re.compile(r"/[0-9a-fA-F-]{32,36}(?=/|$)")
+# Storage object names (hashes, legacy upload names) would otherwise give every file its own latency counter.
+_STORAGE_OBJECT = re.compile(r"^(/storage/v1/object/(?:public/)?[^/]+)/.+$")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before its Supabase calls complete."""
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class SupabaseClient:
+    """Pooled, keep-alive HTTP client for the Supabase REST and auth admin APIs.
+
+    One instance is shared by every route so TCP/TLS connections are reused
+    across requests. Each call is timed and counted per endpoint.
+    """
+
+    def __init__(self, base_url, service_role_key, pool_size=20, connect_timeout=3.05,
+                 read_timeout=15, max_retries=3, backoff_factor=0.25, page_size=1000, fanout_workers=16):
+        self.base_url = base_url.rstrip("/")
+        self.rest_url = f"{self.base_url}/rest/v1"
+        self.auth_admin_url = f"{self.base_url}/auth/v1/admin/users"
+        self.storage_url = f"{self.base_url}/storage/v1"
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # Must not exceed the project's PostgREST max-rows setting.
+        self.page_size = page_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {service_role_key}",
+            "apikey": service_role_key,
+            "Content-Type": "application/json",
+        })
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        # Callables (endpoint, elapsed seconds, status) invoked after every call, e.g. for metrics.
+        self._observers = []
+
+        # Shared pool for independent reads issued together by gather(); 0 runs them one after another.
+        self.fanout_workers = fanout_workers
+        self._fanout_pool = None
+        self._fanout_lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls, base_url, service_role_key):
+        """Builds a client using the SUPABASE_* tuning variables from the environment."""
+        return cls(
+            base_url,
+            service_role_key,
+            pool_size=_env_int("SUPABASE_POOL_SIZE", 20),
+            connect_timeout=_env_float("SUPABASE_CONNECT_TIMEOUT", 3.05),
+            read_timeout=_env_float("SUPABASE_READ_TIMEOUT", 15),
+            max_retries=_env_int("SUPABASE_MAX_RETRIES", 3),
+            backoff_factor=_env_float("SUPABASE_RETRY_BACKOFF", 0.25),
+            page_size=_env_int("SUPABASE_PAGE_SIZE", 1000),
+            fanout_workers=_env_int("SUPABASE_FANOUT_WORKERS", 16),
+        )
+
+    # --- DEADLINES & FAN-OUT ---
+    @contextmanager
+    def deadline(self, seconds):
+        """Bounds every call made by this thread (and by gather() tasks it starts) to `seconds` from now.
+
+        Nested deadlines can only shorten the current one.
+        """
+        previous = getattr(self._local, "deadline", None)
+        deadline = time.monotonic() + seconds
+        self._local.deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def remaining(self):
+        """Seconds left before this thread's deadline, or None if there is none."""
+        deadline = getattr(self._local, "deadline", None)
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _get_fanout_pool(self):
+        with self._fanout_lock:
+            if self._fanout_pool is None:
+                self._fanout_pool = ThreadPoolExecutor(max_workers=self.fanout_workers, thread_name_prefix="supabase-fanout")
+            return self._fanout_pool
+
+    def gather(self, *calls):
+        """Runs independent zero-argument callables concurrently and returns their results in order.
+
+        Tasks inherit the caller's deadline and context variables. If it passes first, unstarted tasks
+        are cancelled and DeadlineExceeded is raised; the first task error is
+        re-raised otherwise. Do not call gather() from inside a gathered task.
+        """
+        if self.fanout_workers <= 0 or len(calls) <= 1:
+            return [call() for call in calls]
+
+        deadline = getattr(self._local, "deadline", None)
+
+        def run(call):
+            self._local.deadline = deadline
+            try:
+                return call()
+            finally:
+                self._local.deadline = None
+
+        pool = self._get_fanout_pool()
+        # One context copy per task: a Context cannot be entered by two threads at once.
+        futures = [pool.submit(contextvars.copy_context().run, run, call) for call in calls]
+        done, pending = wait(futures, timeout=self.remaining())
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise DeadlineExceeded(f"{len(pending)} of {len(calls)} Supabase calls did not finish before the deadline.")
+        return [future.result() for future in futures]
+
+    # --- LOW-LEVEL REQUEST ---
+    def request(self, method, url, prefer="return=representation", headers=None, **kwargs):
+        """Sends a request through the shared session, retrying 429/5xx with exponential backoff."""
+        method = method.upper()
+        request_headers = {"Prefer": prefer} if prefer else {}
+        if headers:
+            request_headers.update(headers)
+        kwargs.setdefault("timeout", self.timeout)
+
+        endpoint = self._endpoint_key(method, url)
+        # File bodies are streamed; remember where they start so a retry resends the whole file.
+        body = kwargs.get("data")
+        body_start = body.tell() if hasattr(body, "seek") else None
+        start = time.perf_counter()
+        attempt = 0
+        response = None
+        try:
+            while True:
+                remaining = self.remaining()
+                if remaining is not None:
+                    if remaining <= 0:
+                        raise DeadlineExceeded(f"Deadline passed before {endpoint}.")
+                    # Never wait on the socket past the deadline.
+                    kwargs["timeout"] = (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+                if body_start is not None:
+                    body.seek(body_start)
+                try:
+                    response = self.session.request(method, url, headers=request_headers, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                        raise
+                    self._sleep_before_retry(attempt, None)
+                    attempt += 1
+                    continue
+
+                retryable = response.status_code == 429 or (
+                    response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+                )
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                self._sleep_before_retry(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+        finally:
+            self._record(endpoint, time.perf_counter() - start, response, attempt)
+
+    def _sleep_before_retry(self, attempt, retry_after):
+        delay = self.backoff_factor * (2 ** attempt)
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded("Deadline would pass while waiting to retry.")
+        time.sleep(delay)
+
+    # --- CONVENIENCE WRAPPERS ---
+    def get(self, table, params=None, **kwargs):
+        return self.request("GET", f"{self.rest_url}/{table}", params=params, **kwargs)
+
+    def get_pages(self, table, params=None, page_size=None):
+        """Yields a table's matching rows page by page using Range headers.
+
+        PostgREST caps each response (1000 rows by default on Supabase), so
+        large reads must page. Pass an `order` param for stable pages.
+        Raises if any page fails.
+        """
+        page_size = page_size or self.page_size
+        offset = 0
+        while True:
+            response = self.get(table, params=params, headers={"Range-Unit": "items", "Range": f"{offset}-{offset + page_size - 1}"})
+            if response.status_code not in (200, 206):
+                raise Exception(f"Supabase error fetching {table}: {response.text}")
+            # Report reads page through thousands of evaluation rows; orjson parses them several times faster.
+            rows = loads(response.content)
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def get_all(self, table, params=None, page_size=None):
+        """Returns every matching row, reading page by page."""
+        return [row for page in self.get_pages(table, params, page_size) for row in page]
+
+    def post(self, table, json=None, **kwargs):
+        return self.request("POST", f"{self.rest_url}/{table}", json=json, **kwargs)
+
+    def create_auth_user(self, payload):
+        return self.request("POST", self.auth_admin_url, json=payload)
+
+    def delete_auth_user(self, user_id):
+        return self.request("DELETE", f"{self.auth_admin_url}/{user_id}")
+
+    def upload_object(self, bucket, name, data, content_type, upsert=True):
+        """Uploads bytes or a file object (streamed) to a storage bucket, replacing any object of that name."""
+        return self.request("POST", f"{self.storage_url}/object/{bucket}/{name}", prefer=None, data=data,
+                            headers={"Content-Type": content_type, "x-upsert": "true" if upsert else "false"})
+
+    def public_object_url(self, bucket, name):
+        return f"{self.storage_url}/object/public/{bucket}/{name}"
+
+    # --- LATENCY COUNTERS ---
+    def add_observer(self, observer):
+        """Registers `observer(endpoint, elapsed_seconds, status)`; status is the HTTP code or "error"."""
+        self._observers.append(observer)
+
+    def _endpoint_key(self, method, url):
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        path = _STORAGE_OBJECT.sub(r"\1/{name}", path)
+        return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+    def _record(self, endpoint, elapsed, response, retries):
+        elapsed_ms = elapsed * 1000
+        failed = response is None or response.status_code >= 400
+        with self._stats_lock:
+            stat = self._stats.setdefault(endpoint, {
+                "count": 0, "errors": 0, "retries": 0,
+                "total_ms": 0.0, "min_ms": None, "max_ms": 0.0,
+            })
+            stat["count"] += 1
+            stat["retries"] += retries
+            stat["errors"] += 1 if failed else 0
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            stat["min_ms"] = elapsed_ms if stat["min_ms"] is None else min(stat["min_ms"], elapsed_ms)
+        status = "error" if response is None else response.status_code
+        for observer in self._observers:
+            observer(endpoint, elapsed, status)
+
+    def latency_stats(self):
+        """Returns a snapshot of per-endpoint call counts and latencies in milliseconds."""
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    **stat,
+                    "avg_ms": round(stat["total_ms"] / stat["count"], 2) if stat["count"] else 0,
+                    "total_ms": round(stat["total_ms"], 2),
+                    "min_ms": round(stat["min_ms"] or 0, 2),
+                    "max_ms": round(stat["max_ms"], 2),
+                }
+                for endpoint, stat in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
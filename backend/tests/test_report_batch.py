@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import pytest
+
+import report_batch
+import report_pdf
+
+
+@pytest.fixture
+def inline_renders(monkeypatch):
+    monkeypatch.setattr(report_batch, "REPORT_RENDER_WORKERS", 0)
+    monkeypatch.setattr(report_pdf, "render_pdf_report", lambda report_data, candidate_id: report_data["pdf"])
+
+
+def test_reports_are_prepared_as_they_are_rendered(inline_renders):
+    prepared = []
+
+    def prepare(report_data):
+        prepared.append(report_data["pdf"])
+        return report_data
+
+    reports = {candidate_id: {"pdf": candidate_id.encode()} for candidate_id in ("a", "b", "c")}
+    stream = report_batch.stream_reports_zip(reports, prepare=prepare)
+    first = next(stream)
+
+    assert first
+    assert prepared == [b"a"]
+    body = first + b"".join(stream)
+    assert prepared == [b"a", b"b", b"c"]
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.read(report_batch.report_filename("c")) == b"c"
+
+
+def test_failed_preparation_is_recorded_for_that_report(inline_renders):
+    def prepare(report_data):
+        if report_data["pdf"] == b"b":
+            raise ValueError("summary failed")
+        return report_data
+
+    reports = {candidate_id: {"pdf": candidate_id.encode()} for candidate_id in ("a", "b")}
+    body = b"".join(report_batch.stream_reports_zip(reports, prepare=prepare))
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.read(report_batch.report_filename("a")) == b"a"
+        assert b"summary failed" in archive.read(f"{report_batch.report_filename('b')}.error.txt")
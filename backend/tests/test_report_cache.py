@@ -0,0 +1,33 @@
+import threading
+
+from report_cache import ReportCache
+
+
+def test_get_or_load_runs_loader_once_for_concurrent_misses():
+    cache = ReportCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"pdf"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_load("pdf", "c1", "3:t", loader)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get_or_load("pdf", "c1", "3:t", loader)))
+    second.start()
+    while cache.entries.stats()["coalesced"] == 0 and second.is_alive():
+        second.join(0.01)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert calls == [1]
+    assert results == [b"pdf", b"pdf"]
+    assert cache.get_or_load("pdf", "c1", "3:t", loader) == b"pdf"
+    assert calls == [1]
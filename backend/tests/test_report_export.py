@@ -0,0 +1,24 @@
+import io
+import zipfile
+
+import pytest
+
+from report_export import stream_xlsx, worksheet_name
+
+
+def test_worksheet_name_removes_invalid_characters():
+    assert worksheet_name("Sales/Ops [2024]") == "SalesOps 2024"
+    assert worksheet_name("A" * 40) == "A" * 31
+    assert worksheet_name("'Lecturer'") == "Lecturer"
+
+
+@pytest.mark.parametrize("name", ["", None, "[]:*?/\\", "  ", "History"])
+def test_worksheet_name_falls_back_when_nothing_usable_is_left(name):
+    assert worksheet_name(name) == "Report"
+
+
+def test_stream_xlsx_accepts_a_cleaned_position():
+    pytest.importorskip("xlsxwriter")
+    body = b"".join(stream_xlsx([["Candidate", "Score"], ["A", 1]], worksheet_name("Sales/Ops [2024]")))
+    with zipfile.ZipFile(io.BytesIO(body)) as workbook:
+        assert 'name="SalesOps 2024"' in workbook.read("xl/workbook.xml").decode("utf-8")
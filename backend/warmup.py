@@ -0,0 +1,22 @@
+import importlib
+import time
+
+# Pull in ReportLab, NumPy and the GenAI SDK; the routes that need them import them on first use.
+HEAVY_MODULES = ("report_pdf", "cohort_stats", "google.genai")
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """Imports `modules` now so the first request that needs them does not pay for it.
+
+    Returns {module: seconds} for the modules that loaded; optional ones that
+    are not installed are skipped.
+    """
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
@@ -1,83 +1,100 @@
-from typing import List, Dict
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
 
-def generate_report_values_table():
+# Written by backend/benchmarks/load_test.py
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "benchmarks", "results", "latest.json")
+
+NOT_MEASURED = "not measured"
+
+
+def _ms(value: Optional[float]) -> str:
+    if value is None:
+        return NOT_MEASURED
+    return f"{value / 1000:.2f} s" if value >= 1000 else f"{value:.0f} ms"
+
+
+def _endpoint(results: Dict, name: str) -> Dict:
+    return results.get("scenarios", {}).get(name) or {}
+
+
+def build_metrics(results: Dict) -> List[Dict[str, str]]:
+    """Maps a load-test run onto the report's metric names. Metrics the run cannot observe say so."""
+    overall = results.get("overall", {})
+    config = results.get("config", {})
+    report = _endpoint(results, "GET /api/report")
+    export = _endpoint(results, "GET /api/report/excel")
+    summary = _endpoint(results, "POST /api/summarize")
+    add = _endpoint(results, "POST /api/candidate/add")
+
+    capacity = NOT_MEASURED
+    if overall.get("count"):
+        capacity = (f"{config.get('concurrency')} concurrent clients, {overall['throughput_rps']:.0f} req/s, "
+                    f"{overall['error_rate'] * 100:.1f}% errors")
+
+    return [
+        {"Metric Name": "API Latency (p50 / p95)", "Value to Insert": f"{_ms(overall.get('p50_ms'))} / {_ms(overall.get('p95_ms'))}"},
+        {"Metric Name": "API Latency (p99)", "Value to Insert": _ms(overall.get("p99_ms"))},
+        {"Metric Name": "Candidate Creation (p95)", "Value to Insert": _ms(add.get("p95_ms"))},
+        {"Metric Name": "CSV Export Time (p95)", "Value to Insert": _ms(export.get("p95_ms"))},
+        {"Metric Name": "AI Summary Latency (Max)", "Value to Insert": _ms(summary.get("max_ms"))},
+        {"Metric Name": "PDF Report Time (p95)", "Value to Insert": _ms(report.get("p95_ms"))},
+        {"Metric Name": "PDF Report Time (Max)", "Value to Insert": _ms(report.get("max_ms"))},
+        {"Metric Name": "Concurrent User Capacity", "Value to Insert": capacity},
+        # Outside what the backend load test can observe.
+        {"Metric Name": "Data Sync Delay", "Value to Insert": NOT_MEASURED},
+        {"Metric Name": "Dashboard Render Time", "Value to Insert": NOT_MEASURED},
+        {"Metric Name": "Lighthouse Score", "Value to Insert": NOT_MEASURED},
+        {"Metric Name": "AI Semantic Accuracy", "Value to Insert": NOT_MEASURED},
+        {"Metric Name": "Time Efficiency (Compilation)", "Value to Insert": NOT_MEASURED},
+    ]
+
+
+def generate_report_values_table(results_path: str = DEFAULT_RESULTS):
     """
-    Generates a simple table showing the required quantitative metric values, 
-    using contextual phrasing where rounding/simplification is necessary for the narrative.
+    Prints the quantitative metric values measured by the latest load-test run
+    (backend/benchmarks/load_test.py), for insertion into the report's running text.
     """
-    
-    # Define the final set of metrics and the CONTEXTUALIZED VALUE TO INSERT 
-    # into the report's running text (Sections 5.3, 5.5, 6.1).
-    METRICS_DATA: List[Dict[str, str]] = [
-        {
-            "Metric Name": "API Latency",
-            # Missing in narrative, use the precise measured value.
-            "Value to Insert": "95 ms"
-        },
-        {
-            "Metric Name": "Data Sync Delay",
-            # Found in narrative as 'sub-100 ms', maintain this contextual phrasing.
-            "Value to Insert": "sub-100 ms"
-        },
-        {
-            "Metric Name": "Dashboard Render Time",
-            # Found in narrative as 'sub-second', maintain this contextual phrasing.
-            "Value to Insert": "sub-second"
-        },
-        {
-            "Metric Name": "AI Summary Latency (Max)",
-            # Missing in narrative, use the precise acceptance criteria value.
-            "Value to Insert": "< 2 s"
-        },
-        {
-            "Metric Name": "PDF Report Time (Max)",
-            # Missing in narrative, use the rounded/contextual phrasing.
-            "Value to Insert": "under 5 seconds"
-        },
-        {
-            "Metric Name": "Lighthouse Score",
-            # Missing in narrative, use the precise measured value.
-            "Value to Insert": "92%"
-        },
-        {
-            "Metric Name": "AI Semantic Accuracy",
-            # Found in narrative as 'over 90 %', maintain this contextual phrasing.
-            "Value to Insert": "over 90 %"
-        },
-        {
-            "Metric Name": "Time Efficiency (Compilation)",
-            # Found in narrative as 'one minute', maintain this contextual phrasing.
-            "Value to Insert": "under one minute"
-        },
-        {
-            "Metric Name": "Concurrent User Capacity",
-            # Found in narrative as '1,000', use the full phrasing for insertion.
-            "Value to Insert": "1,000 sessions"
-        },
-    ]
+    try:
+        with open(results_path) as results_file:
+            results = json.load(results_file)
+    except FileNotFoundError:
+        print(f"No load-test results found at {results_path}.")
+        print("Run: python backend/benchmarks/load_test.py --concurrency 16 --duration 30")
+        sys.exit(1)
+
+    METRICS_DATA = build_metrics(results)
 
     # --- Print Final Reference Table ---
-    
+
     # Define column widths for alignment
-    COL_WIDTHS = [35, 30]
-    
+    COL_WIDTHS = [35, 50]
+
     def print_separator():
         print("|" + "-" * COL_WIDTHS[0] + "|" + "-" * COL_WIDTHS[1] + "|")
 
-    print("\n" + "=" * 67)
-    print("      QUANTITATIVE METRICS: CONTEXTUAL INSERTION VALUES      ")
-    print("=" * 67)
-    
+    width = sum(COL_WIDTHS) + 3
+    config = results.get("config", {})
+    print("\n" + "=" * width)
+    print("      QUANTITATIVE METRICS: MEASURED VALUES      ")
+    print(f"      Run at {results.get('run_at', '?')}: {results.get('overall', {}).get('count', 0)} requests, "
+          f"{config.get('concurrency')} clients, {config.get('candidates')} candidates, target {config.get('target')}")
+    print("=" * width)
+
     # Print Header
     print(f"| {'Metric Name':<{COL_WIDTHS[0]-1}} | {'Value to Insert':<{COL_WIDTHS[1]-1}} |")
     print_separator()
-    
+
     # Print Rows
     for row in METRICS_DATA:
         print(f"| {row['Metric Name']:<{COL_WIDTHS[0]-1}} | {row['Value to Insert']:<{COL_WIDTHS[1]-1}} |")
 
     print_separator()
-    print("\nACTION: Use the 'Value to Insert' column to update all quantitative claims in Sections 5.3, 5.5, and 6.1.")
+    print(f"\nSource: {results_path}. Re-run the load test after changes; '{NOT_MEASURED}' values need their own measurement.")
 
 if __name__ == "__main__":
-    generate_report_values_table()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Print measured metric values from the latest load-test run.")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Load-test results JSON (default: latest run).")
+    generate_report_values_table(parser.parse_args().results)
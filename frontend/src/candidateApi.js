@@ -0,0 +1,14 @@
+// frontend/src/candidateApi.js
+// Paged candidate directory from the backend (name order, or ranked by ?q= search) instead of the whole users table.
+const BACKEND_URL = "http://127.0.0.1:5000";
+
+// Returns { items, next_cursor }. Pass the previous page's next_cursor as `cursor` to load more.
+export async function fetchCandidatePage({ q, cursor, limit, position, roundStatus, round, scoreBand } = {}) {
+  const params = new URLSearchParams(Object.entries({
+    q, cursor, limit, position, round_status: roundStatus, round, score_band: scoreBand,
+  }).filter(([, value]) => value));
+  const res = await fetch(`${BACKEND_URL}/api/candidates?${params}`);
+  const data = await res.json();
+  if (!res.ok) throw new Error(data.error || `Failed to load candidates (${res.status}).`);
+  return data;
+}
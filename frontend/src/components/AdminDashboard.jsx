@@ -6,7 +6,10 @@ import '../assets/Dashboard.css';
 import styles from '../pages/Auth.module.css';
 // Added Upload icon for file input
 import { Calendar as CalendarIcon, Clock, TrendingUp, Users, UserPlus, FileText, Check, X, Trash2, PlusCircle, Upload, User } from 'lucide-react';
-import { v4 } from 'uuid'; // CORRECTED IMPORT: v4 is a named export function
+import { subscribeToSchedules, applyScheduleChange, updateSchedule, deleteSchedule } from '../scheduleApi.js';
+import { uploadResume } from '../resumeApi.js';
+
+const BACKEND_URL = "http://127.0.0.1:5000";
 
 // --- Reusable Components ---
 
@@ -95,7 +98,6 @@ function IntervieweeForm({ onClose, onSuccess }) {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
-  const BACKEND_URL = "http://127.0.0.1:5000";
 
   const handleChange = (e) => setFormData(prev => ({ ...prev, [e.target.name]: e.target.value }));
   const handleAcademicChange = (index, e) => { const updated = [...academicDetails]; updated[index][e.target.name] = e.target.value; setAcademicDetails(updated); };
@@ -123,32 +125,13 @@ function IntervieweeForm({ onClose, onSuccess }) {
     setLoading(true); setError('');
 
     // --- 0. Resume File Upload (Point 4) ---
+    // Sent through the backend, which stores each distinct file once and indexes its text for resume search.
     let uploadedResumeUrl = null;
     if (resumeFile) {
         try {
-            const fileExtension = resumeFile.name.split('.').pop();
-            // CORRECTED USAGE: v4() is the function from 'uuid'
-            const fileName = `${v4()}_${formData.first_name || 'candidate'}_${formData.surname || 'resume'}.${fileExtension}`; 
-            
-            // Upload the file to Supabase Storage
-            const { error: uploadError } = await supabase.storage
-                .from('resumes') // Uses the confirmed 'resumes' bucket
-                .upload(fileName, resumeFile, {
-                    cacheControl: '3600',
-                    upsert: false 
-                });
-
-            if (uploadError) throw new Error(uploadError.message);
-            
-            // Get the public URL for the uploaded file
-            const { data: urlData } = supabase.storage
-                .from('resumes')
-                .getPublicUrl(fileName);
-            
-            uploadedResumeUrl = urlData.publicUrl;
-
+            ({ resume_url: uploadedResumeUrl } = await uploadResume(resumeFile));
         } catch (err) {
-            setError(`Failed to upload resume: ${err.message}. Please check Supabase Storage bucket ('resumes') and RLS policy.`);
+            setError(`Failed to upload resume: ${err.message}`);
             setLoading(false);
             return;
         }
@@ -445,30 +428,31 @@ const ApprovalSection = () => {
   };
 
   useEffect(() => {
-    fetchPending();
-    const interval = setInterval(fetchPending, 60000); // Refresh every minute
-    return () => clearInterval(interval);
+    // Live updates replace the old once-a-minute refresh.
+    const isPending = (s) => s.status === 'Pending Approval' && new Date(s.created_at) >= new Date(Date.now() - 12 * 60 * 60 * 1000);
+    return subscribeToSchedules({}, {
+      onReload: fetchPending,
+      onChange: (change) => setPending(prev => applyScheduleChange(prev, change, isPending)),
+    });
   }, []);
 
   const handleApproval = async (id, newStatus) => {
-    const { error } = await supabase.from('schedules').update({ status: newStatus }).eq('id', id);
-    if (error) {
-      setMessage(`Error: ${error.message}`);
-    } else {
+    try {
+      await updateSchedule(id, { status: newStatus });
       setMessage(`Event ${newStatus === 'Scheduled' ? 'approved' : 'deleted'} successfully!`);
-      fetchPending(); // Refresh list
       setTimeout(() => setMessage(''), 3000);
+    } catch (error) {
+      setMessage(`Error: ${error.message}`);
     }
   };
 
   const handleDelete = async (id) => {
-    const { error } = await supabase.from('schedules').delete().eq('id', id);
-    if (error) {
-      setMessage(`Error: ${error.message}`);
-    } else {
+    try {
+      await deleteSchedule(id);
       setMessage('Event deleted successfully!');
-      fetchPending(); // Refresh list
       setTimeout(() => setMessage(''), 3000);
+    } catch (error) {
+      setMessage(`Error: ${error.message}`);
     }
   };
 
@@ -500,17 +484,7 @@ const ApprovalSection = () => {
   );
 };
 
-const RecentActivity = () => {
-  const [schedules, setSchedules] = useState([]);
-  useEffect(() => {
-    const fetchSchedules = async () => {
-      const { data, error } = await supabase.from('schedules').select('id, event_name, date, status, candidate:candidate_id(full_name)').in('status', ['Scheduled', 'Completed']).order('date', { ascending: false }).limit(5);
-      if (error) { console.error("Error fetching recent activity:", error); }
-      else { setSchedules(data); }
-    };
-    fetchSchedules();
-  }, []);
-
+const RecentActivity = ({ schedules }) => {
   return (
     <div style={{ background: '#fff', padding: '1.5rem', borderRadius: '12px', boxShadow: '0 2px 8px rgba(0,0,0,0.05)', marginTop: '2rem' }}>
       <h2 style={{ fontSize: '1.5rem', marginBottom: '1rem', color: '#333' }}>Recent Activity</h2>
@@ -533,22 +507,22 @@ function AdminDashboard({ userProfile }) {
   // NEW STATE: For profile creation success popup (Point 3)
   const [successMessage, setSuccessMessage] = useState(''); 
   const [stats, setStats] = useState({ totalCandidates: 0, scheduledToday: 0, upcomingEvaluations: 0, completedThisMonth: 0 });
+  const [recentActivity, setRecentActivity] = useState([]);
 
   const fetchStats = async () => {
     try {
-      const { count: candidateCount } = await supabase.from('users').select('*', { count: 'exact', head: true }).eq('role', 'candidate');
-      const today = new Date().toISOString().split('T')[0];
-      const { count: todayCount } = await supabase.from('schedules').select('*', { count: 'exact', head: true }).eq('date', today).eq('status', 'Scheduled');
-      const { count: upcomingCount } = await supabase.from('schedules').select('*', { count: 'exact', head: true }).gte('date', today).eq('status', 'Scheduled');
-      const firstDayOfMonth = new Date(new Date().getFullYear(), new Date().getMonth(), 1).toISOString().split('T')[0];
-      const { count: completedCount } = await supabase.from('schedules').select('*', { count: 'exact', head: true }).gte('date', firstDayOfMonth).eq('status', 'Completed');
+      // One backend call; counters and recent activity are computed together and shared across open tabs.
+      const res = await fetch(`${BACKEND_URL}/api/dashboard/stats`);
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error || 'Failed to load dashboard stats.');
 
       setStats({
-        totalCandidates: candidateCount || 0,
-        scheduledToday: todayCount || 0,
-        upcomingEvaluations: upcomingCount || 0,
-        completedThisMonth: completedCount || 0
+        totalCandidates: data.total_candidates || 0,
+        scheduledToday: data.scheduled_today || 0,
+        upcomingEvaluations: data.upcoming_evaluations || 0,
+        completedThisMonth: data.completed_this_month || 0
       });
+      setRecentActivity(data.recent_activity || []);
     } catch (error) { console.error('Error fetching stats:', error); }
   };
 
@@ -618,7 +592,7 @@ function AdminDashboard({ userProfile }) {
           </div>
         </div>
 
-        <RecentActivity />
+        <RecentActivity schedules={recentActivity} />
       </main>
 
       {showIntervieweeForm && <IntervieweeForm onClose={() => setShowIntervieweeForm(false)} onSuccess={handleFormSuccess} />}
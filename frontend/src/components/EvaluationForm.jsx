@@ -1,10 +1,13 @@
 // frontend/src/components/EvaluationForm.jsx
 import React, { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabase.js';
+import { updateSchedule } from '../scheduleApi.js';
 import { useParams, useNavigate } from 'react-router-dom';
 import '../assets/Dashboard.css';
 import styles from '../pages/Auth.module.css';
 
+const BACKEND_URL = "http://127.0.0.1:5000";
+
 // --- ICONS and DATA STRUCTURES remain unchanged ---
 const AppearanceIcon = () => <svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round"><path d="M19 21v-2a4 4 0 0 0-4-4H9a4 4 0 0 0-4 4v2"></path><circle cx="12" cy="7" r="4"></circle></svg>;
 const CommunicationIcon = () => <svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round"><path d="M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z"></path></svg>;
@@ -134,8 +137,6 @@ function EvaluationForm({ userProfile }) {
             return;
         }
 
-        let totalScore = 0;
-        let totalMaxScore = 0;
         const quantitative_scores = {};
         const qualitative_comments = [];
 
@@ -157,8 +158,6 @@ function EvaluationForm({ userProfile }) {
                 });
             }
 
-            totalScore += moduleScore;
-            totalMaxScore += maxModuleScore;
             quantitative_scores[moduleName] = { score: moduleScore, max: maxModuleScore };
 
             if (moduleData.comment) {
@@ -170,23 +169,26 @@ function EvaluationForm({ userProfile }) {
         }
 
         try {
-            const { error: insertError } = await supabase
-                .from('evaluations')
-                .insert({
+            // The backend saves the evaluation, updates the candidate's score summary and drops cached reports.
+            const response = await fetch(`${BACKEND_URL}/api/evaluations`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
                     schedule_id: scheduleId,
                     evaluator_uid: userProfile.uid,
                     candidate_uid: schedule.candidate.uid,
                     round_type: schedule.round_type,
-                    submission_time: new Date().toISOString(),
                     time_remaining_seconds: timer,
                     quantitative_scores: quantitative_scores,
                     qualitative_comments: qualitative_comments,
-                    total_score: totalScore,
-                    total_max_score: totalMaxScore,
                     is_complete: !isAutoSubmit,
-                });
+                }),
+            });
 
-            if (insertError) throw insertError;
+            if (!response.ok) {
+                const result = await response.json().catch(() => ({}));
+                throw new Error(result.error || `Server responded with ${response.status}`);
+            }
 
             setSubmissionStatus({
                 state: 'success',
@@ -269,9 +271,7 @@ function EvaluationForm({ userProfile }) {
 
             if (updateError) throw updateError;
 
-            const { error: scheduleUpdateError } = await supabase.from('schedules')
-                    .update({ status: 'Completed' })
-                    .eq('id', scheduleId);
+            const scheduleUpdateError = await updateSchedule(scheduleId, { status: 'Completed' }).then(() => null, err => err);
 
             if (scheduleUpdateError) {
                  console.error("Failed to update schedule status to Completed:", scheduleUpdateError);
@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../supabase.js';
 import Sidebar from '../components/Sidebar.jsx';
+import { subscribeToSchedules, applyScheduleChange, updateSchedule, deleteSchedule } from '../scheduleApi.js';
 import '../assets/Dashboard.css';
 import styles from './Auth.module.css';
 import { Check, X, Trash2, Edit, Save, Calendar, Clock } from 'lucide-react';
@@ -38,12 +39,7 @@ const ScheduleEditModal = ({ schedule, onSave, onClose }) => {
             };
             delete updatePayload.candidate; // Remove nested candidate object
             
-            const { error: updateError } = await supabase
-                .from('schedules')
-                .update(updatePayload)
-                .eq('id', schedule.id);
-
-            if (updateError) throw updateError;
+            await updateSchedule(schedule.id, updatePayload);
             
             onSave();
         } catch (err) {
@@ -118,30 +114,30 @@ function AdvancedAdminPage({ userProfile }) {
     };
 
     useEffect(() => {
-        fetchSchedules();
-        const interval = setInterval(fetchSchedules, 60000); // Refresh every minute
-        return () => clearInterval(interval);
+        // Live updates from the change feed replace the old once-a-minute refresh.
+        return subscribeToSchedules({}, {
+            onReload: fetchSchedules,
+            onChange: (change) => setSchedules(prev => applyScheduleChange(prev, change, s => s.status !== 'Completed')),
+        });
     }, []);
 
     const handleApproval = async (id, newStatus) => {
-        const { error } = await supabase.from('schedules').update({ status: newStatus }).eq('id', id);
-        if (error) {
-            setMessage(`Error: ${error.message}`);
-        } else {
+        try {
+            await updateSchedule(id, { status: newStatus });
             setMessage(`Event ${newStatus === 'Scheduled' ? 'approved' : 'cancelled'} successfully!`);
-            fetchSchedules(); // Refresh list
             setTimeout(() => setMessage(''), 3000);
+        } catch (error) {
+            setMessage(`Error: ${error.message}`);
         }
     };
 
     const handleDelete = async (id) => {
-        const { error } = await supabase.from('schedules').delete().eq('id', id);
-        if (error) {
-            setMessage(`Error: ${error.message}`);
-        } else {
+        try {
+            await deleteSchedule(id);
             setMessage('Event deleted successfully!');
-            fetchSchedules(); // Refresh list
             setTimeout(() => setMessage(''), 3000);
+        } catch (error) {
+            setMessage(`Error: ${error.message}`);
         }
     };
 
@@ -231,7 +227,6 @@ function AdvancedAdminPage({ userProfile }) {
                     onClose={() => setSelectedSchedule(null)}
                     onSave={() => {
                         setSelectedSchedule(null);
-                        fetchSchedules();
                         setMessage('Schedule updated successfully!');
                         setTimeout(() => setMessage(''), 3000);
                     }}
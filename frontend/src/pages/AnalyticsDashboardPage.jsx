@@ -1,9 +1,9 @@
 // src/pages/AnalyticsDashboardPage.jsx
 import React, { useState, useEffect, useCallback } from 'react';
-import { supabase } from '../supabase.js';
 import '../assets/Dashboard.css';
 import styles from './Auth.module.css';
 import Sidebar from '../components/Sidebar.jsx';
+import { fetchCandidatePage } from '../candidateApi.js';
 import { Download, CheckCircle, XCircle } from 'lucide-react';
 
 const BACKEND_URL = "http://127.0.0.1:5000"; 
@@ -39,54 +39,17 @@ const MockScoreChart = ({ overallAvg }) => {
 // --- End Mock Pie Chart Component ---
 
 
-// --- Detailed Dimension Breakdown Structure (Mock Data/Structure Enhancement) ---
-// This function structures the comprehensive breakdown needed for the detailed report view.
+// --- Detailed Dimension Breakdown Structure ---
+// Section totals and combined comments are precomputed by the backend analytics API.
 const getDetailedBreakdown = (analytics) => {
-    const breakdown = [];
-    if (!analytics || analytics.individualResponses.length === 0) return breakdown;
-
-    analytics.individualResponses.forEach(response => {
-        const quantitative = response.quantitative_scores;
-        // Group by module (e.g., Appearance, Technical 1)
-        for (const module in quantitative) {
-            // Check if quantitative is a structure with sections (which it should be)
-            if (quantitative[module] && typeof quantitative[module] === 'object') {
-                // Mocking detailed breakdown based on the assumed structure in EvaluationForm.jsx
-                // For simplicity here, we'll just show the module score and comment.
-                const comment = response.comments.find(c => c.round === module)?.comment || 'No module-specific comment.';
-                
-                breakdown.push({
-                    module: module,
-                    score: quantitative[module].score,
-                    max: quantitative[module].max,
-                    comment: comment,
-                    evaluator: response.evaluator,
-                });
-            }
-        }
-    });
-    
-    // Simple deduplication/grouping for a cleaner dashboard view:
-    // In a real application, this would average all evaluator scores per module.
-    const groupedBreakdown = {};
-    breakdown.forEach(item => {
-        if (!groupedBreakdown[item.module]) {
-            groupedBreakdown[item.module] = { totalScore: 0, totalMax: 0, count: 0, comments: [] };
-        }
-        groupedBreakdown[item.module].totalScore += item.score;
-        groupedBreakdown[item.module].totalMax += item.max;
-        groupedBreakdown[item.module].count += 1;
-        if (item.comment !== 'No module-specific comment.') {
-             groupedBreakdown[item.module].comments.push(item.comment);
-        }
-    });
-    
-    return Object.keys(groupedBreakdown).map(module => ({
-        module,
-        score: groupedBreakdown[module].totalScore,
-        max: groupedBreakdown[module].totalMax,
-        average: Math.round((groupedBreakdown[module].totalScore / groupedBreakdown[module].totalMax) * 100),
-        combinedComment: groupedBreakdown[module].comments.join(' | ') || 'No consensus comments.',
+    if (!analytics || !analytics.sectionScores) return [];
+
+    return analytics.sectionScores.map(section => ({
+        module: section.section,
+        score: section.score,
+        max: section.max,
+        average: section.avg_score,
+        combinedComment: section.comment,
     }));
 };
 // --- End Detailed Breakdown Structure ---
@@ -94,66 +57,27 @@ const getDetailedBreakdown = (analytics) => {
 
 // --- Core Data Fetch Logic (fetchRealAnalytics) ---
 const fetchRealAnalytics = async (candidateId) => {
-    // 1. Fetch all evaluations
-    const { data: evaluations, error } = await supabase
-        .from('evaluations')
-        .select(`
-            round_type, total_score, total_max_score, quantitative_scores, 
-            qualitative_comments, evaluator:evaluator_uid(full_name) 
-        `)
-        .eq('candidate_uid', candidateId)
-        .eq('is_complete', true)
-        .order('round_type'); 
-
-    if (error) throw error;
-    if (evaluations.length === 0) return {
-        groupedByRound: [], individualResponses: [], aiSummary: "No completed evaluations found.", recommendation: 'N/A', comments: []
-    };
+    // 1. Fetch the aggregated analytics (rounds, sections, individual responses) from the backend
+    const response = await fetch(`${BACKEND_URL}/api/analytics/candidate/${candidateId}`);
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || 'Failed to load analytics.');
 
-    // 2. Aggregate Data
-    const aggregatedData = {};
-    const allComments = [];
-    const individualResponses = [];
-    
-    evaluations.forEach(evaluation => { 
-        const round = evaluation.round_type;
-        const score = evaluation.total_score;
-        const maxScore = evaluation.total_max_score;
+    if (data.individual_responses.length === 0) return {
+        groupedByRound: [], individualResponses: [], sectionScores: [], aiSummary: "No completed evaluations found.", recommendation: 'N/A', comments: []
+    };
 
-        if (!aggregatedData[round]) {
-            aggregatedData[round] = { totalScore: 0, totalMaxScore: 0, count: 0 };
-        }
-        aggregatedData[round].totalScore += score;
-        aggregatedData[round].totalMaxScore += maxScore;
-        aggregatedData[round].count += 1;
-        
-        individualResponses.push({
-            id: evaluation.id,
-            round: round,
-            evaluator: evaluation.evaluator?.full_name || 'Unknown Evaluator',
-            score: score,
-            max: maxScore,
-            // Safely parse JSON strings for nested data
-            quantitative_scores: typeof evaluation.quantitative_scores === 'string' ? JSON.parse(evaluation.quantitative_scores) : evaluation.quantitative_scores,
-            comments: typeof evaluation.qualitative_comments === 'string' ? JSON.parse(evaluation.qualitative_comments) : evaluation.qualitative_comments
-        });
-
-        allComments.push(...(typeof evaluation.qualitative_comments === 'string' ? JSON.parse(evaluation.qualitative_comments) : evaluation.qualitative_comments));
-    });
-
-    // Transform for display (Average Score by Round)
-    const groupedByRound = Object.keys(aggregatedData).map(round => {
-        const data = aggregatedData[round];
-        const avgScore = (data.totalScore / data.totalMaxScore) * 100;
-        return { round, avg_score: Math.round(avgScore), score: data.totalScore, max_score: data.totalMaxScore };
-    });
-    
-    const totalAggregatedScore = groupedByRound.reduce((acc, curr) => acc + curr.score, 0);
-    const totalMaxAggregatedScore = groupedByRound.reduce((acc, curr) => acc + curr.max_score, 0);
-    const overallAvg = totalMaxAggregatedScore > 0 ? (totalAggregatedScore / totalMaxAggregatedScore) * 100 : 0;
-    const recommendation = overallAvg > 80 ? 'Recommended' : overallAvg > 60 ? 'Waitlist' : 'Not Recommended';
+    const individualResponses = data.individual_responses.map(evaluation => ({
+        id: evaluation.id,
+        round: evaluation.round,
+        evaluator: evaluation.evaluator,
+        score: evaluation.score,
+        max: evaluation.max,
+        quantitative_scores: evaluation.sections,
+        comments: evaluation.comments,
+    }));
+    const allComments = individualResponses.flatMap(evaluation => evaluation.comments);
 
-    // Fetch AI Summary (Mock)
+    // 2. Fetch AI Summary
     let aiSummary = "Summary generation is currently offline or failed.";
     try {
         const summaryResponse = await fetch(`${BACKEND_URL}/api/summarize`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ comments: allComments }) });
@@ -162,13 +86,14 @@ const fetchRealAnalytics = async (candidateId) => {
     } catch (e) { console.warn("AI Summary generation failed:", e.message); }
 
     return {
-        groupedByRound,
+        groupedByRound: data.grouped_by_round,
         individualResponses,
+        sectionScores: data.section_scores,
         aiSummary,
-        recommendation,
-        totalAggregatedScore: totalAggregatedScore,
-        totalMaxAggregatedScore: totalMaxAggregatedScore,
-        overallAvg: overallAvg, // NEW: Pass average for the chart (Point 2)
+        recommendation: data.recommendation,
+        totalAggregatedScore: data.total_score,
+        totalMaxAggregatedScore: data.total_max_score,
+        overallAvg: data.overall_avg, // Pass average for the chart (Point 2)
     };
 };
 // --- End Core Data Fetch Logic ---
@@ -176,6 +101,7 @@ const fetchRealAnalytics = async (candidateId) => {
 
 function AnalyticsDashboardPage({ userProfile }) {
     const [candidates, setCandidates] = useState([]);
+    const [candidateSearch, setCandidateSearch] = useState('');
     const [selectedCandidateId, setSelectedCandidateId] = useState(null);
     const [selectedCandidate, setSelectedCandidate] = useState(null);
     const [analytics, setAnalytics] = useState(null);
@@ -184,23 +110,20 @@ function AnalyticsDashboardPage({ userProfile }) {
     const [reportStatus, setReportStatus] = useState({ state: 'idle', message: '' });
 
     // ... (fetchCandidates, fetchAnalytics, handleCandidateSelect functions remain the same) ...
+    // The first page of matches for the search box, rather than every candidate.
     const fetchCandidates = useCallback(async () => {
-        const { data, error } = await supabase
-            .from('users')
-            .select('uid, full_name, profile_image_url')
-            .eq('role', 'candidate')
-            .order('full_name', { ascending: true });
-        
-        if (error) {
-            setError(error.message);
-        } else {
-            setCandidates(data || []);
+        try {
+            const page = await fetchCandidatePage({ q: candidateSearch, limit: 50 });
+            setCandidates(page.items);
+        } catch (err) {
+            setError(err.message);
         }
         setLoading(false);
-    }, []);
+    }, [candidateSearch]);
 
     useEffect(() => {
-        fetchCandidates();
+        const timer = setTimeout(fetchCandidates, 250); // Debounce typing in the search box
+        return () => clearTimeout(timer);
     }, [fetchCandidates]);
 
 
@@ -245,8 +168,15 @@ function AnalyticsDashboardPage({ userProfile }) {
 
         try {
             const endpoint = exportType === 'pdf' ? '/api/report?candidate_id=' : '/api/report/excel?candidate_id=';
-            const response = await fetch(`${BACKEND_URL}${endpoint}${selectedCandidateId}`); 
-            
+            let response = await fetch(`${BACKEND_URL}${endpoint}${selectedCandidateId}`);
+            // 429/503: the server is rate limiting or at report capacity; wait as told by Retry-After, up to 3 times.
+            for (let attempt = 0; attempt < 3 && (response.status === 429 || response.status === 503); attempt++) {
+                const waitSeconds = Number(response.headers.get('Retry-After')) || 2;
+                setReportStatus({ state: 'loading', message: `Server busy, retrying in ${waitSeconds}s...` });
+                await new Promise(resolve => setTimeout(resolve, waitSeconds * 1000));
+                response = await fetch(`${BACKEND_URL}${endpoint}${selectedCandidateId}`);
+            }
+
             if (!response.ok) {
                 const errorText = await response.text();
                 throw new Error(`Server returned status ${response.status}. Message: ${errorText.substring(0, 100)}...`);
@@ -340,7 +270,8 @@ function AnalyticsDashboardPage({ userProfile }) {
         )
     }
 
-    const recommendationColor = analytics?.recommendation === 'Recommended' ? '#4CAF50' : analytics?.recommendation === 'Waitlist' ? '#ffc107' : '#ff3b5f';
+    const recommendation = analytics?.recommendation || '';
+    const recommendationColor = recommendation === 'Waitlist' ? '#ffc107' : (recommendation.includes('Recommended') && !recommendation.startsWith('Not')) ? '#4CAF50' : '#ff3b5f';
     const overallScoreAvg = analytics?.overallAvg || 0; // Get overall average for the chart
 
     return (
@@ -356,8 +287,20 @@ function AnalyticsDashboardPage({ userProfile }) {
                     {/* Candidate Selector */}
                     <div style={{ margin: '20px 0', padding: '20px', background: '#fff', borderRadius: '12px', boxShadow: '0 4px 12px rgba(0, 0, 0, 0.05)' }}>
                         <h3 style={{ marginBottom: '15px' }}>Select Candidate for Analysis</h3>
+                        <input
+                            type="search"
+                            value={candidateSearch}
+                            onChange={(e) => setCandidateSearch(e.target.value)}
+                            placeholder="Search candidates by name..."
+                            className={styles.authInput}
+                            style={{ width: '400px', marginBottom: '10px', display: 'block' }}
+                        />
                         <select onChange={handleCandidateSelect} value={selectedCandidateId || ''} className={styles.authInput} style={{ width: '400px' }}>
                             <option value="">-- Select Interviewee (Candidate) --</option>
+                            {/* Keep the current selection listed when a new search no longer matches it */}
+                            {selectedCandidate && !candidates.some(c => c.uid === selectedCandidate.uid) && (
+                                <option value={selectedCandidate.uid}>{selectedCandidate.full_name}</option>
+                            )}
                             {candidates.map(c => (
                                 <option key={c.uid} value={c.uid}>{c.full_name}</option>
                             ))}
@@ -5,6 +5,7 @@ import { useNavigate } from 'react-router-dom';
 import '../assets/Dashboard.css';
 import styles from './Auth.module.css';
 import Sidebar from '../components/Sidebar.jsx';
+import { subscribeToSchedules, applyScheduleChange } from '../scheduleApi.js';
 
 const LocationIcon = () => <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round"><path d="M21 10c0 7-9 13-9 13s-9-6-9-13a9 9 0 0 1 18 0z"></path><circle cx="12" cy="10" r="3"></circle></svg>;
 const TimeIcon = () => <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round"><circle cx="12" cy="12" r="10"></circle><polyline points="12 6 12 12 16 14"></polyline></svg>;
@@ -56,11 +57,21 @@ function EvaluationListPage({ userProfile }) {
             setLoading(false);
         };
 
-        fetchSchedulesAndEvaluations();
-        const intervalId = setInterval(fetchSchedulesAndEvaluations, 60000);
-        return () => clearInterval(intervalId);
+        // Schedule changes arrive over the change feed; a (re)connect that cannot resume reloads everything.
+        const isMine = (s) => s.status === 'Scheduled' && (s.evaluator_uids || []).includes(userProfile.uid);
+        return subscribeToSchedules({ evaluator: userProfile.uid }, {
+            onReload: fetchSchedulesAndEvaluations,
+            onChange: (change) => setSchedules(prev => applyScheduleChange(prev, change, isMine)),
+        });
     }, [userProfile.uid]);
 
+    // Re-render periodically so the Evaluate button enables itself when a session goes live.
+    const [, setClock] = useState(Date.now());
+    useEffect(() => {
+        const clockId = setInterval(() => setClock(Date.now()), 30000);
+        return () => clearInterval(clockId);
+    }, []);
+
     const isEvaluationLive = (schedule) => {
         const now = new Date();
         const cleanStartTime = cleanTime(schedule.start_time);
@@ -2,6 +2,8 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabase.js';
 import Sidebar from '../components/Sidebar.jsx';
+import { fetchCandidatePage } from '../candidateApi.js';
+import { searchResumes } from '../resumeApi.js';
 import styles from './Auth.module.css';
 import { CheckCircle, Clock, XCircle, FileText } from 'lucide-react'; // Added FileText icon
 
@@ -205,31 +207,40 @@ const ProfileModal = ({ profile, schedules, onClose }) => {
 
 function IntervieweeListPage({ userProfile }) {
     const [interviewees, setInterviewees] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [search, setSearch] = useState('');
+    const [searchResumeText, setSearchResumeText] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [selectedProfile, setSelectedProfile] = useState(null);
     const [profileSchedules, setProfileSchedules] = useState([]); 
 
-    const fetchInterviewees = useCallback(async () => {
+    // One page at a time from the candidate directory, or from resume search (where `cursor` is the offset);
+    // `cursor` continues the current list.
+    const fetchInterviewees = useCallback(async (cursor) => {
         setLoading(true);
-        // Fetch only basic user data initially
-        const { data, error } = await supabase
-            .from('users')
-            .select('uid, full_name, profile_image_url') 
-            .eq('role', 'candidate')
-            .order('full_name', { ascending: true });
-
-        if (error) {
-            setError(error.message);
-            console.error(error);
-        } else {
-            setInterviewees(data || []);
+        try {
+            if (searchResumeText && search.trim()) {
+                const offset = cursor || 0;
+                const page = await searchResumes(search, { limit: 48, offset });
+                const items = page.items.map(item => ({ ...item, uid: item.candidate_uid }));
+                setInterviewees(prev => cursor ? [...prev, ...items] : items);
+                setNextCursor(offset + items.length < page.total ? offset + items.length : null);
+            } else {
+                const page = await fetchCandidatePage({ q: search, cursor, limit: 48 });
+                setInterviewees(prev => cursor ? [...prev, ...page.items] : page.items);
+                setNextCursor(page.next_cursor);
+            }
+        } catch (err) {
+            setError(err.message);
+            console.error(err);
         }
         setLoading(false);
-    }, []);
+    }, [search, searchResumeText]);
 
     useEffect(() => {
-        fetchInterviewees();
+        const timer = setTimeout(() => fetchInterviewees(null), 250); // Debounce typing in the search box
+        return () => clearTimeout(timer);
     }, [fetchInterviewees]);
 
     const handleViewProfile = async (userId) => {
@@ -288,6 +299,19 @@ function IntervieweeListPage({ userProfile }) {
                         <p>Browse all candidates who have applied for positions.</p>
                     </header>
 
+                    <input
+                        type="search"
+                        value={search}
+                        onChange={(e) => setSearch(e.target.value)}
+                        placeholder={searchResumeText ? "Search resumes, education, experience, skills..." : "Search by name..."}
+                        className={styles.authInput}
+                        style={{ maxWidth: '400px' }}
+                    />
+                    <label style={{ display: 'flex', alignItems: 'center', gap: '8px', marginTop: '10px', color: '#555' }}>
+                        <input type="checkbox" checked={searchResumeText} onChange={(e) => setSearchResumeText(e.target.checked)} />
+                        Search resume text, education, experience and skills
+                    </label>
+
                     {loading && <p>Loading profiles...</p>}
                     {error && <p className={styles.error}>{error}</p>}
                     
@@ -301,6 +325,11 @@ function IntervieweeListPage({ userProfile }) {
                                 />
                                 <h3 style={{ marginTop: 0, marginBottom: '5px' }}>{user.full_name || 'No Name'}</h3>
                                 <p style={{ color: '#666', fontSize: '0.9rem' }}>Role: Candidate</p>
+                                {user.snippet && (
+                                    <p style={{ color: '#444', fontSize: '0.85rem', margin: '0 0 5px 0' }}>
+                                        {user.snippet.map((part, i) => part.match ? <mark key={i}>{part.text}</mark> : <span key={i}>{part.text}</span>)}
+                                    </p>
+                                )}
                                 <button
                                     onClick={() => handleViewProfile(user.uid)}
                                     className={styles.authButton}
@@ -311,6 +340,11 @@ function IntervieweeListPage({ userProfile }) {
                             </div>
                         ))}
                     </div>
+                    {nextCursor && !loading && (
+                        <button onClick={() => fetchInterviewees(nextCursor)} className={styles.authButton} style={{ width: 'auto', padding: '8px 24px', margin: '2rem auto', display: 'block' }}>
+                            Load More
+                        </button>
+                    )}
                 </main>
             </div>
             <ProfileModal 
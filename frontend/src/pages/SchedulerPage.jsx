@@ -2,6 +2,8 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useLocation } from 'react-router-dom';
 import { supabase } from '../supabase.js';
+import { createSchedule } from '../scheduleApi.js';
+import { fetchCandidatePage } from '../candidateApi.js';
 import '../assets/Dashboard.css';
 import styles from './Auth.module.css';
 import { Calendar, Clock, MapPin, Video, Building, CheckCircle } from 'lucide-react';
@@ -31,22 +33,18 @@ function SchedulerPage({ userProfile }) {
   });
 
   const [candidates, setCandidates] = useState([]);
+  const [candidateSearch, setCandidateSearch] = useState('');
+  const [candidateCursor, setCandidateCursor] = useState(null);
+  const [selectedCandidate, setSelectedCandidate] = useState(null);
   const [evaluators, setEvaluators] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
+  const [conflicts, setConflicts] = useState([]);
 
   const fetchData = useCallback(async () => {
     setLoading(true);
     try {
-      const { data: candidateData, error: candidateError } = await supabase
-        .from('users')
-        .select('uid, full_name, subject_teaching, resume_url')
-        .eq('role', 'candidate');
-
-      if (candidateError) throw candidateError;
-      setCandidates(candidateData || []);
-
       // Fetch all users who are not candidates to be evaluators
       const { data: evaluatorData, error: evaluatorError } = await supabase
         .from('users')
@@ -67,6 +65,22 @@ function SchedulerPage({ userProfile }) {
     fetchData();
   }, [fetchData]);
 
+  // Candidates come a page at a time from the directory search; `cursor` appends the next page.
+  const fetchCandidates = useCallback(async (cursor) => {
+    try {
+      const page = await fetchCandidatePage({ q: candidateSearch, cursor, limit: 24 });
+      setCandidates(prev => cursor ? [...prev, ...page.items] : page.items);
+      setCandidateCursor(page.next_cursor);
+    } catch (err) {
+      setError(err.message);
+    }
+  }, [candidateSearch]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => fetchCandidates(null), 250); // Debounce typing in the search box
+    return () => clearTimeout(timer);
+  }, [fetchCandidates]);
+
   useEffect(() => {
     if (preSelectedCandidateId) {
       setFormData(prev => ({ ...prev, candidate_id: preSelectedCandidateId }));
@@ -77,22 +91,19 @@ function SchedulerPage({ userProfile }) {
     const { name, value } = e.target;
     setFormData(prev => ({ ...prev, [name]: value }));
 
-    if (name === 'round_type' && value && formData.candidate_id) {
-      const candidate = candidates.find(c => c.uid === formData.candidate_id);
-      if (candidate) {
-        setFormData(prev => ({
-          ...prev,
-          event_name: `${candidate.full_name} - ${value}`
-        }));
-      }
+    if (name === 'round_type' && value && selectedCandidate?.uid === formData.candidate_id) {
+      setFormData(prev => ({
+        ...prev,
+        event_name: `${selectedCandidate.full_name} - ${value}`
+      }));
     }
   };
 
-  const handleCandidateSelect = (candidateId) => {
-    const candidate = candidates.find(c => c.uid === candidateId);
+  const handleCandidateSelect = (candidate) => {
+    setSelectedCandidate(candidate);
     setFormData(prev => ({
         ...prev,
-        candidate_id: candidateId,
+        candidate_id: candidate.uid,
         event_name: prev.round_type ? `${candidate.full_name} - ${prev.round_type}` : '',
     }));
   };
@@ -106,10 +117,11 @@ function SchedulerPage({ userProfile }) {
     });
   };
 
-  const handleSubmit = async (e) => {
+  const handleSubmit = async (e, allowConflicts = false) => {
     e.preventDefault();
     setError('');
     setSuccess('');
+    setConflicts([]);
 
     if (!formData.candidate_id || !formData.round_type || !formData.date || !formData.start_time || !formData.end_time || formData.evaluator_uids.length === 0) {
       return setError('Please fill all required fields and select at least one evaluator.');
@@ -123,15 +135,15 @@ function SchedulerPage({ userProfile }) {
 
     setLoading(true);
     try {
-      const { error: insertError } = await supabase.from('schedules').insert({
+      // Through the backend, so open dashboards see the new event immediately.
+      await createSchedule({
         ...formData,
         duration_minutes: durationMinutes,
         created_by_uid: userProfile.uid,
         status: 'Pending Approval',
+        allow_conflicts: allowConflicts,
       });
 
-      if (insertError) throw insertError;
-
       setSuccess('✓ Event scheduled successfully and is pending admin approval.');
       setFormData({
         event_name: '', notes: '', date: '', start_time: '', end_time: '', round_type: '', mode: 'Online', location: '', candidate_id: '', evaluator_uids: [],
@@ -139,11 +151,19 @@ function SchedulerPage({ userProfile }) {
       setTimeout(() => setSuccess(''), 5000);
     } catch (err) {
       setError(`Error scheduling: ${err.message}`);
+      setConflicts(err.conflicts || []);
     } finally {
       setLoading(false);
     }
   };
 
+  const describeConflict = (conflict) => {
+    const who = conflict.resource === 'evaluator'
+      ? `Evaluator ${evaluators.find(ev => ev.uid === conflict.value)?.full_name || conflict.value}`
+      : conflict.resource === 'candidate' ? 'The candidate' : `Location "${conflict.value}"`;
+    return `${who} is booked ${conflict.date} ${conflict.start_time?.slice(0, 5)}–${conflict.end_time?.slice(0, 5)} (${conflict.status})`;
+  };
+
   // --- RENDER LOGIC (No changes needed below this line) ---
 
   if (loading && candidates.length === 0) {
@@ -167,18 +187,34 @@ function SchedulerPage({ userProfile }) {
 
           <form onSubmit={handleSubmit}>
             {error && <div className={styles.error}>{error}</div>}
+            {conflicts.length > 0 && (
+              <div style={{ background: '#fff8e1', color: '#8d6e00', padding: '1rem', borderRadius: '8px', marginBottom: '1.5rem', border: '1px solid #ffca28' }}>
+                <ul style={{ margin: '0 0 0.75rem', paddingLeft: '1.25rem' }}>
+                  {conflicts.map((conflict, i) => <li key={i}>{describeConflict(conflict)}</li>)}
+                </ul>
+                <button type="button" disabled={loading} onClick={(e) => handleSubmit(e, true)} style={{ background: 'none', border: '1px solid #8d6e00', color: '#8d6e00', padding: '0.5rem 1rem', borderRadius: '8px', cursor: 'pointer' }}>
+                  Schedule anyway
+                </button>
+              </div>
+            )}
             {success && <div style={{ background: '#e8f5e9', color: '#2e7d32', padding: '1rem', borderRadius: '8px', marginBottom: '1.5rem', border: '1px solid #4caf50', fontWeight: 'bold' }}>{success}</div>}
 
             <section style={{ background: '#fff', padding: '2rem', borderRadius: '12px', boxShadow: '0 2px 8px rgba(0,0,0,0.05)', marginBottom: '1.5rem' }}>
               <h3 style={{ color: '#ff3b5f', marginBottom: '1rem' }}>1. Select Candidate</h3>
+              <input type="search" value={candidateSearch} onChange={(e) => setCandidateSearch(e.target.value)} className={styles.authInput} placeholder="Search candidates by name..." style={{ marginBottom: '1rem' }} />
               <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(250px, 1fr))', gap: '1rem' }}>
                 {candidates.map(candidate => (
-                  <div key={candidate.uid} onClick={() => handleCandidateSelect(candidate.uid)} style={{ padding: '1rem', border: formData.candidate_id === candidate.uid ? '2px solid #ff3b5f' : '1px solid #e0e0e0', borderRadius: '8px', background: formData.candidate_id === candidate.uid ? '#ffeef2' : '#fff', cursor: 'pointer' }}>
+                  <div key={candidate.uid} onClick={() => handleCandidateSelect(candidate)} style={{ padding: '1rem', border: formData.candidate_id === candidate.uid ? '2px solid #ff3b5f' : '1px solid #e0e0e0', borderRadius: '8px', background: formData.candidate_id === candidate.uid ? '#ffeef2' : '#fff', cursor: 'pointer' }}>
                     <h4>{candidate.full_name}</h4>
                     {candidate.resume_url && <a href={candidate.resume_url} target="_blank" rel="noopener noreferrer" style={{ color: '#ff3b5f' }}>View Resume →</a>}
                   </div>
                 ))}
               </div>
+              {candidateCursor && (
+                <button type="button" onClick={() => fetchCandidates(candidateCursor)} style={{ marginTop: '1rem', background: 'none', border: '1px solid #ff3b5f', color: '#ff3b5f', padding: '0.5rem 1rem', borderRadius: '8px', cursor: 'pointer' }}>
+                  Load more candidates
+                </button>
+              )}
             </section>
 
             <section style={{ background: '#fff', padding: '2rem', borderRadius: '12px', boxShadow: '0 2px 8px rgba(0,0,0,0.05)', marginBottom: '1.5rem' }}>
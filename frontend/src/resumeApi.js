@@ -0,0 +1,68 @@
+// frontend/src/resumeApi.js
+// Resumes are uploaded through the backend in chunks, stored once per content hash and indexed for search.
+const BACKEND_URL = "http://127.0.0.1:5000";
+
+async function resumeRequest(path, options) {
+  const res = await fetch(`${BACKEND_URL}${path}`, options);
+  const data = await res.json();
+  if (!res.ok) {
+    const error = new Error(data.error || `Resume request failed (${res.status}).`);
+    error.status = res.status;
+    error.received = data.received;
+    throw error;
+  }
+  return data;
+}
+
+// Hex SHA-256 of a file, or null where WebCrypto is unavailable (plain-HTTP origins); the server then hashes it.
+async function sha256Hex(file) {
+  if (!globalThis.crypto?.subtle) return null;
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+// Uploads a resume and returns { resume_url, sha256, status, duplicate }. A file the server already has is not
+// sent again. `onProgress(fraction)` is called as chunks are acknowledged; a chunk the server reports as
+// out of order (409) is resumed from the offset it has.
+export async function uploadResume(file, onProgress = () => {}) {
+  const sha256 = await sha256Hex(file);
+  const started = await resumeRequest('/api/resumes/uploads', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ filename: file.name, size: file.size, sha256 }),
+  });
+  if (started.duplicate) {
+    onProgress(1);
+    return started;
+  }
+
+  const { upload_id: uploadId, chunk_size: chunkSize } = started;
+  let offset = 0;
+  try {
+    while (offset < file.size) {
+      try {
+        const { received } = await resumeRequest(`/api/resumes/uploads/${uploadId}?offset=${offset}`, {
+          method: 'PUT',
+          headers: { 'Content-Type': 'application/octet-stream' },
+          body: file.slice(offset, offset + chunkSize),
+        });
+        offset = received;
+      } catch (err) {
+        if (err.status !== 409 || err.received === undefined || err.received === offset) throw err;
+        offset = err.received;
+      }
+      onProgress(offset / file.size);
+    }
+    return await resumeRequest(`/api/resumes/uploads/${uploadId}/complete`, { method: 'POST' });
+  } catch (err) {
+    fetch(`${BACKEND_URL}/api/resumes/uploads/${uploadId}`, { method: 'DELETE' }).catch(() => {});
+    throw err;
+  }
+}
+
+// Ranked search over resume text and academic, experience and skills fields. Returns { items, total, took_ms };
+// each item has candidate_uid, full_name, score and a snippet of { text, match } segments.
+export function searchResumes(q, { limit = 20, offset = 0 } = {}) {
+  const params = new URLSearchParams({ q, limit, offset });
+  return resumeRequest(`/api/resumes/search?${params}`);
+}
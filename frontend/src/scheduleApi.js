@@ -0,0 +1,46 @@
+// frontend/src/scheduleApi.js
+// Schedule writes go through the backend so every open tab hears about them over the change feed.
+const BACKEND_URL = "http://127.0.0.1:5000";
+
+async function scheduleRequest(path, method, body) {
+  const res = await fetch(`${BACKEND_URL}${path}`, {
+    method,
+    headers: { 'Content-Type': 'application/json' },
+    body: body ? JSON.stringify(body) : undefined,
+  });
+  const data = await res.json();
+  if (!res.ok) {
+    const error = new Error(data.error || `Schedule request failed (${res.status}).`);
+    // 409: the slot clashes with existing bookings; resend with allow_conflicts: true to book it anyway.
+    error.conflicts = data.conflicts || [];
+    throw error;
+  }
+  return data;
+}
+
+export const createSchedule = (schedule) => scheduleRequest('/api/schedules', 'POST', schedule);
+export const updateSchedule = (id, updates) => scheduleRequest(`/api/schedules/${id}`, 'PATCH', updates);
+export const deleteSchedule = (id) => scheduleRequest(`/api/schedules/${id}`, 'DELETE');
+
+// Opens the Server-Sent Events feed. `onReload` runs when the full list must be (re)loaded: on first connect
+// and when the server cannot resume from the last event. `onChange` gets { op, schedule } deltas. The browser
+// reconnects on its own and resumes from the last event ID. Returns an unsubscribe function.
+export function subscribeToSchedules(filters, { onReload, onChange }) {
+  const params = new URLSearchParams(Object.entries(filters || {}).filter(([, value]) => value));
+  const source = new EventSource(`${BACKEND_URL}/api/stream/schedules?${params}`);
+  source.addEventListener('ready', onReload);
+  source.addEventListener('reset', onReload);
+  source.addEventListener('schedule', (event) => onChange(JSON.parse(event.data)));
+  return () => source.close();
+}
+
+// Applies one delta to a schedule list. `keep` decides whether the changed schedule still belongs in the list.
+export function applyScheduleChange(schedules, { op, schedule }, keep = () => true) {
+  const existing = schedules.find(s => s.id === schedule.id);
+  const rest = schedules.filter(s => s.id !== schedule.id);
+  if (op === 'delete') return rest;
+  // Keep the joined candidate if the change arrived without it.
+  const merged = { ...existing, ...schedule, candidate: schedule.candidate || existing?.candidate };
+  if (!keep(merged)) return rest;
+  return [...rest, merged].sort((a, b) => `${a.date} ${a.start_time}`.localeCompare(`${b.date} ${b.start_time}`));
+}